@@ -0,0 +1,6 @@
+"""Style Savvy API package."""
+import time
+
+# Reference point of the startup-time breakdown: the package is
+# imported before any other application module (see api.main)
+IMPORT_STARTED = time.perf_counter()
@@ -5,9 +5,12 @@ Environment variables are loaded from .env file for local development
 and from environment variables in production (Render free tier).
 """
 import logging
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
+from api.constants.enums import ColorQuantizer, RecommendationEngine
+
 
 class Settings(BaseSettings):
     """
@@ -21,10 +24,140 @@ class Settings(BaseSettings):
     cloudinary_api_key: str = ""
     cloudinary_api_secret: str = ""
 
+    # Image storage uploads (Cloudinary): pooled connections, request
+    # timeout, and retries with exponential backoff on network errors
+    # and 429/5xx answers. The API base can point at a stand-in server.
+    cloudinary_api_base: str = "https://api.cloudinary.com"
+    storage_max_connections: int = 10
+    storage_timeout_seconds: float = 30.0
+    storage_max_retries: int = 3
+    storage_retry_base_seconds: float = 0.5
+
+    # Database performance profile. Pool settings apply to Postgres
+    # and file-based SQLite; the statement cache holds compiled SQL.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_statement_cache_size: int = 500
+
+    # SQLite pragmas applied to every connection: WAL lets readers run
+    # alongside a writer, busy_timeout makes writers wait for the lock
+    # instead of failing with "database is locked"
+    sqlite_journal_mode: Literal[
+        "WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"
+    ] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+
     # Application settings
     app_name: str = "Style Savvy"
     debug: bool = False
 
+    # Requests name their user in the X-User-Id header. Without it they
+    # act as user 1 (the single profile of earlier versions, which
+    # also owns all rows from before multi-user support) unless
+    # require_user_id is set, in which case they get 401.
+    require_user_id: bool = False
+
+    # Uploads larger than upload_max_bytes are rejected with 413 while
+    # being read (in upload_read_chunk_bytes chunks). With reduced_decode
+    # JPEGs are decoded at 1/2, 1/4 or 1/8 scale when analysis only
+    # needs a smaller image.
+    upload_max_bytes: int = 20 * 1024 * 1024
+    upload_read_chunk_bytes: int = 1024 * 1024
+    reduced_decode: bool = True
+
+    # Batch ingest: max images per request and color-analysis worker
+    # processes (0 means one process per CPU core)
+    batch_upload_max_items: int = 200
+    batch_worker_processes: int = 0
+
+    # OpenCV and sklearn are imported when an upload first needs them.
+    # With warmup_on_startup a background thread imports them, loads
+    # the face cascades and runs a tiny KMeans right after startup, so
+    # the first upload does not wait for that; /ready reports progress.
+    warmup_on_startup: bool = True
+
+    # CPU-bound image analysis runs on a dedicated executor so it never
+    # blocks the event loop; requests beyond workers + queue get a 503
+    compute_workers: int = 2
+    compute_queue_size: int = 8
+
+    # Asynchronous upload jobs: in-process worker count (0 disables
+    # processing), retry policy, and how long a claimed job stays
+    # locked before another worker may take it over
+    job_workers: int = 2
+    job_max_attempts: int = 5
+    job_retry_base_seconds: float = 2.0
+    job_retry_max_seconds: float = 300.0
+    job_lease_seconds: float = 300.0
+    job_poll_interval_seconds: float = 1.0
+
+    # Face detection for skin analysis: photos are downscaled so their
+    # longer side is at most face_detect_max_dimension pixels, and only
+    # faces between the min and max ratio of the shorter side count.
+    # The cascade pool defaults to one classifier per compute worker.
+    face_detect_max_dimension: int = 640
+    face_min_size_ratio: float = 0.1
+    face_max_size_ratio: float = 1.0
+    face_cascade_pool_size: int = 0
+
+    # The in-memory wardrobe store re-checks the database for rows
+    # written by other processes at most this often. It holds one
+    # wardrobe per recently active user; least recently used ones are
+    # dropped once their estimated size passes wardrobe_store_max_mb.
+    wardrobe_store_ttl_seconds: float = 30.0
+    wardrobe_store_max_mb: float = 256.0
+
+    # GET /clothing/all pages: default and maximum items per page, and
+    # rows fetched per round trip by the NDJSON stream
+    clothing_page_size: int = 100
+    clothing_page_max_size: int = 500
+    clothing_stream_batch_size: int = 500
+
+    # In-memory entries of the content-hash analysis cache
+    # (the database layer is unbounded)
+    analysis_cache_size: int = 1024
+
+    # Dominant color extraction engine (see benchmarks/quantizer_harness.py)
+    color_quantizer: ColorQuantizer = ColorQuantizer.KMEANS
+
+    # Cluster only the garment: drop the backdrop of product shots (or
+    # keep a centered region of busy photos) before quantizing colors
+    # (see benchmarks/foreground_benchmark.py)
+    foreground_masking: bool = True
+
+    # Serialized /recommendation/suggest (and /outfits) responses kept
+    # in memory (for all users together), bounded by count and by total
+    # body size; /suggest-batch stores and reuses them per context
+    recommendation_cache_size: int = 8192
+    recommendation_cache_max_mb: float = 32.0
+
+    # Recommendation ranking engine (all engines give identical results)
+    recommendation_engine: RecommendationEngine = (
+        RecommendationEngine.MATERIALIZED
+    )
+
+    # With the SQL engine, smaller wardrobes are still ranked in memory;
+    # measure the crossover with benchmarks/sql_ranking_benchmark.py
+    sql_ranking_min_items: int = 200
+
+    # Most contexts one /recommendation/suggest-batch request may ask for
+    recommendation_batch_max_contexts: int = 50
+
+    # Per-request profiling: requests sent with the header
+    # "X-Profile: <profiling_secret>" run under cProfile and a stack
+    # sampler, and their SQL is recorded. Empty disables profiling (the
+    # middleware is not even installed). The last profiling_max_profiles
+    # reports are kept in memory for GET /system/profiles/{id}.
+    profiling_secret: str = ""
+    profiling_max_profiles: int = 20
+    profiling_sample_interval_ms: float = 1.0
+    profiling_top_functions: int = 40
+
     class Config:
         # .env is optional (e.g. on Render, use Environment tab only)
         env_file = ".env"
@@ -28,6 +28,11 @@ COLOR_LABELS: dict[str, tuple[int, int, int]] = {
     "LAVENDER": (230, 230, 250),
 }
 
+# Color labels are looked up in a table over the RGB cube split into
+# 2**bits levels per channel (5 bits = 32,768 cells). Boundary cells
+# fall back to an exact distance check, so precision is unaffected.
+COLOR_LOOKUP_BITS = 5
+
 # Colors that pair well with warm skin undertones.
 # Warm undertones are enhanced by earth tones and warm hues.
 WARM_PALETTE: set[str] = {
@@ -61,6 +66,34 @@ DARK_COLORS: set[str] = {
     "BLACK", "NAVY", "MAROON", "BROWN",
 }
 
+# ── Outfit color pairing ────────────────────────────────────────────
+# Neutrals go with any other color in an outfit.
+NEUTRAL_COLORS: set[str] = {
+    "BLACK", "WHITE", "GREY", "BEIGE", "NAVY", "CREAM",
+}
+
+# Dominant color pairs that set each other off (classic combinations
+# and color-wheel complements).
+COMPLEMENTARY_COLOR_PAIRS: set[frozenset[str]] = {
+    frozenset(pair)
+    for pair in (
+        ("BLUE", "ORANGE"), ("NAVY", "BEIGE"), ("NAVY", "WHITE"),
+        ("PURPLE", "YELLOW"), ("RED", "GREEN"), ("TEAL", "MAROON"),
+        ("BROWN", "BLUE"), ("OLIVE", "CREAM"), ("PINK", "GREY"),
+        ("LAVENDER", "OLIVE"), ("MAROON", "BEIGE"), ("BLACK", "WHITE"),
+    )
+}
+
+# Dominant color pairs that compete with each other.
+CLASHING_COLOR_PAIRS: set[frozenset[str]] = {
+    frozenset(pair)
+    for pair in (
+        ("RED", "PINK"), ("RED", "ORANGE"), ("ORANGE", "PINK"),
+        ("RED", "PURPLE"), ("GREEN", "PINK"), ("BROWN", "BLACK"),
+        ("NAVY", "BLACK"), ("YELLOW", "GREEN"), ("MAROON", "RED"),
+    )
+}
+
 # ── Image processing constants ──────────────────────────────────────
 CLOTHING_IMAGE_RESIZE_WIDTH = 300
 CLOTHING_IMAGE_RESIZE_HEIGHT = 300
@@ -69,3 +102,54 @@ KMEANS_CLUSTER_COUNT = 3
 # Minimum percentage of pixels for a color to be considered secondary.
 # Below this threshold, the cluster is likely noise or background.
 MIN_CLUSTER_PERCENTAGE = 0.1
+
+# ── Foreground masking ──────────────────────────────────────────────
+# Width of the frame border sampled for the backdrop color, as a
+# fraction of the shorter side.
+FOREGROUND_BORDER_RATIO = 0.05
+
+# Share of border pixels that must lie close to the backdrop color for
+# it to count as a plain backdrop (product shots on white or grey).
+# Below this the border is busy and the center-weighted mask is used.
+FOREGROUND_BORDER_UNIFORMITY = 0.6
+
+# RGB distance from the backdrop color beyond which a pixel counts as
+# garment; covers JPEG noise and soft shadows on the backdrop.
+FOREGROUND_DISTANCE_THRESHOLD = 40
+
+# Fewer foreground pixels than this fraction means the garment blends
+# into the backdrop (a white shirt on white); the center-weighted mask
+# is used instead.
+FOREGROUND_MIN_FRACTION = 0.05
+
+# Semi-axes of the center-weighted fallback ellipse, as fractions of
+# the image width and height (0.5 is the inscribed ellipse).
+FOREGROUND_CENTER_RADIUS = 0.4
+
+# ── Stored image derivatives ────────────────────────────────────────
+# Downscaled WebP copies made once at ingest, by name: longest side in
+# pixels. Images already smaller are re-encoded at their own size.
+IMAGE_DERIVATIVE_SIZES: dict[str, int] = {
+    "thumb": 256,
+    "medium": 768,
+}
+DERIVATIVE_WEBP_QUALITY = 80
+
+# ── Color quantizer engine tuning ───────────────────────────────────
+# Exact KMeans restarts; more restarts are slower but more stable.
+KMEANS_N_INIT = 10
+
+# cv2.kmeans restarts and termination criteria (iterations / RGB epsilon).
+CV2_KMEANS_ATTEMPTS = 3
+CV2_KMEANS_MAX_ITER = 20
+CV2_KMEANS_EPSILON = 1.0
+
+# MiniBatch KMeans fits on a stratified sample instead of every pixel.
+QUANTIZER_SAMPLE_SIZE = 10_000
+MINIBATCH_BATCH_SIZE = 1024
+
+# Histogram quantizer bins each RGB channel into 2**bits levels
+# (4 bits = 16 levels = 4096 cells) before median-cut splitting,
+# then refines the centers with a few weighted Lloyd iterations.
+HISTOGRAM_BITS_PER_CHANNEL = 4
+HISTOGRAM_REFINE_ITERATIONS = 8
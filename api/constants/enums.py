@@ -40,6 +40,17 @@ class ClothingType(str, Enum):
     HOODIE = "HOODIE"
 
 
+class OutfitRole(str, Enum):
+    """
+    Part a clothing item plays in a complete outfit: a top with a
+    bottom, or a dress, plus an optional layer over either.
+    """
+    TOP = "TOP"
+    BOTTOM = "BOTTOM"
+    DRESS = "DRESS"
+    LAYER = "LAYER"
+
+
 class OccasionType(str, Enum):
     """Event/occasion categories for outfit matching."""
     CASUAL = "CASUAL"
@@ -75,3 +86,39 @@ class TimeOfDay(str, Enum):
     """Time of day affects color preference in recommendations."""
     DAY = "DAY"
     NIGHT = "NIGHT"
+
+
+class ColorQuantizer(str, Enum):
+    """
+    Engine used to find the dominant colors of a clothing image.
+    Faster engines trade some agreement with exact KMeans for speed.
+    """
+    KMEANS = "KMEANS"
+    CV2_KMEANS = "CV2_KMEANS"
+    MINIBATCH = "MINIBATCH"
+    HISTOGRAM = "HISTOGRAM"
+
+
+class RecommendationEngine(str, Enum):
+    """
+    Engine used to rank wardrobe items for a recommendation.
+    All engines return identical results; they differ in speed.
+    """
+    RULES = "RULES"
+    VECTORIZED = "VECTORIZED"
+    MATERIALIZED = "MATERIALIZED"
+    SQL = "SQL"
+
+
+class JobKind(str, Enum):
+    """Type of work carried by an asynchronous analysis job."""
+    CLOTHING_UPLOAD = "CLOTHING_UPLOAD"
+    USER_PHOTO_UPLOAD = "USER_PHOTO_UPLOAD"
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of an asynchronous analysis job."""
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
@@ -33,3 +33,19 @@ SEASON_WEATHER_MATCH_SCORE = 2
 
 # Number of top recommendations to return from the engine.
 TOP_RECOMMENDATIONS_COUNT = 3
+
+# Points for how the dominant colors of two pieces of an outfit pair.
+# Complementary pairs look deliberate; a neutral goes with anything;
+# clashing pairs cost points.
+COLOR_PAIR_COMPLEMENT_SCORE = 2
+COLOR_PAIR_NEUTRAL_SCORE = 1
+COLOR_PAIR_CLASH_PENALTY = -2
+
+# Points when one piece's secondary color repeats the other's dominant
+# color, tying the outfit together.
+COLOR_PAIR_ACCENT_SCORE = 1
+
+# Number of outfits returned by default, and the most one request
+# may ask for.
+TOP_OUTFITS_COUNT = 3
+MAX_OUTFITS_COUNT = 20
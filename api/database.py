@@ -4,29 +4,197 @@ Database connection setup using SQLAlchemy.
 Compatible with Supabase PostgreSQL on the free tier.
 Uses connection pooling with pre-ping to handle
 intermittent connection drops common on free-tier databases.
+
+The performance profile comes from settings:
+- SQLite connections get WAL journaling and the other sqlite_* pragmas,
+  so concurrent uploads no longer serialize on the rollback journal
+- pooled engines (Postgres, file SQLite) get an explicit pool size,
+  overflow, checkout timeout and recycle age
+- the pool is instrumented: checkout wait time, connections in use
+  and checkout timeouts are available from pool_stats(), and each
+  wait time is passed to the observers added with
+  pool_monitor.on_wait (metrics_routes feeds a /metrics histogram)
 """
 import logging
+import threading
+import time
+from typing import Callable
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateColumn
 
 from api.config import settings
 
 logger = logging.getLogger(__name__)
 
+
+class PoolMonitor:
+    """Counters fed by pool events and timed checkouts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.connections_invalidated = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._wait_observers: list[Callable[[float], None]] = []
+
+    def on_wait(self, observer: Callable[[float], None]) -> None:
+        """Also pass every checkout wait time (seconds) to observer."""
+        self._wait_observers.append(observer)
+
+    def record_wait(self, seconds: float, timed_out: bool) -> None:
+        for observer in self._wait_observers:
+            observer(seconds)
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def attach(self, pool) -> None:
+        """Subscribe to the pool's connection lifecycle events."""
+
+        @event.listens_for(pool, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connections_opened += 1
+
+        @event.listens_for(pool, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, proxy):
+            with self._lock:
+                self.checkouts += 1
+                self.checked_out += 1
+
+        @event.listens_for(pool, "checkin")
+        def _on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.checked_out -= 1
+
+        @event.listens_for(pool, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.connections_invalidated += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "connections_opened": self.connections_opened,
+                "connections_invalidated": self.connections_invalidated,
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_ms_mean": (
+                    self.wait_seconds_total / self.waits * 1000
+                    if self.waits
+                    else 0.0
+                ),
+                "checkout_wait_ms_max": self.wait_seconds_max * 1000,
+            }
+
+
+pool_monitor = PoolMonitor()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times how long each checkout waits for a free
+    connection. Pool events fire only once a connection is handed
+    out, so the wait itself has to be measured around _do_get.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            logger.warning(
+                "Database pool checkout timed out: %s", self.status()
+            )
+            raise
+        finally:
+            pool_monitor.record_wait(time.perf_counter() - start, timed_out)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply the SQLite performance pragmas to a new connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(
+            f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}"
+        )
+        cursor.execute(
+            f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}"
+        )
+    finally:
+        cursor.close()
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    return url.startswith("sqlite") and (
+        ":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite:/")
+    )
+
+
+_is_sqlite = settings.database_url.startswith("sqlite")
+
 # SQLite needs check_same_thread=False for FastAPI's async/threading model
-_engine_kwargs = {"pool_pre_ping": True}
-if settings.database_url.startswith("sqlite"):
+_engine_kwargs = {
+    "pool_pre_ping": True,
+    # Compiled SQL cache size (statements reused across requests)
+    "query_cache_size": settings.db_statement_cache_size,
+}
+if _is_sqlite:
     _engine_kwargs["connect_args"] = {"check_same_thread": False}
     _engine_kwargs["pool_pre_ping"] = False  # not used for SQLite
+if not _is_sqlite_memory(settings.database_url):
+    # In-memory SQLite keeps its single-connection pool
+    _engine_kwargs.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
 
 engine = create_engine(settings.database_url, **_engine_kwargs)
+pool_monitor.attach(engine.pool)
+if _is_sqlite:
+    event.listen(engine, "connect", _sqlite_pragmas)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+def pool_stats() -> dict:
+    """Pool configuration, current occupancy and checkout telemetry."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, **pool_monitor.stats()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            max_overflow=settings.db_max_overflow,
+            idle=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    return stats
+
+
 def get_db():
     """
     FastAPI dependency that provides a database session per request.
@@ -40,11 +208,44 @@ def get_db():
         db.close()
 
 
+def _add_missing_columns() -> None:
+    """
+    Add model columns that existing tables lack. New columns must be
+    nullable or have a server default, which fills the existing rows.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {
+                column["name"] for column in inspector.get_columns(table.name)
+            }
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                definition = CreateColumn(column).compile(
+                    dialect=engine.dialect
+                )
+                connection.execute(
+                    text(f"ALTER TABLE {table.name} ADD COLUMN {definition}")
+                )
+                logger.info("Added column %s.%s", table.name, column.name)
+
+
 def init_db() -> None:
     """
     Create all database tables on startup.
     Safe to call multiple times - SQLAlchemy only creates
     tables that don't already exist.
+
+    create_all neither alters existing tables nor creates their new
+    indexes, so columns and indexes added to a model later are added
+    here one by one.
     """
+    _add_missing_columns()
     Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     logger.info("Database tables initialized successfully")
@@ -51,3 +51,42 @@ class CloudinaryUploadError(Exception):
     ):
         self.message = message
         super().__init__(self.message)
+
+
+class ComputeQueueFullError(Exception):
+    """Raised when the image analysis executor has no free queue slots."""
+
+    def __init__(
+        self,
+        message: str = (
+            "Image analysis is at capacity. Please retry shortly."
+        ),
+    ):
+        self.message = message
+        super().__init__(self.message)
+
+
+class InvalidPageCursorError(Exception):
+    """Raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self, message: str = "Invalid or expired page cursor"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an uploaded file exceeds the configured size limit."""
+
+    def __init__(self, message: str = "Uploaded file is too large"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class JobLeaseLostError(Exception):
+    """Raised when a job worker no longer holds the lease of its job."""
+
+    def __init__(
+        self, message: str = "Job lease expired and was taken over"
+    ):
+        self.message = message
+        super().__init__(self.message)
@@ -8,18 +8,45 @@ import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
+from api import IMPORT_STARTED
 from api.config import settings, setup_logging
-from api.database import init_db
-from api.routes import user_routes, clothing_routes, recommendation_routes
+from api.database import engine, init_db
+from api.routes import (
+    user_routes,
+    clothing_routes,
+    recommendation_routes,
+    system_routes,
+    job_routes,
+    metrics_routes,
+)
+from api.services.batch_service import shutdown_process_pool
+from api.services.compute_executor import (
+    get_compute_executor,
+    shutdown_compute_executor,
+)
+from api.services.http_cache import ImmutableStaticFiles
+from api.services.job_service import job_worker_pool
+from api.services.request_profiler import (
+    PROFILE_ID_HEADER,
+    ProfilingMiddleware,
+    install_sql_hooks,
+    is_enabled as profiling_enabled,
+)
+from api.services.storage_backend import close_storage_backend
+from api.services.score_tables import get_score_tables
+from api.services.startup import startup_phases, warm_up
 
 # Configure logging before anything else
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Application imports are the first startup phase; OpenCV and sklearn
+# are not part of it (see api.services.startup)
+startup_phases.record("imports", IMPORT_STARTED)
+
 
 @asynccontextmanager
 async def lifespan(application: FastAPI):
@@ -27,12 +54,31 @@ async def lifespan(application: FastAPI):
     Application lifespan handler.
     Runs database initialization on startup.
     Using lifespan instead of deprecated on_event decorator.
+
+    Every startup phase is timed and the breakdown logged. The
+    optional warm-up runs in the background, so the port is bound
+    without waiting for it.
     """
-    init_db()
+    with startup_phases.phase("init_db"):
+        init_db()
     # Ensure uploads dir exists for local image storage (when Cloudinary not used)
     Path("uploads").mkdir(exist_ok=True)
-    logger.info("Application started successfully")
+    # Compile recommendation rules into lookup tables once
+    with startup_phases.phase("score_tables"):
+        get_score_tables()
+    # Resume queued and interrupted upload jobs
+    with startup_phases.phase("job_workers"):
+        await job_worker_pool.start(settings.job_workers)
+    if settings.warmup_on_startup:
+        warm_up.start()
+    logger.info(
+        "Application started successfully in %s", startup_phases.summary()
+    )
     yield
+    await job_worker_pool.stop()
+    await close_storage_backend()
+    shutdown_compute_executor()
+    shutdown_process_pool()
     logger.info("Application shutting down")
 
 
@@ -62,18 +108,38 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Let the web app read validators, job locations and page links
+        expose_headers=[
+            "ETag",
+            "Last-Modified",
+            "Location",
+            "Link",
+            "X-Next-Cursor",
+            PROFILE_ID_HEADER,
+        ],
     )
 
+    # Profile requests that present the secret (never installed without)
+    if profiling_enabled():
+        application.add_middleware(ProfilingMiddleware)
+        install_sql_hooks(engine)
+
     # Serve locally uploaded images (when Cloudinary is not configured)
     # Create uploads dir before mounting (required on Render; lifespan runs later)
     uploads_dir = Path("uploads")
     uploads_dir.mkdir(exist_ok=True)
-    application.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+    # Stored files never change under a path, so clients may cache them
+    application.mount(
+        "/uploads", ImmutableStaticFiles(directory="uploads"), name="uploads"
+    )
 
     # Register route modules
     application.include_router(user_routes.router)
     application.include_router(clothing_routes.router)
     application.include_router(recommendation_routes.router)
+    application.include_router(system_routes.router)
+    application.include_router(job_routes.router)
+    application.include_router(metrics_routes.router)
 
     @application.get("/", tags=["Health"])
     def health_check():
@@ -81,6 +147,28 @@ def create_app() -> FastAPI:
         return {
             "status": "healthy",
             "app": settings.app_name,
+            "compute": get_compute_executor().stats(),
+        }
+
+    @application.get(
+        "/ready",
+        tags=["Health"],
+        responses={503: {"description": "Still warming up"}},
+    )
+    def readiness_check(response: Response):
+        """
+        Whether every endpoint is ready to answer at full speed.
+
+        Returns 503 while the startup warm-up is still loading the
+        image analysis libraries (or after it failed); cheap endpoints
+        already work then. Also reports the startup-time breakdown.
+        """
+        if not warm_up.ready:
+            response.status_code = 503
+        return {
+            "ready": warm_up.ready,
+            "warmup": warm_up.status(),
+            "startup_ms": startup_phases.as_dict(),
         }
 
     return application
@@ -0,0 +1,35 @@
+"""
+SQLAlchemy model for cached image analysis results.
+
+Rows are keyed by the SHA-256 of the uploaded bytes, so re-uploading
+an identical photo can reuse the stored image URL and the analysis
+result instead of uploading and analyzing it again. The key also
+holds a fingerprint of the analysis configuration, so results of an
+earlier version or engine are never served after a change.
+"""
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+
+from api.database import Base
+
+
+class AnalysisCacheEntry(Base):
+    """
+    Analysis result for one image, per analysis kind.
+
+    For clothing analysis the labels are the dominant and secondary
+    colors; for skin analysis they are the skin tone and undertone.
+    """
+
+    __tablename__ = "analysis_cache"
+
+    kind = Column(String, primary_key=True)
+    content_hash = Column(String(64), primary_key=True)
+    analysis_config = Column(String(64), primary_key=True)
+    image_url = Column(String, nullable=False)
+    primary_label = Column(String, nullable=True)
+    secondary_label = Column(String, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
@@ -1,13 +1,14 @@
 """
 SQLAlchemy model for clothing items.
 
-Each row represents one piece of clothing in the user's wardrobe
+Each row represents one piece of clothing in a user's wardrobe
 with its color analysis results and manually-provided metadata.
 """
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.sql import func
 
 from api.database import Base
+from api.models.user import DEFAULT_USER_ID
 
 
 class Clothing(Base):
@@ -17,11 +18,38 @@ class Clothing(Base):
     dominant_color and secondary_color are extracted via KMeans analysis.
     clothing_type, occasion, and season are manual inputs for MVP
     (automatic classification would require deep learning).
+
+    Every query reads a single user's items, so all indexes lead with
+    user_id: a request touches only that user's part of the table.
+    user_id has no foreign key because items may be uploaded before
+    the user's profile row exists.
     """
 
     __tablename__ = "clothing_items"
+    __table_args__ = (
+        # Keyset pagination and streaming walk a user's rows in order
+        Index(
+            "ix_clothing_items_user_created_at_id",
+            "user_id",
+            "created_at",
+            "id",
+        ),
+        # Covers the SQL ranking query: score columns plus tie-breaks
+        Index(
+            "ix_clothing_items_user_scoring",
+            "user_id",
+            "occasion",
+            "season",
+            "dominant_color",
+            "created_at",
+            "id",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(
+        Integer, nullable=False, server_default=str(DEFAULT_USER_ID)
+    )
     image_url = Column(String, nullable=False)
     dominant_color = Column(String, nullable=True)
     secondary_color = Column(String, nullable=True)
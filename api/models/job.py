@@ -0,0 +1,64 @@
+"""
+SQLAlchemy model for asynchronous analysis jobs.
+
+The jobs table doubles as a durable work queue: the raw upload is kept
+in the row until the job succeeds, so queued and in-flight work
+survives restarts without an external broker.
+"""
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+)
+from sqlalchemy.sql import func
+
+from api.database import Base
+from api.models.user import DEFAULT_USER_ID
+
+
+class AnalysisJob(Base):
+    """
+    One queued upload (clothing image or profile photo).
+
+    params holds the JSON-encoded form fields of the original request
+    and result the JSON-encoded response once the job has succeeded.
+    Jobs are visible only to the user who queued them.
+    locked_until is the lease of the worker currently running the job;
+    an expired lease means that worker died and the job can be retried.
+    lease_owner identifies that worker's claim, so a worker whose job
+    was re-claimed after its lease expired cannot update it anymore.
+    """
+
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_next_run", "status", "next_run_at"),
+    )
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(
+        Integer, nullable=False, server_default=str(DEFAULT_USER_ID)
+    )
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    stage = Column(String, nullable=True)
+    params = Column(Text, nullable=False, default="{}")
+    payload = Column(LargeBinary, nullable=True)
+    result = Column(Text, nullable=True)
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_run_at = Column(DateTime(timezone=True), nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    lease_owner = Column(String(32), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
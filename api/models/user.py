@@ -3,13 +3,19 @@ SQLAlchemy model for user profile.
 
 Stores skin analysis results that the recommendation engine
 uses to suggest color-compatible outfits.
-Single-user MVP - no authentication, just one profile row.
+No authentication: users are identified by the id their requests
+send in X-User-Id (see api.services.current_user), and the row is
+created by their first photo upload.
 """
 from sqlalchemy import Column, Integer, String, DateTime
 from sqlalchemy.sql import func
 
 from api.database import Base
 
+# User of requests that do not name one, and owner of every row written
+# before wardrobes were per user
+DEFAULT_USER_ID = 1
+
 
 class User(Base):
     """
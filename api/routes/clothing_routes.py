@@ -2,94 +2,146 @@
 API routes for clothing item management.
 
 Handles clothing image upload with color analysis
-and retrieval of all wardrobe items.
+and paginated or streamed retrieval of wardrobe items,
+always within the wardrobe of the X-User-Id user.
 """
+import asyncio
 import logging
+from typing import Optional
 
 from fastapi import (
     APIRouter,
     Depends,
     File,
     Form,
+    Header,
+    Query,
+    Request,
+    Response,
     UploadFile,
     HTTPException,
 )
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from api.database import get_db
+from api.config import settings
+from api.database import SessionLocal, get_db
 from api.models.clothing import Clothing
-from api.schemas.clothing_schema import ClothingResponse
-from api.constants.enums import ClothingType, OccasionType, SeasonType
-from api.services.image_service import (
-    upload_image_to_cloudinary,
-    decode_image_from_bytes,
-    resize_image_for_processing,
+from api.schemas.clothing_schema import (
+    ClothingResponse,
+    BatchUploadItemResult,
+    BatchUploadResponse,
+)
+from api.schemas.job_schema import JobAcceptedResponse
+from api.constants.enums import (
+    ClothingType,
+    JobKind,
+    OccasionType,
+    SeasonType,
+)
+from api.services.storage_backend import get_storage_backend
+from api.services.batch_service import analyze_clothing_batch
+from api.services.current_user import get_user_id
+from api.services.ingest_service import ingest_clothing
+from api.services.job_service import enqueue_job
+from api.services.metrics import PIPELINE_BATCH, stage_timer
+from api.services.upload_reader import read_upload
+from api.services.wardrobe_store import ITEM_COLUMNS, wardrobe_store
+from api.services.pagination import decode_cursor, encode_cursor
+from api.services.request_profiler import ProfilingRoute
+from api.services.http_cache import (
+    etag_matches,
+    http_date,
+    not_modified,
+    strong_etag,
+    unmodified_since,
+)
+from api.routes.job_routes import job_accepted_response
+from api.services.analysis_cache import (
+    CLOTHING_ANALYSIS,
+    CachedAnalysis,
+    analysis_cache,
+    content_hash,
 )
-from api.services.color_service import get_clothing_colors
 from api.exceptions.custom_exceptions import (
     ImageProcessingError,
     CloudinaryUploadError,
+    InvalidClothingMetadataError,
+    ComputeQueueFullError,
+    InvalidPageCursorError,
+    UploadTooLargeError,
 )
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/clothing", tags=["Clothing"])
+router = APIRouter(
+    prefix="/clothing", tags=["Clothing"], route_class=ProfilingRoute
+)
 
 
-@router.post("/upload", response_model=ClothingResponse)
+@router.post(
+    "/upload",
+    response_model=ClothingResponse,
+    responses={202: {"model": JobAcceptedResponse}},
+)
 async def upload_clothing(
     image: UploadFile = File(...),
     clothing_type: ClothingType = Form(...),
     occasion: OccasionType = Form(...),
     season: SeasonType = Form(...),
+    async_mode: bool = Query(
+        False,
+        description=(
+            "Queue the upload and answer 202 with a job to follow "
+            "instead of waiting for analysis and storage"
+        ),
+    ),
     db: Session = Depends(get_db),
+    user_id: int = Depends(get_user_id),
 ):
     """
     Upload a clothing image with metadata.
 
     Process:
-    1. Upload image to Cloudinary for persistent storage
-    2. Decode and resize for efficient processing
-    3. Extract dominant colors via KMeans clustering
+    1. Decode and resize for efficient processing
+    2. Extract dominant colors via KMeans clustering
+    3. Upload image to Cloudinary for persistent storage
     4. Store clothing record with colors and metadata
 
+    With async_mode the image is queued and the response is a 202
+    pointing at /jobs/{job_id}; the job's result is this endpoint's
+    normal response body.
+
     clothing_type, occasion, and season are manual inputs for MVP
     because automatic classification would require deep learning.
     """
     try:
-        image_bytes = await image.read()
+        image_bytes = await read_upload(image)
 
-        # Upload to Cloudinary for persistent storage
-        image_url = upload_image_to_cloudinary(
-            image_bytes, folder="clothing"
-        )
+        if async_mode:
+            job = enqueue_job(
+                db,
+                user_id,
+                JobKind.CLOTHING_UPLOAD,
+                image_bytes,
+                {
+                    "clothing_type": clothing_type.value,
+                    "occasion": occasion.value,
+                    "season": season.value,
+                },
+            )
+            return job_accepted_response(job)
 
-        # Decode, resize, and extract colors
-        cv_image = decode_image_from_bytes(image_bytes)
-        resized = resize_image_for_processing(cv_image)
-        primary_color, secondary_color = get_clothing_colors(resized)
-
-        # Create clothing record in database
-        clothing_item = Clothing(
-            image_url=image_url,
-            dominant_color=primary_color,
-            secondary_color=secondary_color,
-            clothing_type=clothing_type.value,
-            occasion=occasion.value,
-            season=season.value,
-        )
-        db.add(clothing_item)
-        db.commit()
-        db.refresh(clothing_item)
-
-        logger.info(
-            "Clothing uploaded: type=%s, color=%s",
-            clothing_type.value,
-            primary_color,
+        return await ingest_clothing(
+            db, user_id, image_bytes, clothing_type, occasion, season
         )
 
-        return clothing_item
-
+    except UploadTooLargeError as exc:
+        raise HTTPException(
+            status_code=413, detail=exc.message
+        ) from exc
     except ImageProcessingError as exc:
         raise HTTPException(
             status_code=422, detail=exc.message
@@ -98,6 +150,12 @@ async def upload_clothing(
         raise HTTPException(
             status_code=502, detail=exc.message
         ) from exc
+    except ComputeQueueFullError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=exc.message,
+            headers={"Retry-After": "1"},
+        ) from exc
     except Exception as exc:
         logger.error(
             "Unexpected error during clothing upload: %s", str(exc)
@@ -111,8 +169,304 @@ async def upload_clothing(
         ) from exc
 
 
-@router.get("/all", response_model=list[ClothingResponse])
-def get_all_clothing(db: Session = Depends(get_db)):
-    """Retrieve all clothing items in the wardrobe."""
-    items = db.query(Clothing).all()
-    return items
+@router.post("/upload-batch", response_model=BatchUploadResponse)
+async def upload_clothing_batch(
+    images: list[UploadFile] = File(...),
+    clothing_type: list[ClothingType] = Form(...),
+    occasion: list[OccasionType] = Form(...),
+    season: list[SeasonType] = Form(...),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_user_id),
+):
+    """
+    Upload many clothing images at once.
+
+    Metadata fields are repeated once per image, in the same order
+    as the images. Process:
+    1. Look up previously analyzed images by content hash
+    2. Analyze colors for the rest in parallel worker processes
+    3. Upload successfully analyzed images to storage concurrently
+    4. Insert all clothing records in a single commit
+
+    A failing image is reported in its own result entry and does not
+    abort the rest of the batch.
+    """
+    try:
+        item_count = len(images)
+        if item_count > settings.batch_upload_max_items:
+            raise InvalidClothingMetadataError(
+                f"Too many images in one batch: {item_count} "
+                f"(max {settings.batch_upload_max_items})"
+            )
+        if not (
+            len(clothing_type) == len(occasion) == len(season) == item_count
+        ):
+            raise InvalidClothingMetadataError(
+                "clothing_type, occasion and season must be given "
+                "once per uploaded image"
+            )
+
+        images_bytes = [await read_upload(image) for image in images]
+        digests = [content_hash(image_bytes) for image_bytes in images_bytes]
+        errors: list[Optional[str]] = [None] * item_count
+
+        # Reuse earlier results for images that were uploaded before;
+        # identical images within the batch are analyzed only once
+        analyses: dict[int, CachedAnalysis] = {}
+        pending: dict[str, list[int]] = {}
+        with stage_timer(PIPELINE_BATCH, "cache_lookup"):
+            for index, digest in enumerate(digests):
+                cached = analysis_cache.lookup(db, CLOTHING_ANALYSIS, digest)
+                if cached is not None:
+                    analyses[index] = cached
+                else:
+                    pending.setdefault(digest, []).append(index)
+        fresh = [indices[0] for indices in pending.values()]
+
+        # Decode, resize, and extract colors across the process pool
+        with stage_timer(PIPELINE_BATCH, "analysis"):
+            colors = await analyze_clothing_batch(
+                [images_bytes[i] for i in fresh]
+            )
+
+        # Upload analyzed images without blocking the event loop
+        analyzed = [
+            (index, labels)
+            for index, (labels, _) in zip(fresh, colors)
+            if labels is not None
+        ]
+        storage = get_storage_backend()
+        with stage_timer(PIPELINE_BATCH, "storage"):
+            uploads = await asyncio.gather(
+                *(
+                    storage.store(images_bytes[index], "clothing")
+                    for index, _ in analyzed
+                ),
+                return_exceptions=True,
+            )
+        for index, (_, error) in zip(fresh, colors):
+            errors[index] = error
+        new_analyses: dict[str, CachedAnalysis] = {}
+        for (index, labels), upload in zip(analyzed, uploads):
+            if isinstance(upload, Exception):
+                # Per-item error; the batch's other images carry on
+                errors[index] = getattr(upload, "message", None) or str(
+                    upload
+                )
+                logger.warning(
+                    "Batch storage failed for %s: %s",
+                    images[index].filename,
+                    errors[index],
+                )
+                continue
+            if isinstance(upload, BaseException):
+                raise upload
+            analyses[index] = CachedAnalysis(upload, *labels)
+            new_analyses[digests[index]] = analyses[index]
+
+        # Copy each fresh outcome to its in-batch duplicates
+        for index in fresh:
+            for duplicate in pending[digests[index]][1:]:
+                errors[duplicate] = errors[index]
+                if index in analyses:
+                    analyses[duplicate] = analyses[index]
+
+        # Create all clothing records and commit them together
+        clothing_items: dict[int, Clothing] = {
+            index: Clothing(
+                user_id=user_id,
+                image_url=analysis.image_url,
+                dominant_color=analysis.primary_label,
+                secondary_color=analysis.secondary_label,
+                clothing_type=clothing_type[index].value,
+                occasion=occasion[index].value,
+                season=season[index].value,
+            )
+            for index, analysis in sorted(analyses.items())
+        }
+
+        if clothing_items:
+            db.add_all(clothing_items.values())
+            with stage_timer(PIPELINE_BATCH, "db_commit"):
+                db.commit()
+            # Reload all new rows (ids, created_at) in one query
+            with stage_timer(PIPELINE_BATCH, "db_refresh"):
+                db.query(Clothing).filter(
+                    Clothing.id.in_(
+                        [item.id for item in clothing_items.values()]
+                    )
+                ).all()
+            wardrobe_store.add_items(user_id, clothing_items.values())
+
+        results = [
+            BatchUploadItemResult(
+                index=index,
+                filename=images[index].filename,
+                clothing=(
+                    ClothingResponse.model_validate(clothing_items[index])
+                    if index in clothing_items
+                    else None
+                ),
+                error=errors[index],
+            )
+            for index in range(item_count)
+        ]
+
+        if new_analyses:
+            with stage_timer(PIPELINE_BATCH, "cache_store"):
+                analysis_cache.store_many(
+                    db, CLOTHING_ANALYSIS, new_analyses
+                )
+
+        logger.info(
+            "Clothing batch uploaded: items=%d, succeeded=%d",
+            item_count,
+            len(clothing_items),
+        )
+
+        return BatchUploadResponse(
+            results=results,
+            succeeded=len(clothing_items),
+            failed=item_count - len(clothing_items),
+        )
+
+    except InvalidClothingMetadataError as exc:
+        raise HTTPException(
+            status_code=400, detail=exc.message
+        ) from exc
+    except UploadTooLargeError as exc:
+        raise HTTPException(
+            status_code=413, detail=exc.message
+        ) from exc
+    except Exception as exc:
+        logger.error(
+            "Unexpected error during batch clothing upload: %s", str(exc)
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=(
+                "An unexpected error occurred "
+                "while processing the clothing batch"
+            ),
+        ) from exc
+
+
+_clothing_list = TypeAdapter(list[ClothingResponse])
+
+
+@router.get(
+    "/all",
+    response_model=list[ClothingResponse],
+    responses={304: {"description": "Page unchanged (ETag match)"}},
+)
+def get_all_clothing(
+    request: Request,
+    cursor: Optional[str] = Query(
+        None,
+        description="X-Next-Cursor value from the previous page",
+    ),
+    limit: int = Query(
+        settings.clothing_page_size,
+        ge=1,
+        le=settings.clothing_page_max_size,
+    ),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_user_id),
+):
+    """
+    Retrieve one page of wardrobe items, oldest first.
+
+    Pages are keyset-paginated on (created_at, id). While more items
+    follow, the response carries an X-Next-Cursor header (and a Link
+    rel="next") to pass back as cursor. The body stays a plain array.
+    Served from the in-memory wardrobe store; pages carry ETag and
+    Last-Modified so unchanged pages can be revalidated with a 304.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        items, has_more = wardrobe_store.read(db, user_id).wardrobe.page(
+            after, limit
+        )
+    except InvalidPageCursorError as exc:
+        raise HTTPException(
+            status_code=400, detail=exc.message
+        ) from exc
+
+    body = _clothing_list.dump_json(
+        _clothing_list.validate_python(items, from_attributes=True)
+    )
+    headers = {"ETag": strong_etag(body), "Cache-Control": "no-cache"}
+    last_modified = max(
+        (item.created_at for item in items if item.created_at is not None),
+        default=None,
+    )
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if has_more:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+        next_url = request.url.include_query_params(
+            cursor=next_cursor, limit=limit
+        )
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    # If-Modified-Since only applies when no If-None-Match was sent
+    if (
+        etag_matches(if_none_match, headers["ETag"])
+        if if_none_match
+        else unmodified_since(if_modified_since, last_modified)
+    ):
+        return not_modified(headers)
+    return Response(
+        content=body, media_type="application/json", headers=headers
+    )
+
+
+def _clothing_ndjson(user_id: int):
+    """
+    Yield every clothing row of the user as NDJSON, oldest first.
+
+    Rows come from a server-side cursor in batches of
+    clothing_stream_batch_size, so memory stays bounded by one batch
+    however large the table is. The session is owned by the generator
+    because the response body outlives the request's dependencies.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            select(*ITEM_COLUMNS)
+            .where(Clothing.user_id == user_id)
+            .order_by(Clothing.created_at.asc().nulls_last(), Clothing.id)
+            .execution_options(
+                yield_per=settings.clothing_stream_batch_size
+            )
+        )
+        for rows in result.partitions():
+            yield b"".join(
+                ClothingResponse.model_validate(row).model_dump_json()
+                .encode()
+                + b"\n"
+                for row in rows
+            )
+    finally:
+        db.close()
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+def stream_clothing(user_id: int = Depends(get_user_id)):
+    """
+    Stream the user's whole wardrobe as newline-delimited JSON.
+
+    One ClothingResponse object per line, ordered by (created_at, id).
+    Read straight from the database, so it also covers rows written
+    by other processes that the wardrobe store has not picked up yet.
+    """
+    return StreamingResponse(
+        _clothing_ndjson(user_id), media_type="application/x-ndjson"
+    )
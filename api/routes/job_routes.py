@@ -0,0 +1,133 @@
+"""
+API routes for asynchronous upload jobs.
+
+Clients that submitted an upload with async_mode=true follow it here,
+either by polling the status endpoint or by keeping one Server-Sent
+Events connection open until the job finishes.
+"""
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.database import SessionLocal, get_db
+from api.models.job import AnalysisJob
+from api.schemas.job_schema import JobAcceptedResponse, JobStatusResponse
+from api.services.current_user import get_user_id
+from api.services.job_service import TERMINAL_STATUSES
+from api.services.request_profiler import ProfilingRoute
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"], route_class=ProfilingRoute)
+
+
+def _to_status_response(job: AnalysisJob) -> JobStatusResponse:
+    return JobStatusResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        stage=job.stage,
+        attempts=job.attempts,
+        error=job.error,
+        result=json.loads(job.result) if job.result else None,
+        next_run_at=job.next_run_at,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+def job_accepted_response(job: AnalysisJob) -> JSONResponse:
+    """202 Accepted pointing the client at the job's status endpoints."""
+    status_url = f"{router.prefix}/{job.id}"
+    body = JobAcceptedResponse(
+        job_id=job.id,
+        status=job.status,
+        status_url=status_url,
+        events_url=f"{status_url}/events",
+    )
+    return JSONResponse(
+        status_code=202,
+        content=body.model_dump(mode="json"),
+        headers={"Location": status_url},
+    )
+
+
+def _get_job(
+    db: Session, job_id: str, user_id: int
+) -> Optional[AnalysisJob]:
+    """The job, unless it does not exist or belongs to another user."""
+    job = db.get(AnalysisJob, job_id)
+    return job if job is not None and job.user_id == user_id else None
+
+
+def _load_status(job_id: str, user_id: int) -> Optional[JobStatusResponse]:
+    """Read one job in a short-lived session (used by the SSE loop)."""
+    db = SessionLocal()
+    try:
+        job = _get_job(db, job_id, user_id)
+        return _to_status_response(job) if job is not None else None
+    finally:
+        db.close()
+
+
+def _job_not_found(job_id: str) -> HTTPException:
+    return HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+def get_job_status(
+    job_id: str,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_user_id),
+):
+    """Current status, stage, and (once finished) result of a job."""
+    job = _get_job(db, job_id, user_id)
+    if job is None:
+        raise _job_not_found(job_id)
+    return _to_status_response(job)
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str, user_id: int = Depends(get_user_id)
+):
+    """
+    Stream job progress as Server-Sent Events.
+
+    An event is sent whenever status, stage, or attempt count changes;
+    the stream closes after the succeeded or failed event.
+    """
+    if await run_in_threadpool(_load_status, job_id, user_id) is None:
+        raise _job_not_found(job_id)
+
+    async def event_stream():
+        last_state = None
+        while True:
+            status = await run_in_threadpool(
+                _load_status, job_id, user_id
+            )
+            if status is None:
+                return
+            state = (status.status, status.stage, status.attempts)
+            if state != last_state:
+                last_state = state
+                yield (
+                    f"event: {status.status.value}\n"
+                    f"data: {status.model_dump_json()}\n\n"
+                )
+            if status.status.value in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(settings.job_poll_interval_seconds)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,170 @@
+"""
+Prometheus scrape endpoint.
+
+/metrics serves the stage latency histograms and error counters
+recorded by api.services.metrics. It also serves cache, database
+pool and compute executor figures, which are read from their own
+counters at scrape time rather than recorded twice.
+"""
+from fastapi import APIRouter, Response
+
+from api.database import pool_monitor, pool_stats
+from api.services.analysis_cache import analysis_cache
+from api.services.compute_executor import get_compute_executor
+from api.services.metrics import CONTENT_TYPE, metrics_registry, render_family
+from api.services.recommendation_cache import recommendation_cache
+from api.services.wardrobe_store import wardrobe_store
+from api.services.request_profiler import ProfilingRoute
+
+router = APIRouter(tags=["System"], route_class=ProfilingRoute)
+
+CHECKOUT_WAIT_SECONDS = metrics_registry.histogram(
+    "stylesavvy_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a free database connection.",
+)
+
+# Analysis cache outcome label -> key in AnalysisCache.stats()
+_ANALYSIS_OUTCOMES = (
+    ("memory_hit", "memory_hits"),
+    ("db_hit", "db_hits"),
+    ("miss", "misses"),
+)
+
+
+def _cache_metrics() -> list[str]:
+    analysis = analysis_cache.stats()
+    recommendations = recommendation_cache.stats()
+    wardrobes = wardrobe_store.stats()
+    return [
+        *render_family(
+            "stylesavvy_analysis_cache_lookups_total",
+            "counter",
+            "Image analysis cache lookups by analysis kind and outcome.",
+            (
+                ({"kind": kind, "outcome": outcome}, counts[key])
+                for kind, counts in sorted(analysis["kinds"].items())
+                for outcome, key in _ANALYSIS_OUTCOMES
+            ),
+        ),
+        *render_family(
+            "stylesavvy_recommendation_cache_lookups_total",
+            "counter",
+            "Recommendation response cache lookups by outcome.",
+            [
+                ({"outcome": "hit"}, recommendations["hits"]),
+                ({"outcome": "miss"}, recommendations["misses"]),
+            ],
+        ),
+        *render_family(
+            "stylesavvy_cache_entries",
+            "gauge",
+            "Entries held by the in-memory caches.",
+            [
+                ({"cache": "analysis"}, analysis["memory"]["entries"]),
+                ({"cache": "recommendations"}, recommendations["entries"]),
+                ({"cache": "wardrobes"}, wardrobes["entries"]),
+            ],
+        ),
+        *render_family(
+            "stylesavvy_cache_bytes",
+            "gauge",
+            "Estimated bytes held by the memory-budgeted caches.",
+            [
+                ({"cache": "recommendations"}, recommendations["weight"]),
+                ({"cache": "wardrobes"}, wardrobes["weight"]),
+            ],
+        ),
+        *render_family(
+            "stylesavvy_cache_evictions_total",
+            "counter",
+            "Entries evicted from the in-memory caches.",
+            [
+                ({"cache": "analysis"}, analysis["memory"]["evictions"]),
+                (
+                    {"cache": "recommendations"},
+                    recommendations["evictions"],
+                ),
+                ({"cache": "wardrobes"}, wardrobes["evictions"]),
+            ],
+        ),
+    ]
+
+
+def _pool_metrics() -> list[str]:
+    stats = pool_stats()
+    lines = []
+    for name, kind, documentation, key in (
+        (
+            "stylesavvy_db_pool_checked_out",
+            "gauge",
+            "Database connections currently in use.",
+            "checked_out",
+        ),
+        (
+            "stylesavvy_db_pool_checkouts_total",
+            "counter",
+            "Database connections handed out by the pool.",
+            "checkouts",
+        ),
+        (
+            "stylesavvy_db_pool_checkout_timeouts_total",
+            "counter",
+            "Checkouts that gave up waiting for a free connection.",
+            "checkout_timeouts",
+        ),
+        (
+            "stylesavvy_db_pool_connections_opened_total",
+            "counter",
+            "Database connections opened.",
+            "connections_opened",
+        ),
+        (
+            "stylesavvy_db_pool_size",
+            "gauge",
+            "Connections the pool keeps open.",
+            "size",
+        ),
+    ):
+        if key in stats:
+            lines.extend(
+                render_family(name, kind, documentation, [({}, stats[key])])
+            )
+    return lines
+
+
+def _compute_metrics() -> list[str]:
+    stats = get_compute_executor().stats()
+    return [
+        *render_family(
+            "stylesavvy_compute_in_flight",
+            "gauge",
+            "Image analyses running or queued on the compute executor.",
+            [({}, stats["in_flight"])],
+        ),
+        *render_family(
+            "stylesavvy_compute_capacity",
+            "gauge",
+            "Analyses the compute executor accepts before rejecting.",
+            [({}, stats["capacity"])],
+        ),
+        *render_family(
+            "stylesavvy_compute_rejected_total",
+            "counter",
+            "Analyses rejected because the compute executor was full.",
+            [({}, stats["rejected"])],
+        ),
+    ]
+
+
+pool_monitor.on_wait(CHECKOUT_WAIT_SECONDS.observe)
+metrics_registry.register_collector(_cache_metrics)
+metrics_registry.register_collector(_pool_metrics)
+metrics_registry.register_collector(_compute_metrics)
+
+
+@router.get("/metrics", response_class=Response)
+def get_metrics():
+    """Stage latencies, errors, cache hits and pool/executor load."""
+    return Response(
+        content=metrics_registry.render(), media_type=CONTENT_TYPE
+    )
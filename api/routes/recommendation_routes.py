@@ -2,41 +2,255 @@
 API routes for outfit recommendations.
 
 Accepts event context (event, weather, time of day),
-runs the scoring engine against all wardrobe items,
+runs the scoring engine against the user's wardrobe items,
 and returns the top-scoring outfits with explanations.
 """
 import logging
+from typing import Callable, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+)
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from api.config import settings
+from api.constants.score_weights import MAX_OUTFITS_COUNT, TOP_OUTFITS_COUNT
 from api.database import get_db
-from api.models.user import User
-from api.models.clothing import Clothing
-from api.constants.enums import SkinTone, SkinUndertone
 from api.schemas.clothing_schema import (
+    BatchRecommendationRequest,
+    BatchRecommendationResponse,
+    OutfitPiece,
+    OutfitRecommendationResponse,
     RecommendationRequest,
     RecommendationResponse,
     ScoredClothing,
+    ScoredOutfit,
     ClothingResponse,
 )
-from api.services.recommendation_service import get_top_recommendations
+from api.services.current_user import get_user_id
+from api.services.outfit_service import top_outfits
+from api.services.ranking_service import rank_clothing, rank_clothing_batch
+from api.services.recommendation_service import score_clothing_item
+from api.services.wardrobe_store import WardrobeState, wardrobe_store
+from api.services.recommendation_cache import recommendation_cache
+from api.services.http_cache import etag_matches, not_modified, strong_etag
+from api.services.metrics import PIPELINE_RECOMMENDATION, stage_timer
+from api.services.request_profiler import ProfilingRoute
 from api.exceptions.custom_exceptions import RecommendationInputError
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/recommendation", tags=["Recommendation"])
+router = APIRouter(
+    prefix="/recommendation",
+    tags=["Recommendation"],
+    route_class=ProfilingRoute,
+)
+
+
+def _check_wardrobe(state: WardrobeState) -> None:
+    """Reject empty wardrobes; warn when there is no skin profile."""
+    if state.profile.skin_tone is None:
+        logger.warning(
+            "No skin profile found. "
+            "Recommendations will be less personalized."
+        )
+
+    if not state.wardrobe.items:
+        raise RecommendationInputError(
+            "No clothing items found. "
+            "Please upload some clothes first."
+        )
+
+
+def _recommendation_response(
+    request: RecommendationRequest, top_items: list
+) -> RecommendationResponse:
+    """Response for one context from its (item, score, reasons)."""
+    return RecommendationResponse(
+        suggestions=[
+            ScoredClothing(
+                clothing=ClothingResponse.model_validate(item),
+                score=score,
+                reasons=reasons,
+            )
+            for item, score, reasons in top_items
+        ],
+        event=request.event.value,
+        weather=request.weather.value,
+        time_of_day=request.time_of_day.value,
+    )
+
+
+def _build_recommendation(
+    request: RecommendationRequest,
+    state: WardrobeState,
+    db: Session,
+    user_id: int,
+) -> RecommendationResponse:
+    """Rank the user's wardrobe for the request context."""
+    wardrobe, profile = state.wardrobe, state.profile
+    _check_wardrobe(state)
+
+    # Score and rank clothing items
+    with stage_timer(PIPELINE_RECOMMENDATION, "rank"):
+        top_items = rank_clothing(
+            clothing_items=wardrobe.items,
+            event=request.event,
+            weather=request.weather,
+            time_of_day=request.time_of_day,
+            skin_tone=profile.skin_tone,
+            skin_undertone=profile.skin_undertone,
+            columns=wardrobe.columns,
+            db=db,
+            user_id=user_id,
+        )
+
+    # Build response with score explanations
+    response = _recommendation_response(request, top_items)
+
+    logger.info(
+        "Recommendation generated: event=%s, weather=%s, results=%d",
+        request.event.value,
+        request.weather.value,
+        len(response.suggestions),
+    )
+    return response
 
 
-@router.post("/suggest", response_model=RecommendationResponse)
+def _build_recommendations(
+    requests: list[RecommendationRequest], state: WardrobeState
+) -> list[RecommendationResponse]:
+    """Rank the user's wardrobe for several contexts in one pass."""
+    wardrobe, profile = state.wardrobe, state.profile
+    _check_wardrobe(state)
+
+    with stage_timer(PIPELINE_RECOMMENDATION, "rank_batch"):
+        rankings = rank_clothing_batch(
+            wardrobe.items,
+            [
+                (request.event, request.weather, request.time_of_day)
+                for request in requests
+            ],
+            profile.skin_tone,
+            profile.skin_undertone,
+            columns=wardrobe.columns,
+        )
+    return [
+        _recommendation_response(request, top_items)
+        for request, top_items in zip(requests, rankings)
+    ]
+
+
+def _build_outfits(
+    request: RecommendationRequest, state: WardrobeState, limit: int
+) -> OutfitRecommendationResponse:
+    """Compose the best complete outfits for the request context."""
+    wardrobe, profile = state.wardrobe, state.profile
+
+    if not wardrobe.items:
+        raise RecommendationInputError(
+            "No clothing items found. "
+            "Please upload some clothes first."
+        )
+
+    context = (
+        request.event,
+        request.weather,
+        request.time_of_day,
+        profile.skin_tone,
+        profile.skin_undertone,
+    )
+    with stage_timer(PIPELINE_RECOMMENDATION, "outfit_search"):
+        found = top_outfits(
+            wardrobe.columns,
+            *context,
+            k=limit,
+            index=wardrobe.outfit_index,
+        )
+
+    # Reasons are only built for the pieces that are returned
+    outfits = [
+        ScoredOutfit(
+            pieces=[
+                OutfitPiece(
+                    role=role,
+                    clothing=ClothingResponse.model_validate(item),
+                    score=score,
+                    reasons=score_clothing_item(item, *context)[1],
+                )
+                for role, item, score in outfit.pieces
+            ],
+            score=outfit.score,
+            color_score=outfit.color_score,
+            color_reasons=outfit.color_reasons,
+        )
+        for outfit in found
+    ]
+
+    logger.info(
+        "Outfits generated: event=%s, weather=%s, results=%d",
+        request.event.value,
+        request.weather.value,
+        len(outfits),
+    )
+
+    return OutfitRecommendationResponse(
+        outfits=outfits,
+        event=request.event.value,
+        weather=request.weather.value,
+        time_of_day=request.time_of_day.value,
+    )
+
+
+def _cached_json(
+    key: tuple,
+    build: Callable[[], BaseModel],
+    if_none_match: Optional[str],
+) -> Response:
+    """
+    Serve the cached response body for key, building and caching it
+    on a miss; answers 304 when If-None-Match carries its ETag.
+    """
+    cached = recommendation_cache.get(key)
+    if cached is None:
+        with stage_timer(PIPELINE_RECOMMENDATION, "build"):
+            response = build()
+        with stage_timer(PIPELINE_RECOMMENDATION, "serialize"):
+            cached = recommendation_cache.put(
+                key, response.model_dump_json().encode()
+            )
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, cached.etag):
+        return not_modified(headers)
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.post(
+    "/suggest",
+    response_model=RecommendationResponse,
+    responses={304: {"description": "Suggestions unchanged (ETag match)"}},
+)
 def suggest_outfit(
     request: RecommendationRequest,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
+    user_id: int = Depends(get_user_id),
 ):
     """
     Generate outfit suggestions based on event, weather, and time of day.
 
-    Scores all clothing items against:
+    Scores all of the user's clothing items against:
     - Event/occasion match
     - Weather-appropriate colors and seasons
     - Skin tone and undertone compatibility
@@ -45,64 +259,118 @@ def suggest_outfit(
     Returns top 3 items sorted by score with reasoning.
     Works without a user profile, but recommendations are
     more personalized when skin analysis data is available.
+
+    Responses are cached until the wardrobe or profile changes and
+    carry an ETag; sending it back as If-None-Match returns 304.
     """
     try:
-        # Fetch user skin profile (optional for recommendations)
-        user = db.query(User).first()
-        skin_tone = None
-        skin_undertone = None
-
-        if user and user.skin_tone:
-            skin_tone = SkinTone(user.skin_tone)
-        if user and user.skin_undertone:
-            skin_undertone = SkinUndertone(user.skin_undertone)
-
-        if not user or not user.skin_tone:
-            logger.warning(
-                "No skin profile found. "
-                "Recommendations will be less personalized."
-            )
+        # Wardrobe and skin profile come from the in-memory store
+        with stage_timer(PIPELINE_RECOMMENDATION, "wardrobe_read"):
+            state = wardrobe_store.read(db, user_id)
+        key = recommendation_cache.key(
+            user_id,
+            request.event,
+            request.weather,
+            request.time_of_day,
+            state,
+        )
+        return _cached_json(
+            key,
+            lambda: _build_recommendation(request, state, db, user_id),
+            if_none_match,
+        )
 
-        # Fetch all clothing items
-        clothing_items = db.query(Clothing).all()
-        if not clothing_items:
+    except RecommendationInputError as exc:
+        raise HTTPException(
+            status_code=400, detail=exc.message
+        ) from exc
+    except Exception as exc:
+        logger.error("Recommendation error: %s", str(exc))
+        raise HTTPException(
+            status_code=500,
+            detail=(
+                "An unexpected error occurred "
+                "while generating recommendations"
+            ),
+        ) from exc
+
+
+@router.post(
+    "/suggest-batch",
+    response_model=BatchRecommendationResponse,
+    responses={304: {"description": "Suggestions unchanged (ETag match)"}},
+)
+def suggest_outfit_batch(
+    request: BatchRecommendationRequest,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_user_id),
+):
+    """
+    Generate suggestions for several contexts at once, e.g. the same
+    event by day and by night, or a week of forecast weather.
+
+    Each result is exactly what /suggest returns for its context, in
+    request order. The wardrobe and profile are read once, contexts
+    already answered (by /suggest or an earlier batch) come from the
+    response cache, and the rest are ranked together in a single
+    pass. At most RECOMMENDATION_BATCH_MAX_CONTEXTS contexts per
+    request. The combined response carries an ETag; sending it back
+    as If-None-Match returns 304.
+    """
+    try:
+        contexts = request.contexts
+        if not contexts:
+            raise RecommendationInputError("No contexts given.")
+        if len(contexts) > settings.recommendation_batch_max_contexts:
             raise RecommendationInputError(
-                "No clothing items found. "
-                "Please upload some clothes first."
+                f"Too many contexts in one batch: {len(contexts)} "
+                f"(max {settings.recommendation_batch_max_contexts})"
             )
 
-        # Score and rank clothing items
-        top_items = get_top_recommendations(
-            clothing_items=clothing_items,
-            event=request.event,
-            weather=request.weather,
-            time_of_day=request.time_of_day,
-            skin_tone=skin_tone,
-            skin_undertone=skin_undertone,
-        )
-
-        # Build response with score explanations
-        suggestions = [
-            ScoredClothing(
-                clothing=ClothingResponse.model_validate(item),
-                score=score,
-                reasons=reasons,
+        with stage_timer(PIPELINE_RECOMMENDATION, "wardrobe_read"):
+            state = wardrobe_store.read(db, user_id)
+        keys = [
+            recommendation_cache.key(
+                user_id,
+                context.event,
+                context.weather,
+                context.time_of_day,
+                state,
             )
-            for item, score, reasons in top_items
+            for context in contexts
         ]
 
-        logger.info(
-            "Recommendation generated: event=%s, weather=%s, results=%d",
-            request.event.value,
-            request.weather.value,
-            len(suggestions),
-        )
+        # Cached bodies per context; the rest are built in one pass
+        bodies: dict[tuple, bytes] = {}
+        missing: dict[tuple, RecommendationRequest] = {}
+        for key, context in zip(keys, contexts):
+            if key in bodies or key in missing:
+                continue
+            cached = recommendation_cache.get(key)
+            if cached is None:
+                missing[key] = context
+            else:
+                bodies[key] = cached.body
+        if missing:
+            with stage_timer(PIPELINE_RECOMMENDATION, "build"):
+                responses = _build_recommendations(
+                    list(missing.values()), state
+                )
+            with stage_timer(PIPELINE_RECOMMENDATION, "serialize"):
+                for key, response in zip(missing, responses):
+                    bodies[key] = recommendation_cache.put(
+                        key, response.model_dump_json().encode()
+                    ).body
 
-        return RecommendationResponse(
-            suggestions=suggestions,
-            event=request.event.value,
-            weather=request.weather.value,
-            time_of_day=request.time_of_day.value,
+        # Same bytes BatchRecommendationResponse.model_dump_json gives
+        body = b'{"results":[' + b",".join(map(bodies.get, keys)) + b"]}"
+        etag = strong_etag(body)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, etag):
+            return not_modified(headers)
+        return Response(
+            content=body, media_type="application/json", headers=headers
         )
 
     except RecommendationInputError as exc:
@@ -110,7 +378,7 @@ def suggest_outfit(
             status_code=400, detail=exc.message
         ) from exc
     except Exception as exc:
-        logger.error("Recommendation error: %s", str(exc))
+        logger.error("Batch recommendation error: %s", str(exc))
         raise HTTPException(
             status_code=500,
             detail=(
@@ -118,3 +386,59 @@ def suggest_outfit(
                 "while generating recommendations"
             ),
         ) from exc
+
+
+@router.post(
+    "/outfits",
+    response_model=OutfitRecommendationResponse,
+    responses={304: {"description": "Outfits unchanged (ETag match)"}},
+)
+def suggest_outfits(
+    request: RecommendationRequest,
+    limit: int = Query(TOP_OUTFITS_COUNT, ge=1, le=MAX_OUTFITS_COUNT),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_user_id),
+):
+    """
+    Suggest complete outfits for an event, weather, and time of day.
+
+    Each outfit is a top with a bottom, or a dress, plus a jacket or
+    blazer when one improves it (never in hot weather). Outfits are
+    scored with the same per-item rules as /suggest, plus points for
+    how the colors of every pair of pieces go together.
+
+    Returns the best `limit` outfits, highest score first, with the
+    reasoning for every piece and for the color pairing. Cached and
+    ETagged like /suggest.
+    """
+    try:
+        with stage_timer(PIPELINE_RECOMMENDATION, "wardrobe_read"):
+            state = wardrobe_store.read(db, user_id)
+        key = recommendation_cache.key(
+            user_id,
+            request.event,
+            request.weather,
+            request.time_of_day,
+            state,
+            variant=("outfits", limit),
+        )
+        return _cached_json(
+            key,
+            lambda: _build_outfits(request, state, limit),
+            if_none_match,
+        )
+
+    except RecommendationInputError as exc:
+        raise HTTPException(
+            status_code=400, detail=exc.message
+        ) from exc
+    except Exception as exc:
+        logger.error("Outfit recommendation error: %s", str(exc))
+        raise HTTPException(
+            status_code=500,
+            detail=(
+                "An unexpected error occurred "
+                "while generating outfits"
+            ),
+        ) from exc
@@ -0,0 +1,68 @@
+"""
+API routes for operational introspection.
+
+Exposes cache and database pool statistics so hit rates and
+pool pressure can be checked without attaching a debugger or
+scraping logs, and the reports of profiled requests.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from api.database import pool_stats
+from api.services.analysis_cache import analysis_cache
+from api.services.recommendation_cache import recommendation_cache
+from api.services.wardrobe_store import wardrobe_store
+from api.services.request_profiler import (
+    ProfilingRoute,
+    profile_store,
+    secret_matches,
+)
+
+router = APIRouter(
+    prefix="/system", tags=["System"], route_class=ProfilingRoute
+)
+
+
+@router.get("/cache-stats")
+def get_cache_stats():
+    """Hit/miss counts and hit rates of the in-process caches."""
+    return {
+        "analysis": analysis_cache.stats(),
+        "recommendations": recommendation_cache.stats(),
+        "wardrobes": wardrobe_store.stats(),
+    }
+
+
+@router.get("/db-pool")
+def get_db_pool_stats():
+    """Connection pool occupancy, checkout wait times and timeouts."""
+    return pool_stats()
+
+
+def _profile_report(profile_id: str, secret: Optional[str]) -> dict:
+    # Without the secret the endpoints do not exist as far as callers
+    # can tell, whether or not profiling is enabled
+    report = profile_store.get(profile_id) if secret_matches(secret) else None
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(
+    profile_id: str, x_profile: Optional[str] = Header(default=None)
+):
+    """Top functions, stack samples and SQL of a profiled request."""
+    return _profile_report(profile_id, x_profile)
+
+
+@router.get(
+    "/profiles/{profile_id}/collapsed", response_class=PlainTextResponse
+)
+def get_profile_collapsed(
+    profile_id: str, x_profile: Optional[str] = Header(default=None)
+):
+    """Collapsed stacks of a profiled request, for flame graph tools."""
+    return _profile_report(profile_id, x_profile)["collapsed_stacks"]
@@ -1,94 +1,85 @@
 """
 API routes for user profile and photo upload.
 
-Handles face photo upload, skin analysis, and profile retrieval.
-Single-user MVP - no authentication required.
+Handles face photo upload, skin analysis, and profile retrieval
+for the user named by the X-User-Id header.
 """
 import logging
 
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, File, Query, UploadFile, HTTPException
 from sqlalchemy.orm import Session
 
 from api.database import get_db
 from api.models.user import User
+from api.constants.enums import JobKind
+from api.schemas.job_schema import JobAcceptedResponse
 from api.schemas.user_schema import (
     UserProfileResponse,
     UserPhotoUploadResponse,
 )
-from api.services.image_service import (
-    upload_image_to_cloudinary,
-    decode_image_from_bytes,
-)
-from api.services.skin_tone_service import analyze_skin
+from api.services.current_user import get_user_id
+from api.services.ingest_service import ingest_user_photo
+from api.services.job_service import enqueue_job
+from api.services.upload_reader import read_upload
+from api.services.request_profiler import ProfilingRoute
+from api.routes.job_routes import job_accepted_response
 from api.exceptions.custom_exceptions import (
     ImageProcessingError,
     CloudinaryUploadError,
+    ComputeQueueFullError,
+    UploadTooLargeError,
 )
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/user", tags=["User"])
+router = APIRouter(prefix="/user", tags=["User"], route_class=ProfilingRoute)
 
 
 @router.post(
     "/upload-photo",
     response_model=UserPhotoUploadResponse,
+    responses={202: {"model": JobAcceptedResponse}},
 )
 async def upload_user_photo(
     photo: UploadFile = File(...),
+    async_mode: bool = Query(
+        False,
+        description=(
+            "Queue the photo and answer 202 with a job to follow "
+            "instead of waiting for analysis and storage"
+        ),
+    ),
     db: Session = Depends(get_db),
+    user_id: int = Depends(get_user_id),
 ):
     """
     Upload a user's face photo for skin tone analysis.
 
     Process:
-    1. Upload image to Cloudinary for persistent storage
-    2. Detect face and extract skin region
-    3. Classify skin tone and undertone
+    1. Detect face and extract skin region
+    2. Classify skin tone and undertone
+    3. Upload image to Cloudinary for persistent storage
     4. Create or update user profile in database
+
+    With async_mode the photo is queued and the response is a 202
+    pointing at /jobs/{job_id}; the job's result is this endpoint's
+    normal response body.
     """
     try:
-        image_bytes = await photo.read()
-
-        # Upload to Cloudinary for persistent storage
-        photo_url = upload_image_to_cloudinary(
-            image_bytes, folder="user-photos"
-        )
+        image_bytes = await read_upload(photo)
 
-        # Decode and analyze skin tone/undertone
-        image = decode_image_from_bytes(image_bytes)
-        skin_tone, skin_undertone = analyze_skin(image)
-
-        # Upsert user profile (single-user MVP: only one row)
-        user = db.query(User).first()
-        if user is None:
-            user = User(
-                photo_url=photo_url,
-                skin_tone=skin_tone.value,
-                skin_undertone=skin_undertone.value,
+        if async_mode:
+            job = enqueue_job(
+                db, user_id, JobKind.USER_PHOTO_UPLOAD, image_bytes, {}
             )
-            db.add(user)
-        else:
-            user.photo_url = photo_url
-            user.skin_tone = skin_tone.value
-            user.skin_undertone = skin_undertone.value
-
-        db.commit()
-        db.refresh(user)
-
-        logger.info(
-            "User photo processed: tone=%s, undertone=%s",
-            skin_tone.value,
-            skin_undertone.value,
-        )
+            return job_accepted_response(job)
 
-        return UserPhotoUploadResponse(
-            message="Photo analyzed successfully",
-            photo_url=photo_url,
-            skin_tone=skin_tone,
-            skin_undertone=skin_undertone,
-        )
+        return await ingest_user_photo(db, user_id, image_bytes)
 
+    except UploadTooLargeError as exc:
+        raise HTTPException(
+            status_code=413, detail=exc.message
+        ) from exc
     except ImageProcessingError as exc:
         raise HTTPException(
             status_code=422, detail=exc.message
@@ -97,6 +88,12 @@ async def upload_user_photo(
         raise HTTPException(
             status_code=502, detail=exc.message
         ) from exc
+    except ComputeQueueFullError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=exc.message,
+            headers={"Retry-After": "1"},
+        ) from exc
     except Exception as exc:
         logger.error(
             "Unexpected error during photo upload: %s", str(exc)
@@ -111,12 +108,14 @@ async def upload_user_photo(
 
 
 @router.get("/profile", response_model=UserProfileResponse)
-def get_user_profile(db: Session = Depends(get_db)):
+def get_user_profile(
+    db: Session = Depends(get_db), user_id: int = Depends(get_user_id)
+):
     """
     Retrieve the current user's profile including skin analysis results.
     Returns 404 if no photo has been uploaded yet.
     """
-    user = db.query(User).first()
+    user = db.get(User, user_id)
     if user is None:
         raise HTTPException(
             status_code=404,
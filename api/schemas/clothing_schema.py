@@ -7,7 +7,7 @@ Response schemas control what gets serialized to JSON.
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 
 from api.constants.enums import (
     ClothingType,
@@ -16,7 +16,9 @@ from api.constants.enums import (
     EventType,
     WeatherType,
     TimeOfDay,
+    OutfitRole,
 )
+from api.services.image_storage import derivative_url
 
 
 class ClothingUploadRequest(BaseModel):
@@ -42,10 +44,42 @@ class ClothingResponse(BaseModel):
     season: str
     created_at: datetime
 
+    @computed_field
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        """Small WebP copy for grids and lists (None for legacy images)."""
+        return derivative_url(self.image_url, "thumb")
+
+    @computed_field
+    @property
+    def medium_url(self) -> Optional[str]:
+        """Mid-size WebP copy for detail cards (None for legacy images)."""
+        return derivative_url(self.image_url, "medium")
+
     class Config:
         from_attributes = True
 
 
+class BatchUploadItemResult(BaseModel):
+    """
+    Outcome of one image in a batch upload.
+    Exactly one of clothing or error is set.
+    """
+
+    index: int
+    filename: Optional[str] = None
+    clothing: Optional[ClothingResponse] = None
+    error: Optional[str] = None
+
+
+class BatchUploadResponse(BaseModel):
+    """Per-item results for a batch clothing upload, in request order."""
+
+    results: list[BatchUploadItemResult]
+    succeeded: int
+    failed: int
+
+
 class RecommendationRequest(BaseModel):
     """
     Input parameters for the outfit recommendation engine.
@@ -72,3 +106,45 @@ class RecommendationResponse(BaseModel):
     event: str
     weather: str
     time_of_day: str
+
+
+class BatchRecommendationRequest(BaseModel):
+    """Several recommendation contexts to rank one wardrobe for."""
+
+    contexts: list[RecommendationRequest]
+
+
+class BatchRecommendationResponse(BaseModel):
+    """One recommendation response per requested context, in order."""
+
+    results: list[RecommendationResponse]
+
+
+class OutfitPiece(BaseModel):
+    """One clothing item of an outfit and the role it plays in it."""
+
+    role: OutfitRole
+    clothing: ClothingResponse
+    score: int
+    reasons: list[str]
+
+
+class ScoredOutfit(BaseModel):
+    """
+    A complete outfit. score is the pieces' item scores plus
+    color_score, the color points of every pair of pieces.
+    """
+
+    pieces: list[OutfitPiece]
+    score: int
+    color_score: int
+    color_reasons: list[str]
+
+
+class OutfitRecommendationResponse(BaseModel):
+    """Response containing the top complete outfits with explanations."""
+
+    outfits: list[ScoredOutfit]
+    event: str
+    weather: str
+    time_of_day: str
@@ -0,0 +1,41 @@
+"""
+Pydantic schemas for asynchronous upload jobs.
+
+Async uploads answer with JobAcceptedResponse (202) and are then
+followed through JobStatusResponse, either by polling or over SSE.
+"""
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from api.constants.enums import JobKind, JobStatus
+
+
+class JobAcceptedResponse(BaseModel):
+    """Response for an upload accepted with async_mode=true."""
+
+    job_id: str
+    status: JobStatus
+    status_url: str
+    events_url: str
+
+
+class JobStatusResponse(BaseModel):
+    """
+    Current state of an upload job.
+
+    result carries the same body the synchronous endpoint would have
+    returned, and is only set once status is succeeded.
+    """
+
+    id: str
+    kind: JobKind
+    status: JobStatus
+    stage: Optional[str] = None
+    attempts: int
+    error: Optional[str] = None
+    result: Optional[dict[str, Any]] = None
+    next_run_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,167 @@
+"""
+Content-hash cache for clothing and profile photo analysis.
+
+Users often re-upload the exact same photo (retries, a second device,
+editing metadata). Results are keyed by the SHA-256 of the raw bytes,
+so a repeated upload skips the storage upload, decoding, and all
+OpenCV/scikit-learn work.
+
+Two layers:
+- a bounded in-memory LRU for the hot set
+- the analysis_cache table, which survives restarts and is shared
+  by every API instance using the same database
+
+Both layers also key on analysis_fingerprint(kind): the cache version
+and the settings that change the labels. Switching the color
+quantizer or foreground masking, or changing the analysis and bumping
+ANALYSIS_CACHE_VERSION, turns earlier results into misses rather
+than serving them.
+"""
+import hashlib
+import logging
+import threading
+from typing import NamedTuple, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.models.analysis_cache import AnalysisCacheEntry
+from api.services.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Analysis kinds stored in the cache
+CLOTHING_ANALYSIS = "clothing"
+SKIN_ANALYSIS = "skin"
+
+# Bump whenever an analysis change alters the labels it produces
+# (2: clothing colors of the foreground only)
+ANALYSIS_CACHE_VERSION = 2
+
+
+class CachedAnalysis(NamedTuple):
+    """Stored URL plus the two labels produced by the analysis."""
+
+    image_url: str
+    primary_label: Optional[str]
+    secondary_label: Optional[str]
+
+
+def content_hash(image_bytes: bytes) -> str:
+    """Hex SHA-256 of the uploaded bytes, used as the cache key."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def analysis_fingerprint(kind: str) -> str:
+    """
+    How results of this kind are currently produced, e.g.
+    'v2:KMEANS:masked' for clothing.
+    """
+    parts = [f"v{ANALYSIS_CACHE_VERSION}"]
+    if kind == CLOTHING_ANALYSIS:
+        parts.append(settings.color_quantizer.value)
+        parts.append(
+            "masked" if settings.foreground_masking else "unmasked"
+        )
+    return ":".join(parts)
+
+
+class AnalysisCache:
+    """Two-level (memory, then database) analysis result cache."""
+
+    def __init__(self, max_memory_entries: int):
+        self._memory = LRUCache(max_memory_entries)
+        self._lock = threading.Lock()
+        self._counts: dict[str, dict[str, int]] = {}
+
+    def _count(self, kind: str, outcome: str) -> None:
+        with self._lock:
+            per_kind = self._counts.setdefault(
+                kind, {"memory_hits": 0, "db_hits": 0, "misses": 0}
+            )
+            per_kind[outcome] += 1
+
+    def lookup(
+        self, db: Session, kind: str, digest: str
+    ) -> Optional[CachedAnalysis]:
+        """Return the cached result for this image, or None on a miss."""
+        fingerprint = analysis_fingerprint(kind)
+        cached = self._memory.get((kind, fingerprint, digest))
+        if cached is not None:
+            self._count(kind, "memory_hits")
+            return cached
+
+        row = db.get(AnalysisCacheEntry, (kind, digest, fingerprint))
+        if row is None:
+            self._count(kind, "misses")
+            return None
+
+        cached = CachedAnalysis(
+            image_url=row.image_url,
+            primary_label=row.primary_label,
+            secondary_label=row.secondary_label,
+        )
+        self._memory.put((kind, fingerprint, digest), cached)
+        self._count(kind, "db_hits")
+        return cached
+
+    def store(
+        self,
+        db: Session,
+        kind: str,
+        digest: str,
+        result: CachedAnalysis,
+    ) -> None:
+        """Save a fresh result in both layers."""
+        self.store_many(db, kind, {digest: result})
+
+    def store_many(
+        self,
+        db: Session,
+        kind: str,
+        results: dict[str, CachedAnalysis],
+    ) -> None:
+        """
+        Save fresh results (keyed by content hash) in one commit.
+
+        Failing to persist is logged and ignored: the upload itself
+        has already succeeded and the cache is only an optimization.
+        """
+        fingerprint = analysis_fingerprint(kind)
+        for digest, result in results.items():
+            self._memory.put((kind, fingerprint, digest), result)
+        try:
+            for digest, result in results.items():
+                db.merge(
+                    AnalysisCacheEntry(
+                        kind=kind,
+                        content_hash=digest,
+                        analysis_config=fingerprint,
+                        image_url=result.image_url,
+                        primary_label=result.primary_label,
+                        secondary_label=result.secondary_label,
+                    )
+                )
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            logger.warning("Could not persist analysis cache: %s", str(exc))
+
+    def stats(self) -> dict:
+        """Hit/miss counts and hit rate per analysis kind."""
+        with self._lock:
+            per_kind = {
+                kind: dict(counts) for kind, counts in self._counts.items()
+            }
+        for counts in per_kind.values():
+            lookups = sum(counts.values())
+            hits = counts["memory_hits"] + counts["db_hits"]
+            counts["hit_rate"] = hits / lookups if lookups else 0.0
+        return {
+            "memory": self._memory.stats(),
+            "kinds": per_kind,
+        }
+
+
+analysis_cache = AnalysisCache(settings.analysis_cache_size)
@@ -0,0 +1,189 @@
+"""
+Parallel color analysis for batch clothing uploads.
+
+A single request can carry up to a few hundred garment photos, so the
+decode/resize/KMeans work is fanned out across a pool of worker
+processes instead of running one image after another.
+
+The raw image bytes are copied once into a shared memory block and each
+worker decodes its own slice straight out of that block. Only the slice
+offsets go to the workers and only the small color label tuples come
+back, so no image buffer is pickled per task.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+from api.config import settings
+from api.exceptions.custom_exceptions import ImageProcessingError
+
+logger = logging.getLogger(__name__)
+
+# (primary, secondary) labels on success, or an error message on failure
+ColorResult = tuple[Optional[tuple[str, Optional[str]]], Optional[str]]
+
+# Linux backs POSIX shared memory with this tmpfs mount
+_SHARED_MEMORY_MOUNT = "/dev/shm"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    """
+    Limit every worker to a single native thread.
+
+    KMeans and OpenCV are multi-threaded by default; with one process
+    per core that would oversubscribe the CPU and slow everything down.
+    """
+    import cv2
+    from threadpoolctl import threadpool_limits
+
+    cv2.setNumThreads(1)
+    threadpool_limits(limits=1)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared analysis process pool, creating it on first use.
+
+    Workers are started with 'spawn' so they never inherit the API's
+    threads or open database connections through fork().
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            worker_count = (
+                settings.batch_worker_processes or os.cpu_count() or 1
+            )
+            _pool = ProcessPoolExecutor(
+                max_workers=worker_count,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            logger.info(
+                "Started color analysis process pool: workers=%d",
+                worker_count,
+            )
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the analysis workers. Called from the application lifespan."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def _run_analysis(image_buffer) -> ColorResult:
+    """
+    Analyze one image and turn any failure into a plain error message.
+
+    Exceptions are not re-raised because their tracebacks would keep
+    views into the shared memory block alive after the call returns.
+    Runs in the worker processes, which are the only ones that import
+    the analysis code (and with it OpenCV and sklearn) for a batch.
+    """
+    from api.services.color_service import analyze_clothing_image_bytes
+
+    try:
+        return analyze_clothing_image_bytes(image_buffer), None
+    except ImageProcessingError as exc:
+        return None, exc.message
+    except Exception as exc:
+        return None, f"Failed to analyze image: {str(exc)}"
+
+
+def _analyze_shared_slice(
+    shm_name: str, offset: int, length: int
+) -> ColorResult:
+    """Worker entry point: analyze the image stored at [offset, offset+length)."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        image_view = shm.buf[offset:offset + length]
+        try:
+            return _run_analysis(image_view)
+        finally:
+            image_view.release()
+    finally:
+        shm.close()
+
+
+def _shared_memory_fits(total_bytes: int) -> bool:
+    """
+    Check that the shared memory mount can hold the whole batch.
+
+    Writing past the size of /dev/shm kills the process with SIGBUS
+    instead of raising, so this has to be checked up front.
+    """
+    try:
+        stats = os.statvfs(_SHARED_MEMORY_MOUNT)
+    except OSError:
+        # No /dev/shm (e.g. macOS): shared memory is not tmpfs-limited
+        return True
+    return stats.f_bavail * stats.f_frsize >= total_bytes
+
+
+async def analyze_clothing_batch(
+    images: list[bytes],
+) -> list[ColorResult]:
+    """
+    Extract (primary, secondary) color labels for many images in parallel.
+
+    Results are returned in input order. A broken image only fails its
+    own entry; the rest of the batch is still analyzed.
+    """
+    if not images:
+        return []
+
+    pool = get_process_pool()
+    loop = asyncio.get_running_loop()
+    total_bytes = sum(len(image) for image in images)
+
+    if not _shared_memory_fits(total_bytes):
+        logger.warning(
+            "Shared memory too small for batch (%d bytes); "
+            "sending image bytes to workers directly",
+            total_bytes,
+        )
+        futures = [
+            loop.run_in_executor(pool, _run_analysis, image)
+            for image in images
+        ]
+        return list(await asyncio.gather(*futures))
+
+    shm = shared_memory.SharedMemory(create=True, size=max(total_bytes, 1))
+    try:
+        futures = []
+        offset = 0
+        for image in images:
+            shm.buf[offset:offset + len(image)] = image
+            futures.append(
+                loop.run_in_executor(
+                    pool,
+                    _analyze_shared_slice,
+                    shm.name,
+                    offset,
+                    len(image),
+                )
+            )
+            offset += len(image)
+
+        results = list(await asyncio.gather(*futures))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    logger.info(
+        "Batch color analysis complete: images=%d, failed=%d",
+        len(images),
+        sum(1 for _, error in results if error is not None),
+    )
+    return results
@@ -0,0 +1,117 @@
+"""
+Precomputed nearest-label lookup for RGB colors.
+
+The RGB cube is divided into 2**(3*bits) equal cells and the nearest
+palette label (Euclidean distance in RGB) is stored per cell, so
+classifying a color is an index computation plus a table read,
+whatever the size of the palette.
+
+Nearest-neighbor regions are convex, so a cell whose 8 corners all
+have the same nearest label lies entirely inside that label's region.
+Only the few cells that straddle a boundary are marked ambiguous;
+colors falling there are resolved with an exact distance check.
+Results are therefore identical to a brute-force nearest search.
+"""
+import itertools
+import logging
+from functools import lru_cache
+
+import numpy as np
+
+from api.constants.color_constants import COLOR_LABELS, COLOR_LOOKUP_BITS
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on distance matrix entries computed at once while building
+_BUILD_CHUNK_ENTRIES = 1 << 21
+
+
+class ColorLabelIndex:
+    """
+    Dense quantized-RGB lookup table for one palette.
+
+    Building costs one distance pass over the cell corners; every
+    classification afterwards is O(1) per color and vectorized.
+    Build once per palette and reuse the instance.
+    """
+
+    def __init__(
+        self,
+        palette: dict[str, tuple[int, int, int]],
+        bits: int = COLOR_LOOKUP_BITS,
+    ):
+        if not palette:
+            raise ValueError("Color palette must not be empty")
+
+        self.labels = list(palette)
+        self._references = np.array(list(palette.values()), dtype=np.float64)
+        self._bits = bits
+        self._cell_size = 256 >> bits
+
+        levels = 1 << bits
+        axis = np.arange(levels + 1, dtype=np.float64) * self._cell_size
+        corners = np.stack(
+            np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1
+        ).reshape(-1, 3)
+        corner_labels = self._nearest(corners).reshape(
+            levels + 1, levels + 1, levels + 1
+        )
+
+        # A cell is unambiguous when all 8 of its corners agree
+        cell_labels = corner_labels[:-1, :-1, :-1]
+        ambiguous = np.zeros(cell_labels.shape, dtype=bool)
+        for dr, dg, db in itertools.product((0, 1), repeat=3):
+            ambiguous |= (
+                corner_labels[
+                    dr:dr + levels, dg:dg + levels, db:db + levels
+                ]
+                != cell_labels
+            )
+
+        self._table = cell_labels.ravel()
+        self._ambiguous = ambiguous.ravel()
+        logger.info(
+            "Color lookup table built: labels=%d, cells=%d, ambiguous=%.1f%%",
+            len(self.labels),
+            len(self._table),
+            self._ambiguous.mean() * 100,
+        )
+
+    def _nearest(self, points: np.ndarray) -> np.ndarray:
+        """
+        Brute-force nearest palette index for each point.
+
+        |p - r|^2 = |p|^2 - 2 p.r + |r|^2, and |p|^2 is the same for
+        every reference, so one matrix product ranks all references.
+        """
+        reference_norms = (self._references ** 2).sum(axis=1)
+        chunk = max(1, _BUILD_CHUNK_ENTRIES // len(self._references))
+        result = np.empty(len(points), dtype=np.intp)
+        for start in range(0, len(points), chunk):
+            block = points[start:start + chunk]
+            distances = reference_norms - 2 * block @ self._references.T
+            result[start:start + chunk] = np.argmin(distances, axis=1)
+        return result
+
+    def classify(self, rgb_values: np.ndarray) -> list[str]:
+        """Return the nearest label for each RGB row of an (N, 3) array."""
+        points = np.asarray(rgb_values, dtype=np.float64).reshape(-1, 3)
+        cells = (np.clip(points, 0, 255) // self._cell_size).astype(np.intp)
+        cell_index = (
+            (cells[:, 0] << (2 * self._bits))
+            | (cells[:, 1] << self._bits)
+            | cells[:, 2]
+        )
+
+        indices = self._table[cell_index]
+        boundary = self._ambiguous[cell_index]
+        if boundary.any():
+            indices[boundary] = self._nearest(points[boundary])
+
+        return [self.labels[i] for i in indices]
+
+
+@lru_cache(maxsize=1)
+def default_color_index() -> ColorLabelIndex:
+    """Lookup table for COLOR_LABELS, built on first use."""
+    return ColorLabelIndex(COLOR_LABELS)
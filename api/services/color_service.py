@@ -1,39 +1,63 @@
 """
 Extracts and classifies dominant colors from clothing images.
 
-Uses KMeans clustering to find the most prominent colors,
-then maps RGB values to human-readable labels via
-nearest-neighbor matching against reference colors.
+Uses a color quantizer (KMeans clustering by default) to find the
+most prominent colors, then maps RGB values to human-readable labels
+via nearest-neighbor matching against reference colors. With
+settings.foreground_masking only the garment's pixels are clustered
+(see foreground_service).
 """
 import logging
 from typing import Optional
 
 import cv2
 import numpy as np
-from sklearn.cluster import KMeans
 
+from api.config import settings
 from api.constants.color_constants import (
-    COLOR_LABELS,
     KMEANS_CLUSTER_COUNT,
     MIN_CLUSTER_PERCENTAGE,
 )
+from api.constants.enums import ColorQuantizer
 from api.exceptions.custom_exceptions import ImageProcessingError
+from api.services.image_service import (
+    decode_image_for_processing,
+    resize_image_for_processing,
+)
+from api.services.quantizer_service import quantize_colors
+from api.services.color_lookup import default_color_index
+from api.services.foreground_service import extract_foreground
+from api.services.metrics import (
+    PIPELINE_CLOTHING,
+    metrics_registry,
+    stage_timer,
+)
 
 logger = logging.getLogger(__name__)
 
+FOREGROUND_MASKED_RATIO = metrics_registry.histogram(
+    "stylesavvy_foreground_masked_ratio",
+    "Share of a clothing image's pixels dropped as background before "
+    "color clustering, by estimation method.",
+    ("method",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95),
+)
+
 
 def extract_dominant_colors(
     image: np.ndarray,
+    engine: Optional[ColorQuantizer] = None,
 ) -> tuple[np.ndarray, list[float]]:
     """
-    Use KMeans clustering to find dominant colors in the image.
+    Use the configured quantizer to find dominant colors in the image.
 
+    Accepts an (H, W, 3) BGR image or an (N, 3) array of BGR pixels.
     Returns cluster centers (RGB) and their percentage of total pixels.
-    KMeans is chosen because it's simple, deterministic with a fixed
-    seed, and works well for color quantization tasks.
+    Exact KMeans is the default because it's simple, deterministic with
+    a fixed seed, and works well for color quantization tasks.
     """
     try:
-        # Reshape image from (H, W, 3) to (N, 3) for KMeans input
+        # Reshape image from (H, W, 3) to (N, 3) for quantizer input
         pixels = image.reshape(-1, 3)
 
         # Convert BGR to RGB since OpenCV loads images in BGR format
@@ -41,21 +65,17 @@ def extract_dominant_colors(
             pixels.reshape(1, -1, 3), cv2.COLOR_BGR2RGB
         ).reshape(-1, 3)
 
-        kmeans = KMeans(
-            n_clusters=KMEANS_CLUSTER_COUNT,
-            random_state=42,
-            n_init=10,
+        centers, counts = quantize_colors(
+            pixels_rgb, KMEANS_CLUSTER_COUNT, engine
         )
-        kmeans.fit(pixels_rgb)
 
         # Calculate what percentage of pixels belongs to each cluster
-        _, counts = np.unique(kmeans.labels_, return_counts=True)
-        total_pixels = len(kmeans.labels_)
+        total_pixels = counts.sum()
         percentages = [count / total_pixels for count in counts]
 
         # Sort clusters by dominance (largest cluster first)
         sorted_indices = np.argsort(percentages)[::-1]
-        sorted_centers = kmeans.cluster_centers_[sorted_indices]
+        sorted_centers = centers[sorted_indices]
         sorted_percentages = [percentages[i] for i in sorted_indices]
 
         return sorted_centers, sorted_percentages
@@ -76,33 +96,54 @@ def classify_color_label(rgb_values: np.ndarray) -> str:
     More sophisticated methods (like CIEDE2000 in LAB space)
     are unnecessary for our coarse categories.
     """
-    min_distance = float("inf")
-    closest_label = "UNKNOWN"
+    return default_color_index().classify(rgb_values)[0]
 
-    for label, reference_rgb in COLOR_LABELS.items():
-        distance = np.sqrt(
-            np.sum((rgb_values - np.array(reference_rgb)) ** 2)
-        )
-        if distance < min_distance:
-            min_distance = distance
-            closest_label = label
 
-    return closest_label
+def classify_color_labels(centers: np.ndarray) -> list[str]:
+    """
+    Vectorized classify_color_label for an (N, 3) array of colors.
+
+    Backed by a precomputed lookup table, so the cost per color
+    does not grow with the number of palette entries.
+    """
+    return default_color_index().classify(centers)
 
 
 def get_clothing_colors(
     image: np.ndarray,
+    engine: Optional[ColorQuantizer] = None,
+    mask_background: Optional[bool] = None,
 ) -> tuple[str, Optional[str]]:
     """
     Extract primary and optional secondary color labels from a clothing image.
 
     Secondary color is only reported if it represents a significant
     portion of the image (above MIN_CLUSTER_PERCENTAGE threshold).
-    This filters out noise and small background patches.
+    This filters out noise and small background patches. With
+    background masking (settings.foreground_masking by default) the
+    percentages are of the garment's pixels rather than the image's.
     """
-    centers, percentages = extract_dominant_colors(image)
+    if mask_background is None:
+        mask_background = settings.foreground_masking
+    pixels = image
+    if mask_background:
+        with stage_timer(PIPELINE_CLOTHING, "foreground"):
+            foreground = extract_foreground(image)
+        pixels = foreground.pixels
+        FOREGROUND_MASKED_RATIO.observe(
+            foreground.masked_fraction, foreground.method
+        )
+        logger.info(
+            "Foreground (%s): %.1f%% of pixels masked",
+            foreground.method,
+            foreground.masked_fraction * 100,
+        )
+    with stage_timer(PIPELINE_CLOTHING, "quantize"):
+        centers, percentages = extract_dominant_colors(pixels, engine)
+    with stage_timer(PIPELINE_CLOTHING, "classify"):
+        labels = classify_color_labels(centers[:2])
 
-    primary_color = classify_color_label(centers[0])
+    primary_color = labels[0]
     logger.info(
         "Primary color detected: %s (%.1f%%)",
         primary_color,
@@ -111,7 +152,7 @@ def get_clothing_colors(
 
     secondary_color = None
     if len(centers) > 1 and percentages[1] >= MIN_CLUSTER_PERCENTAGE:
-        secondary_color = classify_color_label(centers[1])
+        secondary_color = labels[1]
         logger.info(
             "Secondary color detected: %s (%.1f%%)",
             secondary_color,
@@ -119,3 +160,21 @@ def get_clothing_colors(
         )
 
     return primary_color, secondary_color
+
+
+def analyze_clothing_image_bytes(
+    image_bytes: bytes,
+) -> tuple[str, Optional[str]]:
+    """
+    Run the full color pipeline (decode, resize, classify) on raw bytes.
+
+    Bundling the steps into one call lets the upload routes and the
+    batch worker processes share exactly the same analysis path
+    (including background masking, between resizing and clustering).
+    Accepts any buffer-protocol object, e.g. a shared memory slice.
+    """
+    with stage_timer(PIPELINE_CLOTHING, "decode"):
+        image = decode_image_for_processing(image_bytes)
+    with stage_timer(PIPELINE_CLOTHING, "resize"):
+        resized = resize_image_for_processing(image)
+    return get_clothing_colors(resized)
@@ -0,0 +1,122 @@
+"""
+Bounded executor for CPU-bound image analysis.
+
+KMeans clustering and Haar face detection take tens to hundreds of
+milliseconds. Running them directly inside async routes stalls every
+other request on the worker, including health checks. Instead, routes
+submit the analysis here and await the result.
+
+The executor has a fixed number of worker threads (OpenCV, NumPy and
+scikit-learn release the GIL during the heavy work) plus a bounded
+number of waiting slots. When all slots are taken, new work is
+rejected immediately with ComputeQueueFullError rather than queuing
+without limit, so overload shows up as fast 503s instead of timeouts.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from api.config import settings
+from api.exceptions.custom_exceptions import ComputeQueueFullError
+from api.services.request_profiler import current_session
+
+logger = logging.getLogger(__name__)
+
+
+class ComputeExecutor:
+    """Thread pool with a hard cap on running plus queued tasks."""
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="compute"
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        Schedule fn(*args) on a worker thread.
+
+        Raises ComputeQueueFullError right away when every worker is
+        busy and the waiting queue is full.
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                logger.warning(
+                    "Compute executor saturated: in_flight=%d, capacity=%d",
+                    self._in_flight,
+                    self.capacity,
+                )
+                raise ComputeQueueFullError()
+            self._in_flight += 1
+
+        # Executor threads do not inherit the request's context, so a
+        # profiled request hands its profiler over explicitly
+        session = current_session()
+        if session is not None:
+            fn = session.wrap(fn)
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) on the executor and await its result."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict[str, int]:
+        """Current load, for health checks and monitoring."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_executor: Optional[ComputeExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_compute_executor() -> ComputeExecutor:
+    """Return the process-wide compute executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ComputeExecutor(
+                workers=settings.compute_workers,
+                queue_size=settings.compute_queue_size,
+            )
+            logger.info(
+                "Compute executor started: workers=%d, queue=%d",
+                settings.compute_workers,
+                settings.compute_queue_size,
+            )
+        return _executor
+
+
+def shutdown_compute_executor() -> None:
+    """Stop the compute workers. Called from the application lifespan."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
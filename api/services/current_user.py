@@ -0,0 +1,32 @@
+"""
+Which user a request acts for.
+
+There is no authentication: a gateway or the client names the user in
+the X-User-Id header, and every route reads and writes only that
+user's profile, wardrobe and jobs. Requests without the header act as
+DEFAULT_USER_ID, so single-user clients keep working, unless
+settings.require_user_id is set.
+"""
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from api.config import settings
+from api.models.user import DEFAULT_USER_ID
+
+USER_ID_HEADER = "X-User-Id"
+
+
+def get_user_id(
+    x_user_id: Optional[int] = Header(
+        None, ge=1, description="User the request acts for"
+    ),
+) -> int:
+    """FastAPI dependency resolving the request's user id."""
+    if x_user_id is not None:
+        return x_user_id
+    if settings.require_user_id:
+        raise HTTPException(
+            status_code=401, detail=f"Missing {USER_ID_HEADER} header"
+        )
+    return DEFAULT_USER_ID
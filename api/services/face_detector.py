@@ -0,0 +1,156 @@
+"""
+Face detection engine for skin analysis.
+
+Loading the Haar cascade XML takes longer than detecting a face in a
+small image, and detectMultiScale cost grows with the pixel count, so a
+12MP phone photo used to pay for both on every upload. This engine:
+- loads a fixed pool of classifiers once and hands each thread its own
+  instance (a CascadeClassifier must not be shared between threads)
+- detects on a grayscale copy downscaled to a bounded size and maps
+  the face rectangle back to full resolution
+- limits candidate faces to a size range relative to the image, so
+  the scan skips scales where a profile-photo face cannot be
+
+Detection cost therefore stays roughly constant whatever the upload
+resolution; only the final skin sampling touches full-size pixels.
+"""
+import logging
+import queue
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+
+import cv2
+import numpy as np
+
+from api.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Haar cascade XML ships with OpenCV - no extra download needed
+HAAR_CASCADE_PATH = (
+    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+)
+
+HAAR_SCALE_FACTOR = 1.1
+HAAR_MIN_NEIGHBORS = 5
+# Training window of the frontal face cascade; nothing smaller is found
+HAAR_WINDOW_SIZE = 24
+
+FaceRect = tuple[int, int, int, int]
+
+
+class CascadePool:
+    """Fixed set of preloaded classifiers, borrowed one per thread."""
+
+    def __init__(self, cascade_path: str, size: int):
+        self._idle: queue.Queue = queue.Queue()
+        for _ in range(size):
+            classifier = cv2.CascadeClassifier(cascade_path)
+            if classifier.empty():
+                raise RuntimeError(
+                    f"Could not load Haar cascade: {cascade_path}"
+                )
+            self._idle.put(classifier)
+
+    @contextmanager
+    def acquire(self) -> Iterator[cv2.CascadeClassifier]:
+        """Borrow a classifier, waiting if all of them are in use."""
+        classifier = self._idle.get()
+        try:
+            yield classifier
+        finally:
+            self._idle.put(classifier)
+
+
+class FaceDetector:
+    """Finds the largest face in a BGR image using a cascade pool."""
+
+    def __init__(
+        self,
+        pool: CascadePool,
+        max_dimension: int,
+        min_size_ratio: float,
+        max_size_ratio: float,
+    ):
+        self.pool = pool
+        self.max_dimension = max_dimension
+        self.min_size_ratio = min_size_ratio
+        self.max_size_ratio = max_size_ratio
+
+    def _size_limits(self, shorter_side: int) -> tuple[int, int]:
+        min_side = max(
+            HAAR_WINDOW_SIZE, int(shorter_side * self.min_size_ratio)
+        )
+        max_side = max(min_side, int(shorter_side * self.max_size_ratio))
+        return min_side, max_side
+
+    def _downscaled_gray(self, image: np.ndarray) -> np.ndarray:
+        """
+        Grayscale copy whose longer side is at most max_dimension.
+
+        Halving with pyrDown first and finishing with one INTER_AREA
+        step is about twice as fast as a single INTER_AREA resize at
+        large, non-integer ratios, with the same anti-aliasing.
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        height, width = gray.shape
+        scale = self.max_dimension / max(height, width)
+        if scale >= 1.0:
+            return gray
+
+        target = (max(1, round(width * scale)), max(1, round(height * scale)))
+        while max(gray.shape) >= 2 * self.max_dimension:
+            gray = cv2.pyrDown(gray)
+        return cv2.resize(gray, target, interpolation=cv2.INTER_AREA)
+
+    def detect_largest(self, image: np.ndarray) -> Optional[FaceRect]:
+        """
+        Return (x, y, w, h) of the largest face in full-resolution
+        coordinates, or None when no face is found.
+        """
+        height, width = image.shape[:2]
+        gray = self._downscaled_gray(image)
+        scale_x = gray.shape[1] / width
+        scale_y = gray.shape[0] / height
+
+        min_side, max_side = self._size_limits(min(gray.shape[:2]))
+        with self.pool.acquire() as classifier:
+            faces = classifier.detectMultiScale(
+                gray,
+                scaleFactor=HAAR_SCALE_FACTOR,
+                minNeighbors=HAAR_MIN_NEIGHBORS,
+                minSize=(min_side, min_side),
+                maxSize=(max_side, max_side),
+            )
+
+        if len(faces) == 0:
+            return None
+
+        # Use the largest detected face (most likely the actual face)
+        x, y, w, h = max(faces, key=lambda rect: rect[2] * rect[3])
+
+        # Map back to the original image, clamped to its bounds
+        x0 = min(int(x / scale_x), width - 1)
+        y0 = min(int(y / scale_y), height - 1)
+        x1 = min(int(round((x + w) / scale_x)), width)
+        y1 = min(int(round((y + h) / scale_y)), height)
+        return x0, y0, x1 - x0, y1 - y0
+
+
+@lru_cache(maxsize=1)
+def get_face_detector() -> FaceDetector:
+    """Process-wide detector, with classifiers loaded on first use."""
+    pool_size = settings.face_cascade_pool_size or settings.compute_workers
+    detector = FaceDetector(
+        pool=CascadePool(HAAR_CASCADE_PATH, max(1, pool_size)),
+        max_dimension=settings.face_detect_max_dimension,
+        min_size_ratio=settings.face_min_size_ratio,
+        max_size_ratio=settings.face_max_size_ratio,
+    )
+    logger.info(
+        "Face detector ready: classifiers=%d, max_dimension=%d",
+        max(1, pool_size),
+        settings.face_detect_max_dimension,
+    )
+    return detector
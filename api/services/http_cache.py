@@ -0,0 +1,86 @@
+"""
+HTTP conditional request helpers (ETag / If-None-Match and
+Last-Modified / If-Modified-Since).
+
+Responses that are expensive to build but rarely change carry a
+strong ETag derived from their exact bytes. A client that sends the
+ETag back in If-None-Match gets an empty 304 instead of the body.
+
+Stored images never change under a given path, so /uploads is served
+as immutable with a far-future max-age on top of StaticFiles' own
+ETag / Last-Modified handling.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Response
+from fastapi.staticfiles import StaticFiles
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def strong_etag(body: bytes) -> str:
+    """Quoted strong ETag for the exact response bytes."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header value matches the current ETag.
+
+    Uses the weak comparison that RFC 9110 prescribes for
+    If-None-Match, so a W/ prefix added by a proxy still matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def http_date(moment: datetime) -> str:
+    """IMF-fixdate for a Last-Modified header; naive times are UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def unmodified_since(
+    if_modified_since: Optional[str], last_modified: Optional[datetime]
+) -> bool:
+    """
+    Whether If-Modified-Since covers last_modified.
+
+    HTTP dates have one-second resolution, so sub-second parts of
+    last_modified are ignored. Unparseable dates never match.
+    """
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    """Empty 304 response repeating the validator headers."""
+    return Response(status_code=304, headers=headers)
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles whose files may be cached by clients for a year."""
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
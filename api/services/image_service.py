@@ -1,12 +1,11 @@
 """
-Handles image upload to Cloudinary or local storage.
+Image decoding and resizing for the analysis pipelines.
 
-When Cloudinary credentials are not set (e.g. local dev), images are
-saved to the uploads/ directory and served by the API.
+Storing images (local disk or Cloudinary) is handled by
+storage_backend.
 """
 import logging
-import uuid
-from pathlib import Path
+from typing import Optional
 
 import cv2
 import numpy as np
@@ -16,106 +15,150 @@ from api.constants.color_constants import (
     CLOTHING_IMAGE_RESIZE_WIDTH,
     CLOTHING_IMAGE_RESIZE_HEIGHT,
 )
-from api.exceptions.custom_exceptions import (
-    ImageProcessingError,
-    CloudinaryUploadError,
-)
+from api.exceptions.custom_exceptions import ImageProcessingError
 
 logger = logging.getLogger(__name__)
 
-# Only configure and use Cloudinary when credentials are set
-def _is_cloudinary_configured() -> bool:
-    return bool(
-        settings.cloudinary_cloud_name
-        and settings.cloudinary_api_key
-        and settings.cloudinary_api_secret
-    )
-
 
-if _is_cloudinary_configured():
-    import cloudinary
-    import cloudinary.uploader
+# JPEG start-of-frame markers (every SOFn except DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers that stand alone, without a length field
+_JPEG_STANDALONE_MARKERS = frozenset([0x01, *range(0xD0, 0xD9)])
 
-    cloudinary.config(
-        cloud_name=settings.cloudinary_cloud_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-    )
+# Leading bytes of the other formats uploads are accepted in: WebP
+# (RIFF container), BMP and TIFF (both byte orders)
+_WEBP_SIGNATURE = (b"RIFF", b"WEBP")
+_OTHER_IMAGE_SIGNATURES = (b"BM", b"II*\x00", b"MM\x00*")
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
 
+UNDECODABLE_IMAGE_MESSAGE = (
+    "Could not decode the uploaded image. "
+    "Please ensure it is a valid JPEG or PNG file."
+)
 
-def _extension_for_bytes(image_bytes: bytes) -> str:
-    """Return file extension based on image magic bytes."""
-    if image_bytes[:2] == b"\xff\xd8":
-        return ".jpg"
-    if image_bytes[:8] == b"\x89PNG\r\n\x1a\n":
-        return ".png"
-    if image_bytes[:6] in (b"GIF87a", b"GIF89a"):
-        return ".gif"
-    return ".jpg"
+# Reduced decode modes by scale factor, largest reduction first
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
 
 
-def _upload_image_local(image_bytes: bytes, folder: str) -> str:
+def jpeg_dimensions(image_bytes) -> Optional[tuple[int, int]]:
     """
-    Save image to local uploads/ directory and return URL path.
-    Used when Cloudinary is not configured (e.g. local development).
+    (width, height) from a JPEG's frame header, or None if the bytes
+    are not a JPEG or the header cannot be found. Reads only the
+    marker segments ahead of the frame header, not the image data.
     """
-    uploads_dir = Path("uploads") / folder
-    uploads_dir.mkdir(parents=True, exist_ok=True)
-    ext = _extension_for_bytes(image_bytes)
-    name = f"{uuid.uuid4().hex}{ext}"
-    path = uploads_dir / name
-    path.write_bytes(image_bytes)
-    url_path = f"/uploads/{folder}/{name}"
-    logger.info("Image saved locally: %s", url_path)
-    return url_path
-
-
-def upload_image_to_cloudinary(image_bytes: bytes, folder: str) -> str:
+    data = memoryview(image_bytes).cast("B")
+    if bytes(data[:2]) != b"\xff\xd8":
+        return None
+    position = 2
+    while position + 9 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            position += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            position += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height = int.from_bytes(data[position + 5:position + 7], "big")
+            width = int.from_bytes(data[position + 7:position + 9], "big")
+            return (width, height) if width and height else None
+        length = int.from_bytes(data[position + 2:position + 4], "big")
+        position += 2 + length
+    return None
+
+
+def has_image_header(image_bytes) -> bool:
     """
-    Upload raw image bytes and return a URL (Cloudinary or local path).
-
-    When Cloudinary is configured, uploads there. Otherwise saves to
-    uploads/<folder>/ and returns a path like /uploads/<folder>/<id>.jpg
-    that the API serves as static files.
+    Whether the bytes start with a readable header of a format the
+    pipelines decode: a JPEG frame header, a PNG IHDR chunk, or the
+    signature of WebP, BMP or TIFF. Only the header is read, so this
+    is cheap enough to run before anything is stored; it does not
+    prove that the image data itself decodes.
     """
-    if not _is_cloudinary_configured():
-        return _upload_image_local(image_bytes, folder)
-
-    try:
-        result = cloudinary.uploader.upload(
-            image_bytes,
-            folder=f"wardrobe-ai/{folder}",
-            resource_type="image",
-        )
-        image_url = result.get("secure_url")
-        logger.info("Image uploaded to Cloudinary: folder=%s", folder)
-        return image_url
-    except Exception as exc:
-        logger.error("Cloudinary upload failed: %s", str(exc))
-        raise CloudinaryUploadError(
-            f"Upload failed: {str(exc)}"
-        ) from exc
-
-
-def decode_image_from_bytes(image_bytes: bytes) -> np.ndarray:
+    if jpeg_dimensions(image_bytes) is not None:
+        return True
+    head = bytes(memoryview(image_bytes).cast("B")[:16])
+    if head.startswith(_PNG_SIGNATURE):
+        return head[12:16] == b"IHDR"
+    if (head[:4], head[8:12]) == _WEBP_SIGNATURE:
+        return True
+    return head.startswith(_OTHER_IMAGE_SIGNATURES)
+
+
+def reduced_decode_factor(
+    width: int, height: int, min_long_side: int, min_short_side: int
+) -> int:
+    """
+    Largest JPEG decode reduction (8, 4, 2 or 1) whose output still
+    has a longer side of at least min_long_side and a shorter side of
+    at least min_short_side.
+    """
+    long_side, short_side = max(width, height), min(width, height)
+    for factor, _ in _REDUCED_DECODE_FLAGS:
+        if (
+            long_side // factor >= min_long_side
+            and short_side // factor >= min_short_side
+        ):
+            return factor
+    return 1
+
+
+def decode_image_from_bytes(
+    image_bytes: bytes, min_long_side: int = 0, min_short_side: int = 0
+) -> np.ndarray:
     """
     Convert raw image bytes into an OpenCV BGR image array.
 
     This avoids saving to disk, which is important for
     Render's ephemeral filesystem where files are lost on redeploy.
+
+    Callers that only need a downscaled image pass the smallest size
+    they need. JPEGs are then decoded at 1/2, 1/4 or 1/8 scale inside
+    libjpeg (the DCT is scaled, so the full-size pixel buffer is
+    never allocated), picking the largest reduction that still covers
+    that size. Other formats, and all images when
+    settings.reduced_decode is off, are decoded at full size.
     """
     np_array = np.frombuffer(image_bytes, dtype=np.uint8)
-    image = cv2.imdecode(np_array, cv2.IMREAD_COLOR)
+    flags = cv2.IMREAD_COLOR
+    if settings.reduced_decode and (min_long_side or min_short_side):
+        dimensions = jpeg_dimensions(image_bytes)
+        if dimensions is not None:
+            factor = reduced_decode_factor(
+                *dimensions, min_long_side, min_short_side
+            )
+            flags = dict(_REDUCED_DECODE_FLAGS).get(factor, flags)
+            logger.debug(
+                "Decoding %dx%d JPEG at 1/%d scale", *dimensions, factor
+            )
+    image = cv2.imdecode(np_array, flags)
 
     if image is None:
-        raise ImageProcessingError(
-            "Could not decode the uploaded image. "
-            "Please ensure it is a valid JPEG or PNG file."
-        )
+        raise ImageProcessingError(UNDECODABLE_IMAGE_MESSAGE)
 
     return image
 
 
+def decode_image_for_processing(image_bytes: bytes) -> np.ndarray:
+    """Decode at the smallest size that still covers the resize target."""
+    return decode_image_from_bytes(
+        image_bytes,
+        min_long_side=max(
+            CLOTHING_IMAGE_RESIZE_WIDTH, CLOTHING_IMAGE_RESIZE_HEIGHT
+        ),
+        min_short_side=min(
+            CLOTHING_IMAGE_RESIZE_WIDTH, CLOTHING_IMAGE_RESIZE_HEIGHT
+        ),
+    )
+
+
 def resize_image_for_processing(image: np.ndarray) -> np.ndarray:
     """
     Resize image to a standard size for consistent and fast processing.
@@ -0,0 +1,100 @@
+"""
+Content-addressed layout and derivatives for stored images.
+
+Images are stored under the SHA-256 of their bytes, sharded by the
+first two hex byte pairs so no directory grows past a few hundred
+entries:
+
+    uploads/<folder>/ab/cd/abcd...ef.jpg          original
+    uploads/<folder>/ab/cd/abcd...ef_thumb.webp   derivatives
+
+Identical uploads map to one file, and a path never changes content,
+so it can be cached by browsers forever. Downscaled WebP derivatives
+(IMAGE_DERIVATIVE_SIZES) are encoded once at ingest; the web app uses
+them instead of downloading originals for every thumbnail.
+
+Derivative URLs are computed from the original's URL, so they need no
+database columns: local content-addressed files get their sibling
+WebP files, Cloudinary images get an on-the-fly transformation URL
+(pre-generated at upload as eager transformations). Legacy local
+files stored under random names have no derivatives.
+"""
+import re
+from typing import Optional
+
+import numpy as np
+
+from api.constants.color_constants import (
+    DERIVATIVE_WEBP_QUALITY,
+    IMAGE_DERIVATIVE_SIZES,
+)
+
+_CONTENT_ADDRESSED_URL = re.compile(
+    r"^(?P<stem>/uploads/[\w-]+/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64})"
+    r"\.\w+$"
+)
+_CLOUDINARY_UPLOAD_SEGMENT = "/image/upload/"
+
+
+def content_path(folder: str, digest: str, suffix: str) -> str:
+    """Sharded relative path of an image, e.g. clothing/ab/cd/<digest>.jpg"""
+    return f"{folder}/{digest[:2]}/{digest[2:4]}/{digest}{suffix}"
+
+
+def derivative_suffix(name: str) -> str:
+    return f"_{name}.webp"
+
+
+def cloudinary_transformation(name: str) -> str:
+    """Cloudinary transformation string producing the named derivative."""
+    size = IMAGE_DERIVATIVE_SIZES[name]
+    return f"c_limit,h_{size},q_{DERIVATIVE_WEBP_QUALITY},w_{size}"
+
+
+def derivative_url(image_url: Optional[str], name: str) -> Optional[str]:
+    """URL of the named derivative of a stored image, if it has one."""
+    if not image_url:
+        return None
+    match = _CONTENT_ADDRESSED_URL.match(image_url)
+    if match is not None:
+        return match.group("stem") + derivative_suffix(name)
+    if _CLOUDINARY_UPLOAD_SEGMENT in image_url:
+        head, tail = image_url.split(_CLOUDINARY_UPLOAD_SEGMENT, 1)
+        # Transformed delivery URLs must name the target format
+        tail = re.sub(r"\.\w+$", ".webp", tail)
+        return (
+            f"{head}{_CLOUDINARY_UPLOAD_SEGMENT}"
+            f"{cloudinary_transformation(name)}/{tail}"
+        )
+    return None
+
+
+def encode_derivatives(image: np.ndarray) -> dict[str, bytes]:
+    """
+    WebP bytes of every derivative of a decoded BGR image.
+
+    Sizes are produced largest first, each downscaled from the
+    previous one, so the full-size image is only resized once.
+    """
+    import cv2
+
+    derivatives = {}
+    source = image
+    for name, size in sorted(
+        IMAGE_DERIVATIVE_SIZES.items(), key=lambda entry: -entry[1]
+    ):
+        height, width = source.shape[:2]
+        scale = size / max(height, width)
+        if scale < 1.0:
+            source = cv2.resize(
+                source,
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+        ok, encoded = cv2.imencode(
+            ".webp", source, [cv2.IMWRITE_WEBP_QUALITY, DERIVATIVE_WEBP_QUALITY]
+        )
+        if not ok:
+            raise ValueError(f"WebP encoding failed for {name} derivative")
+        derivatives[name] = encoded.tobytes()
+    return derivatives
@@ -0,0 +1,285 @@
+"""
+Upload pipelines for clothing images and profile photos.
+
+Both the synchronous upload routes and the background job workers run
+uploads through these functions, so a job produces exactly the same
+rows and response as the equivalent direct request.
+
+Each pipeline reports its current stage through an optional async
+progress callback, which the job queue uses for status polling and
+SSE (and to renew its lease on the job).
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from api.constants.enums import (
+    ClothingType,
+    OccasionType,
+    SeasonType,
+    SkinTone,
+    SkinUndertone,
+)
+from api.exceptions.custom_exceptions import ImageProcessingError
+from api.models.clothing import Clothing
+from api.models.user import User
+from api.schemas.clothing_schema import ClothingResponse
+from api.schemas.user_schema import UserPhotoUploadResponse
+from api.services.analysis_cache import (
+    CLOTHING_ANALYSIS,
+    SKIN_ANALYSIS,
+    CachedAnalysis,
+    analysis_cache,
+    content_hash,
+)
+from api.services.compute_executor import get_compute_executor
+from api.services.metrics import (
+    PIPELINE_CLOTHING,
+    PIPELINE_PHOTO,
+    stage_timer,
+    timed_stage,
+)
+from api.services.storage_backend import get_storage_backend
+from api.services.wardrobe_store import wardrobe_store
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+# Stage names reported to progress callbacks
+STAGE_ANALYZING = "analyzing"
+STAGE_UPLOADING = "uploading"
+STAGE_SAVING = "saving"
+
+
+async def _report(
+    on_progress: Optional[ProgressCallback], stage: str
+) -> None:
+    if on_progress is not None:
+        await on_progress(stage)
+
+
+async def _store(pipeline: str, image_bytes: bytes, folder: str) -> str:
+    with stage_timer(pipeline, "storage"):
+        return await get_storage_backend().store(image_bytes, folder)
+
+
+async def _analyze_and_store(
+    analyze: Callable[[bytes], Any],
+    image_bytes: bytes,
+    folder: str,
+    pipeline: str,
+    on_progress: Optional[ProgressCallback],
+) -> tuple[Any, str]:
+    """
+    Run analysis on the compute executor while the storage backend
+    uploads the same bytes; return (analysis result, image URL).
+
+    Request latency becomes the longer of the two instead of their
+    sum. The uploading stage is only reported when the upload
+    outlasts the analysis.
+
+    Bytes without a readable image header are rejected before the
+    upload starts, so non-image uploads are never stored. If analysis
+    fails later (corrupt image data, no face found), the upload is
+    cancelled and the analysis error is raised, but an upload the
+    backend already accepted stays stored. It is not deleted: stored
+    images are content-addressed and may be shared with other items.
+    Re-uploading the same bytes reuses it.
+    """
+    from api.services.image_service import (
+        UNDECODABLE_IMAGE_MESSAGE,
+        has_image_header,
+    )
+
+    if not has_image_header(image_bytes):
+        raise ImageProcessingError(UNDECODABLE_IMAGE_MESSAGE)
+
+    await _report(on_progress, STAGE_ANALYZING)
+    upload = asyncio.ensure_future(_store(pipeline, image_bytes, folder))
+    try:
+        # Includes time spent waiting for a free compute worker
+        with stage_timer(pipeline, "analysis"):
+            analysis = await get_compute_executor().run(
+                analyze, image_bytes
+            )
+    except BaseException:
+        upload.cancel()
+        await asyncio.gather(upload, return_exceptions=True)
+        raise
+
+    if not upload.done():
+        await _report(on_progress, STAGE_UPLOADING)
+    return analysis, await upload
+
+
+@timed_stage(PIPELINE_CLOTHING, "total")
+async def ingest_clothing(
+    db: Session,
+    user_id: int,
+    image_bytes: bytes,
+    clothing_type: ClothingType,
+    occasion: OccasionType,
+    season: SeasonType,
+    on_progress: Optional[ProgressCallback] = None,
+) -> ClothingResponse:
+    """
+    Analyze, store, and record one clothing image of the user.
+
+    Process:
+    1. Decode and resize for efficient processing
+    2. Extract dominant colors via KMeans clustering
+    3. Upload image to storage, concurrently with steps 1-2
+    4. Store clothing record with colors and metadata
+
+    Analysis runs on the compute executor so the event loop stays
+    free for other requests. Non-image bytes are rejected before
+    anything is stored (see _analyze_and_store). Steps 1-3 are
+    skipped entirely when the same image bytes were analyzed before.
+    """
+    from api.services.color_service import analyze_clothing_image_bytes
+
+    digest = content_hash(image_bytes)
+    with stage_timer(PIPELINE_CLOTHING, "cache_lookup"):
+        cached = analysis_cache.lookup(db, CLOTHING_ANALYSIS, digest)
+
+    if cached is not None:
+        image_url = cached.image_url
+        primary_color = cached.primary_label
+        secondary_color = cached.secondary_label
+    else:
+        # Extract colors off the event loop while the image uploads
+        (primary_color, secondary_color), image_url = (
+            await _analyze_and_store(
+                analyze_clothing_image_bytes,
+                image_bytes,
+                "clothing",
+                PIPELINE_CLOTHING,
+                on_progress,
+            )
+        )
+
+    # Create clothing record in database
+    await _report(on_progress, STAGE_SAVING)
+    clothing_item = Clothing(
+        user_id=user_id,
+        image_url=image_url,
+        dominant_color=primary_color,
+        secondary_color=secondary_color,
+        clothing_type=clothing_type.value,
+        occasion=occasion.value,
+        season=season.value,
+    )
+    db.add(clothing_item)
+    with stage_timer(PIPELINE_CLOTHING, "db_commit"):
+        db.commit()
+    with stage_timer(PIPELINE_CLOTHING, "db_refresh"):
+        db.refresh(clothing_item)
+    wardrobe_store.add_items(user_id, [clothing_item])
+    response = ClothingResponse.model_validate(clothing_item)
+
+    if cached is None:
+        with stage_timer(PIPELINE_CLOTHING, "cache_store"):
+            analysis_cache.store(
+                db,
+                CLOTHING_ANALYSIS,
+                digest,
+                CachedAnalysis(image_url, primary_color, secondary_color),
+            )
+
+    logger.info(
+        "Clothing uploaded: type=%s, color=%s, cached=%s",
+        clothing_type.value,
+        primary_color,
+        cached is not None,
+    )
+    return response
+
+
+@timed_stage(PIPELINE_PHOTO, "total")
+async def ingest_user_photo(
+    db: Session,
+    user_id: int,
+    image_bytes: bytes,
+    on_progress: Optional[ProgressCallback] = None,
+) -> UserPhotoUploadResponse:
+    """
+    Analyze a face photo and create or update the user's profile.
+
+    Process:
+    1. Detect face and extract skin region
+    2. Classify skin tone and undertone
+    3. Upload image to storage, concurrently with steps 1-2
+    4. Create or update user profile in database
+
+    Face detection runs on the compute executor so the event loop
+    stays free for other requests. Steps 1-3 are skipped when the
+    same photo bytes were analyzed before.
+    """
+    from api.services.skin_tone_service import analyze_skin_image_bytes
+
+    digest = content_hash(image_bytes)
+    with stage_timer(PIPELINE_PHOTO, "cache_lookup"):
+        cached = analysis_cache.lookup(db, SKIN_ANALYSIS, digest)
+
+    if cached is not None:
+        photo_url = cached.image_url
+        skin_tone = SkinTone(cached.primary_label)
+        skin_undertone = SkinUndertone(cached.secondary_label)
+    else:
+        # Analyze skin tone/undertone off the event loop while the
+        # photo uploads
+        (skin_tone, skin_undertone), photo_url = await _analyze_and_store(
+            analyze_skin_image_bytes,
+            image_bytes,
+            "user-photos",
+            PIPELINE_PHOTO,
+            on_progress,
+        )
+
+    # Upsert the user's profile
+    await _report(on_progress, STAGE_SAVING)
+    user = db.get(User, user_id)
+    if user is None:
+        user = User(
+            id=user_id,
+            photo_url=photo_url,
+            skin_tone=skin_tone.value,
+            skin_undertone=skin_undertone.value,
+        )
+        db.add(user)
+    else:
+        user.photo_url = photo_url
+        user.skin_tone = skin_tone.value
+        user.skin_undertone = skin_undertone.value
+
+    with stage_timer(PIPELINE_PHOTO, "db_commit"):
+        db.commit()
+    wardrobe_store.set_profile(user_id, skin_tone, skin_undertone)
+
+    if cached is None:
+        with stage_timer(PIPELINE_PHOTO, "cache_store"):
+            analysis_cache.store(
+                db,
+                SKIN_ANALYSIS,
+                digest,
+                CachedAnalysis(
+                    photo_url, skin_tone.value, skin_undertone.value
+                ),
+            )
+
+    logger.info(
+        "User photo processed: tone=%s, undertone=%s, cached=%s",
+        skin_tone.value,
+        skin_undertone.value,
+        cached is not None,
+    )
+
+    return UserPhotoUploadResponse(
+        message="Photo analyzed successfully",
+        photo_url=photo_url,
+        skin_tone=skin_tone,
+        skin_undertone=skin_undertone,
+    )
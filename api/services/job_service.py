@@ -0,0 +1,401 @@
+"""
+Durable asynchronous job queue for uploads.
+
+Opt-in async uploads are stored as rows in the analysis_jobs table and
+answered with 202 right away. A small pool of in-process workers
+(asyncio tasks) claims due jobs from the table and runs them through
+the same ingest pipelines as the synchronous routes. No external
+broker is needed: SQLite or Postgres is the queue.
+
+Reliability rules:
+- claiming is a conditional UPDATE, so two workers (or two API
+  instances) never run the same job
+- a claimed job holds a lease; if its worker dies the lease expires
+  and the job becomes claimable again, which also covers restarts
+- the lease is renewed at every progress stage, and every update a
+  worker makes to its job is conditional on still owning the claim,
+  so a worker that outlived its lease cannot save the upload or
+  overwrite the job after another worker re-claimed it
+- job rows are updated in the threadpool, off the event loop
+- an error while running or recording a job (say, the database
+  going away) is logged and never ends a worker; the job's lease
+  then expires and it is retried
+- transient failures are retried with exponential backoff; invalid
+  images fail immediately since retrying cannot fix them
+"""
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.constants.enums import (
+    ClothingType,
+    JobKind,
+    JobStatus,
+    OccasionType,
+    SeasonType,
+)
+from api.database import SessionLocal
+from api.exceptions.custom_exceptions import (
+    ImageProcessingError,
+    InvalidClothingMetadataError,
+    JobLeaseLostError,
+)
+from api.models.job import AnalysisJob
+from api.services.ingest_service import (
+    ProgressCallback,
+    ingest_clothing,
+    ingest_user_photo,
+)
+
+logger = logging.getLogger(__name__)
+
+# Failures that retrying cannot fix
+PERMANENT_ERRORS = (ImageProcessingError, InvalidClothingMetadataError)
+
+TERMINAL_STATUSES = {JobStatus.SUCCEEDED.value, JobStatus.FAILED.value}
+
+JobHandler = Callable[
+    [Session, AnalysisJob, ProgressCallback], Awaitable[dict[str, Any]]
+]
+
+
+class JobClaim(NamedTuple):
+    """A claimed job and the token identifying this claim of it."""
+
+    job_id: str
+    lease_owner: str
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _lease_expiry() -> datetime:
+    return _utcnow() + timedelta(seconds=settings.job_lease_seconds)
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Exponential backoff: base, 2*base, 4*base, ... capped at the max."""
+    delay = settings.job_retry_base_seconds * 2 ** max(attempts - 1, 0)
+    return min(delay, settings.job_retry_max_seconds)
+
+
+def _claimable(now: datetime):
+    """Due pending jobs, plus running jobs whose worker lease expired."""
+    return or_(
+        and_(
+            AnalysisJob.status == JobStatus.PENDING.value,
+            AnalysisJob.next_run_at <= now,
+        ),
+        and_(
+            AnalysisJob.status == JobStatus.RUNNING.value,
+            AnalysisJob.locked_until < now,
+        ),
+    )
+
+
+def enqueue_job(
+    db: Session,
+    user_id: int,
+    kind: JobKind,
+    payload: bytes,
+    params: dict[str, Any],
+) -> AnalysisJob:
+    """Persist a user's new job with its raw upload and wake the workers."""
+    job = AnalysisJob(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        kind=kind.value,
+        status=JobStatus.PENDING.value,
+        params=json.dumps(params),
+        payload=payload,
+        attempts=0,
+        next_run_at=_utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    job_worker_pool.notify()
+    logger.info("Job queued: id=%s, kind=%s", job.id, kind.value)
+    return job
+
+
+def claim_next_job() -> Optional[JobClaim]:
+    """
+    Atomically take the oldest due job and return the claim.
+
+    The UPDATE repeats the claimable condition, so if another worker
+    got there first it matches no row and this worker moves on.
+    """
+    db = SessionLocal()
+    try:
+        now = _utcnow()
+        job_id = (
+            db.query(AnalysisJob.id)
+            .filter(_claimable(now))
+            .order_by(AnalysisJob.next_run_at)
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            return None
+
+        lease_owner = uuid.uuid4().hex
+        claimed = (
+            db.query(AnalysisJob)
+            .filter(AnalysisJob.id == job_id, _claimable(now))
+            .update(
+                {
+                    AnalysisJob.status: JobStatus.RUNNING.value,
+                    AnalysisJob.attempts: AnalysisJob.attempts + 1,
+                    AnalysisJob.locked_until: now
+                    + timedelta(seconds=settings.job_lease_seconds),
+                    AnalysisJob.lease_owner: lease_owner,
+                    AnalysisJob.stage: None,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return JobClaim(job_id, lease_owner) if claimed else None
+    finally:
+        db.close()
+
+
+def update_claimed_job(claim: JobClaim, values: dict) -> bool:
+    """
+    Apply values to the job only while the claim still holds it.
+
+    Returns False, changing nothing, when the job was re-claimed by
+    another worker after this claim's lease expired.
+    """
+    db = SessionLocal()
+    try:
+        updated = (
+            db.query(AnalysisJob)
+            .filter(
+                AnalysisJob.id == claim.job_id,
+                AnalysisJob.status == JobStatus.RUNNING.value,
+                AnalysisJob.lease_owner == claim.lease_owner,
+            )
+            .update(values, synchronize_session=False)
+        )
+        db.commit()
+        return bool(updated)
+    finally:
+        db.close()
+
+
+async def _run_clothing_upload(
+    db: Session, job: AnalysisJob, on_progress: ProgressCallback
+) -> dict[str, Any]:
+    params = json.loads(job.params)
+    response = await ingest_clothing(
+        db,
+        job.user_id,
+        job.payload,
+        clothing_type=ClothingType(params["clothing_type"]),
+        occasion=OccasionType(params["occasion"]),
+        season=SeasonType(params["season"]),
+        on_progress=on_progress,
+    )
+    return response.model_dump(mode="json")
+
+
+async def _run_user_photo_upload(
+    db: Session, job: AnalysisJob, on_progress: ProgressCallback
+) -> dict[str, Any]:
+    response = await ingest_user_photo(
+        db, job.user_id, job.payload, on_progress
+    )
+    return response.model_dump(mode="json")
+
+
+JOB_HANDLERS: dict[JobKind, JobHandler] = {
+    JobKind.CLOTHING_UPLOAD: _run_clothing_upload,
+    JobKind.USER_PHOTO_UPLOAD: _run_user_photo_upload,
+}
+
+
+async def run_job(claim: JobClaim) -> None:
+    """Execute one claimed job and record success, retry, or failure."""
+    job_id = claim.job_id
+
+    async def on_progress(stage: str) -> None:
+        # Renews the lease; the saving stage is reported right before
+        # the upload's own commit, so a lost lease stops it there
+        renewed = await run_in_threadpool(
+            update_claimed_job,
+            claim,
+            {
+                AnalysisJob.stage: stage,
+                AnalysisJob.locked_until: _lease_expiry(),
+            },
+        )
+        if not renewed:
+            raise JobLeaseLostError(f"Lease of job {job_id} was lost")
+
+    db = SessionLocal()
+    try:
+        job = await run_in_threadpool(db.get, AnalysisJob, job_id)
+        if job is None:
+            logger.warning("Claimed job no longer exists: id=%s", job_id)
+            return
+        attempts = job.attempts
+        try:
+            handler = JOB_HANDLERS[JobKind(job.kind)]
+            result = await handler(db, job, on_progress)
+        except JobLeaseLostError:
+            db.rollback()
+            logger.warning(
+                "Job lease lost, leaving it to its new worker: id=%s",
+                job_id,
+            )
+            return
+        except Exception as exc:
+            db.rollback()
+            await run_in_threadpool(_record_failure, claim, attempts, exc)
+            return
+    finally:
+        db.close()
+
+    succeeded = await run_in_threadpool(
+        update_claimed_job,
+        claim,
+        {
+            AnalysisJob.status: JobStatus.SUCCEEDED.value,
+            AnalysisJob.result: json.dumps(result),
+            AnalysisJob.error: None,
+            AnalysisJob.stage: None,
+            AnalysisJob.payload: None,
+            AnalysisJob.locked_until: None,
+            AnalysisJob.lease_owner: None,
+        },
+    )
+    if succeeded:
+        logger.info("Job succeeded: id=%s", job_id)
+    else:
+        logger.warning(
+            "Job finished after its lease was lost: id=%s", job_id
+        )
+
+
+def _record_failure(claim: JobClaim, attempts: int, exc: Exception) -> None:
+    """Schedule a retry with backoff, or fail the job for good."""
+    message = getattr(exc, "message", None) or str(exc)
+    permanent = isinstance(exc, PERMANENT_ERRORS)
+
+    values = {
+        AnalysisJob.error: message,
+        AnalysisJob.stage: None,
+        AnalysisJob.locked_until: None,
+        AnalysisJob.lease_owner: None,
+    }
+    failed = permanent or attempts >= settings.job_max_attempts
+    delay = retry_delay_seconds(attempts)
+    if failed:
+        values[AnalysisJob.status] = JobStatus.FAILED.value
+        values[AnalysisJob.payload] = None
+    else:
+        values[AnalysisJob.status] = JobStatus.PENDING.value
+        values[AnalysisJob.next_run_at] = _utcnow() + timedelta(
+            seconds=delay
+        )
+    if not update_claimed_job(claim, values):
+        logger.warning(
+            "Job failed after its lease was lost: id=%s, error=%s",
+            claim.job_id,
+            message,
+        )
+    elif failed:
+        logger.error(
+            "Job failed: id=%s, attempts=%d, error=%s",
+            claim.job_id,
+            attempts,
+            message,
+        )
+    else:
+        logger.warning(
+            "Job will retry: id=%s, attempt=%d, delay=%.0fs, error=%s",
+            claim.job_id,
+            attempts,
+            delay,
+            message,
+        )
+
+
+class JobWorkerPool:
+    """
+    Fixed set of asyncio worker tasks that drain the jobs table.
+
+    Workers sleep until notified of a new job or until the poll
+    interval passes, which also picks up retries and expired leases.
+    """
+
+    def __init__(self):
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self, workers: int) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{number}")
+            for number in range(workers)
+        ]
+        if workers:
+            logger.info("Job workers started: workers=%d", workers)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers; safe to call from any thread."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                claim = await run_in_threadpool(claim_next_job)
+            except Exception as exc:
+                logger.error("Could not claim job: %s", str(exc))
+                claim = None
+
+            if claim is not None:
+                try:
+                    await run_job(claim)
+                except Exception:
+                    # e.g. the database failing while the job is
+                    # recorded; the worker lives on, and the job is
+                    # retried once its lease expires
+                    logger.exception(
+                        "Job run failed, retrying after its lease "
+                        "expires: id=%s",
+                        claim.job_id,
+                    )
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=settings.job_poll_interval_seconds,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+
+job_worker_pool = JobWorkerPool()
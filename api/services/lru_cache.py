@@ -0,0 +1,92 @@
+"""
+Small thread-safe LRU cache used by the in-process caches.
+
+functools.lru_cache only memoizes function calls; the caches here need
+explicit get/put/invalidate plus hit statistics, so this wraps an
+OrderedDict behind a lock instead.
+
+Besides an entry count, a cache can be bounded by total weight (an
+estimate of each entry's bytes, given to put). That keeps per-user
+caches within a memory budget however unevenly users are sized.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, max_entries: int, max_weight: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        # key -> (value, weight)
+        self._entries: OrderedDict = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value (marking it recently used) or None."""
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return self._entries[key][0]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value without counting or reordering it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any, weight: int = 1) -> None:
+        """
+        Insert or replace a value, evicting the oldest entries while
+        the cache is over its entry count or weight. The entry just put
+        is never evicted by its own put, even when it alone is over the
+        weight budget.
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._weight -= previous[1]
+            self._entries[key] = (value, weight)
+            self._weight += weight
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or (
+                    self.max_weight is not None
+                    and self._weight > self.max_weight
+                )
+            ):
+                _, (_, evicted_weight) = self._entries.popitem(last=False)
+                self._weight -= evicted_weight
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+            if self.max_weight is not None:
+                stats["weight"] = self._weight
+                stats["max_weight"] = self.max_weight
+            return stats
@@ -0,0 +1,284 @@
+"""
+Low-overhead latency histograms and counters in the Prometheus text
+format, served at /metrics.
+
+When uploads get slow, the question is which stage is to blame:
+decode, resize, color quantization, label classification, storage,
+the database commit or the refresh. Each stage of the upload pipelines
+and of the recommendation path runs under stage_timer. It records the
+duration in a fixed-bucket histogram per (pipeline, stage) and counts
+exceptions by type.
+
+Recording does one bisect over the buckets and a few increments under
+an uncontended lock, about a microsecond. The stages it wraps take
+milliseconds. Values that other components already count (cache hits,
+pool and executor load) are read from them at scrape time, so those
+add nothing to the hot paths.
+"""
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+# Histogram bucket upper bounds in seconds, from in-memory cache
+# lookups up to slow uploads
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Pipeline label values
+PIPELINE_CLOTHING = "clothing"
+PIPELINE_PHOTO = "photo"
+PIPELINE_BATCH = "batch"
+PIPELINE_RECOMMENDATION = "recommendation"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def _format_labels(pairs: Iterable[tuple[str, object]]) -> str:
+    labels = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in pairs
+    )
+    return f"{{{labels}}}" if labels else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_family(
+    name: str,
+    kind: str,
+    documentation: str,
+    samples: Iterable[tuple[dict, float]],
+) -> list[str]:
+    """Exposition lines of one metric family from (labels, value) pairs."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(
+            f"{name}{_format_labels(labels.items())} {_format_value(value)}"
+        )
+    return lines
+
+
+class Counter:
+    """Monotonic count per combination of label values."""
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = (
+                self._values.get(label_values, 0) + amount
+            )
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return render_family(
+            self.name,
+            "counter",
+            self.documentation,
+            (
+                (dict(zip(self.label_names, label_values)), value)
+                for label_values, value in values
+            ),
+        )
+
+
+class Histogram:
+    """Fixed-bucket distribution per combination of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        # Bucket bounds are inclusive ("le"), hence bisect_left
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                ]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted(
+                (label_values, (list(counts), total))
+                for label_values, (counts, total) in self._series.items()
+            )
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label_values, (counts, total) in series:
+            labels = list(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    [*labels, ("le", _format_value(float(bound)))]
+                )
+                lines.append(
+                    f"{self.name}_bucket{bucket_labels} {cumulative}"
+                )
+            series_labels = _format_labels(labels)
+            lines.append(
+                f"{self.name}_sum{series_labels} {_format_value(total)}"
+            )
+            lines.append(f"{self.name}_count{series_labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Recorded metrics plus collectors that are read at scrape time."""
+
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: list[Callable[[], list[str]]] = []
+
+    def counter(
+        self, name: str, documentation: str, label_names: tuple = ()
+    ) -> Counter:
+        metric = Counter(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect: Callable[[], list[str]]) -> None:
+        """Add a function returning exposition lines for each scrape."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+STAGE_SECONDS = metrics_registry.histogram(
+    "stylesavvy_stage_duration_seconds",
+    "Time spent in each stage of the upload and recommendation paths.",
+    ("pipeline", "stage"),
+)
+STAGE_ERRORS = metrics_registry.counter(
+    "stylesavvy_stage_errors_total",
+    "Exceptions raised by each stage, by exception type.",
+    ("pipeline", "stage", "exception"),
+)
+
+
+class StageTimer:
+    """
+    Context manager recording one stage's duration and failures.
+    Cancelled stages (e.g. an upload abandoned because analysis
+    failed) are not recorded at all.
+    """
+
+    __slots__ = ("pipeline", "stage", "_start")
+
+    def __init__(self, pipeline: str, stage: str):
+        self.pipeline = pipeline
+        self.stage = stage
+
+    def __enter__(self) -> "StageTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> Optional[bool]:
+        if exc_type is asyncio.CancelledError:
+            return None
+        STAGE_SECONDS.observe(
+            time.perf_counter() - self._start, self.pipeline, self.stage
+        )
+        if exc_type is not None:
+            STAGE_ERRORS.inc(self.pipeline, self.stage, exc_type.__name__)
+        return None
+
+
+def stage_timer(pipeline: str, stage: str) -> StageTimer:
+    """Time the enclosed block as stage of pipeline."""
+    return StageTimer(pipeline, stage)
+
+
+def timed_stage(pipeline: str, stage: str):
+    """Decorator form of stage_timer for sync and async functions."""
+
+    def decorate(function):
+        if asyncio.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with StageTimer(pipeline, stage):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with StageTimer(pipeline, stage):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
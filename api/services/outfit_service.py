@@ -0,0 +1,493 @@
+"""
+Top-k complete outfits from a user's wardrobe.
+
+An outfit is a top with a bottom, or a dress, plus an optional layer
+(jacket or blazer) over either. Its score is the sum of the pieces'
+item scores (the same rules that rank single items) plus a color term
+for every pair of pieces, see score_color_pair.
+
+Trying every combination costs tops x bottoms x layers, which is
+billions at a few thousand items. The color term only depends on the
+pieces' (dominant, secondary) color class, so instead the search is an
+exact branch-and-bound over color classes:
+
+- Only the k best items of each role and color class can appear in
+  the top k; any other item is beaten by k same-class items with an
+  equal or better score. Each class keeps its items best first.
+- Every (top class, bottom class) pair gets an upper bound, computed
+  with NumPy: the best item scores of both classes, their color
+  points, and a bound on the layer gain. Pairs are expanded highest
+  bound first until no bound beats the k-th best outfit found.
+- Expanding a pair picks the best layer for its classes once, then
+  walks both item lists best first and stops as soon as the k-th
+  best outfit can no longer be beaten.
+
+Outfits come back best first. Equal scores keep the order in which
+the search found them, which is deterministic for a given wardrobe.
+"""
+import heapq
+import itertools
+import logging
+from functools import cached_property, lru_cache
+from typing import Iterator, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from api.constants.color_constants import (
+    CLASHING_COLOR_PAIRS,
+    COMPLEMENTARY_COLOR_PAIRS,
+    NEUTRAL_COLORS,
+)
+from api.constants.enums import (
+    ClothingType,
+    EventType,
+    OutfitRole,
+    SkinTone,
+    SkinUndertone,
+    TimeOfDay,
+    WeatherType,
+)
+from api.constants.score_weights import (
+    COLOR_PAIR_ACCENT_SCORE,
+    COLOR_PAIR_CLASH_PENALTY,
+    COLOR_PAIR_COMPLEMENT_SCORE,
+    COLOR_PAIR_NEUTRAL_SCORE,
+    TOP_OUTFITS_COUNT,
+)
+from api.models.clothing import Clothing
+from api.services.ranking_service import WardrobeColumns, score_columns
+
+logger = logging.getLogger(__name__)
+
+# Role each clothing type plays in an outfit
+CLOTHING_ROLES: dict[str, OutfitRole] = {
+    ClothingType.SHIRT.value: OutfitRole.TOP,
+    ClothingType.TSHIRT.value: OutfitRole.TOP,
+    ClothingType.KURTA.value: OutfitRole.TOP,
+    ClothingType.HOODIE.value: OutfitRole.TOP,
+    ClothingType.JEANS.value: OutfitRole.BOTTOM,
+    ClothingType.TROUSERS.value: OutfitRole.BOTTOM,
+    ClothingType.SHORTS.value: OutfitRole.BOTTOM,
+    ClothingType.DRESS.value: OutfitRole.DRESS,
+    ClothingType.JACKET.value: OutfitRole.LAYER,
+    ClothingType.BLAZER.value: OutfitRole.LAYER,
+}
+
+# (dominant color, secondary color) of a piece
+ColorClass = tuple[Optional[str], Optional[str]]
+
+
+@lru_cache(maxsize=None)
+def score_color_pair(
+    first: ColorClass, second: ColorClass
+) -> tuple[int, tuple[str, ...]]:
+    """
+    Color points and reasons for wearing two pieces together.
+
+    The dominant colors pair as complementary, clashing, or (when
+    either is a neutral) safe; each secondary color that repeats the
+    other piece's dominant color adds an accent bonus. Pieces without
+    a detected color score nothing.
+    """
+    (color_a, accent_a), (color_b, accent_b) = first, second
+    if color_a is None or color_b is None:
+        return 0, ()
+
+    points = 0
+    reasons = []
+    pair = frozenset((color_a, color_b))
+    if pair in CLASHING_COLOR_PAIRS:
+        points += COLOR_PAIR_CLASH_PENALTY
+        reasons.append(f"{color_a} and {color_b} clash")
+    elif pair in COMPLEMENTARY_COLOR_PAIRS:
+        points += COLOR_PAIR_COMPLEMENT_SCORE
+        reasons.append(f"{color_a} and {color_b} complement each other")
+    elif color_a in NEUTRAL_COLORS or color_b in NEUTRAL_COLORS:
+        points += COLOR_PAIR_NEUTRAL_SCORE
+        reasons.append(f"{color_a} and {color_b} pair safely")
+
+    for accent, color in ((accent_a, color_b), (accent_b, color_a)):
+        if accent is not None and accent == color:
+            points += COLOR_PAIR_ACCENT_SCORE
+            reasons.append(f"{accent} accent ties the outfit together")
+    return points, tuple(reasons)
+
+
+class OutfitIndex:
+    """
+    Outfit role and color class of every item of a WardrobeColumns,
+    in the same order. Built once per wardrobe version.
+    """
+
+    def __init__(self, items: Sequence[Clothing]):
+        colors = [
+            (item.dominant_color, item.secondary_color) for item in items
+        ]
+        self.color_classes: list[ColorClass] = list(dict.fromkeys(colors))
+        class_of = {
+            color: code for code, color in enumerate(self.color_classes)
+        }
+        self.class_codes = np.fromiter(
+            map(class_of.__getitem__, colors),
+            dtype=np.int64,
+            count=len(colors),
+        )
+        members: dict[Optional[OutfitRole], list[int]] = {
+            role: [] for role in OutfitRole
+        }
+        for position, item in enumerate(items):
+            role = CLOTHING_ROLES.get(item.clothing_type)
+            if role is not None:
+                members[role].append(position)
+        self.members: dict[OutfitRole, np.ndarray] = {
+            role: np.array(positions, dtype=np.int64)
+            for role, positions in members.items()
+        }
+
+    @cached_property
+    def pair_points(self) -> np.ndarray:
+        """
+        score_color_pair points of every two color classes, as a
+        matrix indexed by class code. Built on first use.
+        """
+        size = len(self.color_classes)
+        if not size:
+            return np.zeros((0, 0), dtype=np.int64)
+        dominant, secondary = zip(*self.color_classes)
+        vocabulary = list(dict.fromkeys((*dominant, *secondary)))
+        code_of = {color: code for code, color in enumerate(vocabulary)}
+        dominant_codes = np.array([code_of[c] for c in dominant])
+        secondary_codes = np.array([code_of[c] for c in secondary])
+
+        # Dominant colors alone, then the accent bonuses on top
+        by_dominant = np.array(
+            [
+                [
+                    score_color_pair((first, None), (second, None))[0]
+                    for second in vocabulary
+                ]
+                for first in vocabulary
+            ],
+            dtype=np.int64,
+        )
+        points = by_dominant[np.ix_(dominant_codes, dominant_codes)]
+        has_accent = np.array([color is not None for color in secondary])
+        echoes = secondary_codes[:, None] == dominant_codes[None, :]
+        echoes &= has_accent[:, None]
+        points += COLOR_PAIR_ACCENT_SCORE * echoes
+        points += COLOR_PAIR_ACCENT_SCORE * echoes.T
+
+        has_color = np.array([color is not None for color in dominant])
+        return points * (has_color[:, None] & has_color[None, :])
+
+
+# (role, item index, item score, color class code) of one chosen piece
+_Piece = tuple[OutfitRole, int, int, int]
+
+
+class _RoleCandidates(NamedTuple):
+    """
+    Candidate items of one role grouped by color class.
+
+    Classes are ordered by their best item, and the items of class
+    position p are scores/indices[starts[p]:stops[p]], best first,
+    both by (score, order rank).
+    """
+
+    role: OutfitRole
+    classes: np.ndarray
+    best: np.ndarray
+    starts: list[int]
+    stops: list[int]
+    scores: list[int]
+    indices: list[int]
+
+    def piece(self, position: int, item: int) -> _Piece:
+        return (
+            self.role,
+            self.indices[item],
+            self.scores[item],
+            int(self.classes[position]),
+        )
+
+
+class Outfit(NamedTuple):
+    """One outfit: (role, item, item score) per piece, plus totals."""
+
+    pieces: list[tuple[OutfitRole, Clothing, int]]
+    score: int
+    color_score: int
+    color_reasons: list[str]
+
+
+def _candidates(
+    index: OutfitIndex,
+    role: OutfitRole,
+    scores: np.ndarray,
+    order_rank: np.ndarray,
+    k: int,
+) -> _RoleCandidates:
+    """The k best items of each color class in the role."""
+    members = index.members[role]
+    classes = index.class_codes[members]
+    member_scores = scores[members]
+    ranks = order_rank[members]
+
+    # Group by class, best first within each group, and keep k each
+    grouped = np.lexsort((ranks, -member_scores, classes))
+    grouped_classes = classes[grouped]
+    starts = np.flatnonzero(np.diff(grouped_classes, prepend=-1))
+    stops = starts + np.minimum(np.diff(np.r_[starts, len(grouped)]), k)
+
+    heads = grouped[starts]
+    order = np.lexsort((ranks[heads], -member_scores[heads]))
+    return _RoleCandidates(
+        role,
+        classes[heads][order],
+        member_scores[heads][order],
+        starts[order].tolist(),
+        stops[order].tolist(),
+        member_scores[grouped].tolist(),
+        members[grouped].tolist(),
+    )
+
+
+class _TopOutfits:
+    """
+    The k best outfits found so far. An outfit only displaces the
+    k-th best when it scores strictly higher, so ties keep the
+    earlier outfit.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        # (score, -sequence, pieces)
+        self._heap: list[tuple] = []
+        self._sequence = itertools.count()
+
+    def beats_threshold(self, bound: int) -> bool:
+        """Whether an outfit scoring at most bound could still enter."""
+        return len(self._heap) < self.k or bound > self._heap[0][0]
+
+    def offer(self, score: int, pieces: tuple[_Piece, ...]) -> None:
+        if not self.beats_threshold(score):
+            return
+        entry = (score, -next(self._sequence), pieces)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        else:
+            heapq.heapreplace(self._heap, entry)
+
+    def best_first(self) -> list[tuple]:
+        return sorted(self._heap, reverse=True)
+
+
+def _descending_levels(
+    bounds: np.ndarray,
+) -> Iterator[tuple[int, np.ndarray]]:
+    """
+    (bound, flat positions with that bound) for every distinct value
+    of an integer array, highest first.
+    """
+    flat = bounds.ravel()
+    if not len(flat):
+        return
+    level, lowest = int(flat.max()), int(flat.min())
+    while level >= lowest:
+        positions = np.flatnonzero(flat == level)
+        if len(positions):
+            yield level, positions
+        level -= 1
+
+
+class _Layers:
+    """
+    Best layer to wear over a base of given color classes. A layer is
+    only added when its item score and color points come out positive.
+    """
+
+    def __init__(self, layers: _RoleCandidates, pair_points: np.ndarray):
+        self.layers = layers
+        self.pair_points = pair_points
+
+    def points_with(self, classes: np.ndarray) -> np.ndarray:
+        """Color points of every layer class (rows) with classes."""
+        return self.pair_points[np.ix_(self.layers.classes, classes)]
+
+    def best(self, gains: np.ndarray) -> tuple[int, tuple[_Piece, ...]]:
+        """Gain and piece of the best layer given each class's gain."""
+        if not len(gains):
+            return 0, ()
+        position = int(np.argmax(gains))
+        if gains[position] <= 0:
+            return 0, ()
+        piece = self.layers.piece(position, self.layers.starts[position])
+        return int(gains[position]), (piece,)
+
+
+def _top_bottom_outfits(
+    tops: _RoleCandidates,
+    bottoms: _RoleCandidates,
+    layers: _Layers,
+    pair_points: np.ndarray,
+    found: _TopOutfits,
+) -> None:
+    """Offer the top + bottom outfits that can still make the top k."""
+    if not len(tops.classes) or not len(bottoms.classes):
+        return
+    base_points = pair_points[np.ix_(tops.classes, bottoms.classes)]
+    layer_tops = layers.points_with(tops.classes)
+    layer_bottoms = layers.points_with(bottoms.classes)
+    layer_best = layers.layers.best[:, None]
+
+    # Upper bound of the layer gain of each class pair: the best layer
+    # for the top class, with the best points any layer gets with the
+    # bottom class (and the other way round)
+    if len(layers.layers.classes):
+        by_top = (layer_best + layer_tops).max(axis=0)[:, None]
+        by_bottom = (layer_best + layer_bottoms).max(axis=0)[None, :]
+        layer_bound = np.maximum(
+            0,
+            np.minimum(
+                by_top + layer_bottoms.max(axis=0)[None, :],
+                by_bottom + layer_tops.max(axis=0)[:, None],
+            ),
+        )
+    else:
+        layer_bound = 0
+    bounds = (
+        tops.best[:, None] + bottoms.best[None, :] + base_points + layer_bound
+    )
+
+    columns = len(bottoms.classes)
+    for level, positions in _descending_levels(bounds):
+        if not found.beats_threshold(level):
+            break
+        for position in positions.tolist():
+            if not found.beats_threshold(level):
+                break
+            top_class, bottom_class = divmod(position, columns)
+            gain, layer = layers.best(
+                layers.layers.best
+                + layer_tops[:, top_class]
+                + layer_bottoms[:, bottom_class]
+            )
+            extra = int(base_points[top_class, bottom_class]) + gain
+            best_bottom = int(bottoms.best[bottom_class])
+            bottom_items = range(
+                bottoms.starts[bottom_class], bottoms.stops[bottom_class]
+            )
+            for top in range(tops.starts[top_class], tops.stops[top_class]):
+                top_score = tops.scores[top] + extra
+                if not found.beats_threshold(top_score + best_bottom):
+                    break
+                for bottom in bottom_items:
+                    score = top_score + bottoms.scores[bottom]
+                    if not found.beats_threshold(score):
+                        break
+                    found.offer(
+                        score,
+                        (
+                            tops.piece(top_class, top),
+                            bottoms.piece(bottom_class, bottom),
+                            *layer,
+                        ),
+                    )
+
+
+def _dress_outfits(
+    dresses: _RoleCandidates, layers: _Layers, found: _TopOutfits
+) -> None:
+    """Offer the dress outfits that can still make the top k."""
+    if not len(dresses.classes):
+        return
+    gains = layers.layers.best[:, None] + layers.points_with(dresses.classes)
+    bounds = dresses.best + gains.max(axis=0, initial=0)
+    for position in np.argsort(-bounds, kind="stable").tolist():
+        if not found.beats_threshold(int(bounds[position])):
+            break
+        gain, layer = layers.best(gains[:, position])
+        for dress in range(dresses.starts[position], dresses.stops[position]):
+            score = dresses.scores[dress] + gain
+            if not found.beats_threshold(score):
+                break
+            found.offer(score, (dresses.piece(position, dress), *layer))
+
+
+def _outfit_color(
+    index: OutfitIndex, pieces: Sequence[_Piece]
+) -> tuple[int, list[str]]:
+    """Color points and reasons summed over every pair of pieces."""
+    points = 0
+    reasons: list[str] = []
+    for first, second in itertools.combinations(pieces, 2):
+        pair_points, pair_reasons = score_color_pair(
+            index.color_classes[first[3]], index.color_classes[second[3]]
+        )
+        points += pair_points
+        reasons.extend(pair_reasons)
+    return points, reasons
+
+
+def top_outfits(
+    columns: WardrobeColumns,
+    event: EventType,
+    weather: WeatherType,
+    time_of_day: TimeOfDay,
+    skin_tone: Optional[SkinTone],
+    skin_undertone: Optional[SkinUndertone],
+    k: int = TOP_OUTFITS_COUNT,
+    index: Optional[OutfitIndex] = None,
+) -> list[Outfit]:
+    """
+    The k best complete outfits, best first.
+
+    Layers are left out in hot weather. index is the wardrobe's
+    OutfitIndex when one is cached; it is built from columns otherwise.
+    """
+    if k <= 0:
+        return []
+    if index is None:
+        index = OutfitIndex(columns.items)
+    scores = score_columns(
+        columns, event, weather, time_of_day, skin_tone, skin_undertone
+    )
+
+    def candidates(role: OutfitRole) -> _RoleCandidates:
+        return _candidates(index, role, scores, columns.order_rank, k)
+
+    layer_role = OutfitRole.LAYER
+    if weather == WeatherType.HOT:
+        empty = np.empty(0, dtype=np.int64)
+        layer_candidates = _RoleCandidates(
+            layer_role, empty, empty, [], [], [], []
+        )
+    else:
+        layer_candidates = candidates(layer_role)
+    layers = _Layers(layer_candidates, index.pair_points)
+
+    found = _TopOutfits(k)
+    _top_bottom_outfits(
+        candidates(OutfitRole.TOP),
+        candidates(OutfitRole.BOTTOM),
+        layers,
+        index.pair_points,
+        found,
+    )
+    _dress_outfits(candidates(OutfitRole.DRESS), layers, found)
+
+    outfits = []
+    for score, _, pieces in found.best_first():
+        color_score, color_reasons = _outfit_color(index, pieces)
+        outfits.append(
+            Outfit(
+                pieces=[
+                    (role, columns.items[item], item_score)
+                    for role, item, item_score, _ in pieces
+                ],
+                score=score,
+                color_score=color_score,
+                color_reasons=color_reasons,
+            )
+        )
+    return outfits
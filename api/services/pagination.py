@@ -0,0 +1,56 @@
+"""
+Keyset pagination over the wardrobe.
+
+Pages are ordered by (created_at, id) and a cursor names the last item
+of the previous page, so a page is found by position in the ordered
+key list instead of by offset: fetching page N costs the same as
+fetching page 1, and items added meanwhile never shift or repeat
+earlier pages.
+
+Cursors are opaque to clients: URL-safe base64 of the JSON
+[created_at, id] of the last item returned.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from api.exceptions.custom_exceptions import InvalidPageCursorError
+
+# (has no creation date, created_at, id); undated items sort last,
+# matching the ranking tie-break order
+PageKey = tuple[bool, Any, int]
+
+
+def page_key(created_at: Optional[datetime], id: int) -> PageKey:
+    """Sort key of an item in page order."""
+    if created_at is None:
+        return (True, 0, id)
+    return (False, created_at, id)
+
+
+def encode_cursor(created_at: Optional[datetime], id: int) -> str:
+    """Opaque cursor pointing just after the given item."""
+    raw = json.dumps(
+        [created_at.isoformat() if created_at is not None else None, id],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> PageKey:
+    """Page key encoded in a cursor; InvalidPageCursorError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(id, int):
+            raise ValueError("cursor id is not an integer")
+        return page_key(
+            datetime.fromisoformat(created_at)
+            if created_at is not None
+            else None,
+            id,
+        )
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise InvalidPageCursorError() from exc
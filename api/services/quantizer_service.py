@@ -0,0 +1,268 @@
+"""
+Color quantizer engines for dominant color extraction.
+
+Every engine takes an (N, 3) RGB pixel array and returns at most
+n_clusters color centers with the number of pixels assigned to each.
+The engine is selected via settings.color_quantizer:
+
+- KMEANS: exact sklearn KMeans on every pixel (reference results)
+- CV2_KMEANS: OpenCV's C++ kmeans, same algorithm with fewer restarts
+- MINIBATCH: MiniBatch KMeans fitted on a stratified pixel sample
+- HISTOGRAM: median cut over a coarse 3D color histogram
+
+Use benchmarks/quantizer_harness.py to compare speed and accuracy
+before switching engines.
+
+sklearn takes over a second to import, so it is only imported when a
+KMEANS or MINIBATCH engine first runs (or by the startup warm-up).
+"""
+import logging
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from api.config import settings
+from api.constants.color_constants import (
+    KMEANS_N_INIT,
+    CV2_KMEANS_ATTEMPTS,
+    CV2_KMEANS_MAX_ITER,
+    CV2_KMEANS_EPSILON,
+    QUANTIZER_SAMPLE_SIZE,
+    MINIBATCH_BATCH_SIZE,
+    HISTOGRAM_BITS_PER_CHANNEL,
+    HISTOGRAM_REFINE_ITERATIONS,
+)
+from api.constants.enums import ColorQuantizer
+
+logger = logging.getLogger(__name__)
+
+# Fixed seed keeps every engine deterministic for the same image
+RANDOM_SEED = 42
+
+QuantizerResult = tuple[np.ndarray, np.ndarray]
+
+
+def _assign_counts(pixels: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Count how many pixels are closest to each center."""
+    distances = (
+        (pixels[:, np.newaxis, :].astype(np.float32) - centers) ** 2
+    ).sum(axis=2)
+    labels = np.argmin(distances, axis=1)
+    return np.bincount(labels, minlength=len(centers))
+
+
+def _stratified_sample(pixels: np.ndarray, sample_size: int) -> np.ndarray:
+    """
+    Pick one random pixel from each of sample_size equal strata.
+
+    Pixels are in row-major order, so every region of the image
+    is represented in proportion to its area.
+    """
+    if len(pixels) <= sample_size:
+        return pixels
+
+    rng = np.random.default_rng(RANDOM_SEED)
+    stride = len(pixels) / sample_size
+    offsets = rng.random(sample_size) * stride
+    indices = (np.arange(sample_size) * stride + offsets).astype(np.intp)
+    return pixels[indices]
+
+
+def quantize_kmeans(pixels: np.ndarray, n_clusters: int) -> QuantizerResult:
+    """Exact KMeans on every pixel - slowest, used as the reference."""
+    from sklearn.cluster import KMeans
+
+    kmeans = KMeans(
+        n_clusters=n_clusters,
+        random_state=RANDOM_SEED,
+        n_init=KMEANS_N_INIT,
+    )
+    kmeans.fit(pixels)
+    counts = np.bincount(kmeans.labels_, minlength=n_clusters)
+    return kmeans.cluster_centers_, counts
+
+
+def quantize_cv2_kmeans(
+    pixels: np.ndarray, n_clusters: int
+) -> QuantizerResult:
+    """
+    OpenCV kmeans with k-means++ seeding.
+
+    Same objective as sklearn KMeans, but a tight C++ loop with
+    fewer restarts and a looser stopping criterion.
+    """
+    cv2.setRNGSeed(RANDOM_SEED)
+    criteria = (
+        cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER,
+        CV2_KMEANS_MAX_ITER,
+        CV2_KMEANS_EPSILON,
+    )
+    _, labels, centers = cv2.kmeans(
+        pixels.astype(np.float32),
+        n_clusters,
+        None,
+        criteria,
+        CV2_KMEANS_ATTEMPTS,
+        cv2.KMEANS_PP_CENTERS,
+    )
+    counts = np.bincount(labels.ravel(), minlength=n_clusters)
+    return centers.astype(np.float64), counts
+
+
+def quantize_minibatch(
+    pixels: np.ndarray, n_clusters: int
+) -> QuantizerResult:
+    """
+    MiniBatch KMeans fitted on a stratified sample of the pixels.
+
+    Fitting on ~10k pixels instead of 90k is where the time goes;
+    all pixels are then assigned to the centers so the reported
+    percentages still cover the whole image.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    sample = _stratified_sample(pixels, QUANTIZER_SAMPLE_SIZE)
+    kmeans = MiniBatchKMeans(
+        n_clusters=n_clusters,
+        random_state=RANDOM_SEED,
+        batch_size=MINIBATCH_BATCH_SIZE,
+        n_init=3,
+    )
+    kmeans.fit(sample)
+    centers = kmeans.cluster_centers_
+    return centers, _assign_counts(pixels, centers)
+
+
+def _split_box(
+    box: np.ndarray, means: np.ndarray, weights: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cut a box of histogram cells in two along its widest channel.
+
+    The cut position is the one that minimizes the summed squared
+    error of both halves, so a tight dominant color is kept whole
+    instead of being halved at the median.
+    """
+    box_means = means[box]
+    box_weights = weights[box].astype(np.float64)
+    spread = np.cov(box_means, rowvar=False, aweights=box_weights)
+    channel = int(np.argmax(np.diag(spread)))
+    ordered = np.argsort(box_means[:, channel], kind="stable")
+
+    weighted = box_means[ordered] * box_weights[ordered, np.newaxis]
+    left_weight = np.cumsum(box_weights[ordered])[:-1]
+    left_sum = np.cumsum(weighted, axis=0)[:-1]
+    right_weight = box_weights.sum() - left_weight
+    right_sum = weighted.sum(axis=0) - left_sum
+
+    # SSE = const - |sum|^2 / weight for each half; maximize the rest
+    separation = (left_sum ** 2).sum(axis=1) / left_weight + (
+        right_sum ** 2
+    ).sum(axis=1) / right_weight
+    split_at = int(np.argmax(separation)) + 1
+    return box[ordered[:split_at]], box[ordered[split_at:]]
+
+
+def quantize_histogram(
+    pixels: np.ndarray, n_clusters: int
+) -> QuantizerResult:
+    """
+    Median-cut style quantizer over a coarse 3D color histogram.
+
+    Pixels are binned into 2**(3*bits) cells in one pass. The occupied
+    cells (a few hundred at most, instead of 90k pixels) are split
+    recursively, always cutting the box with the largest squared error.
+    A few weighted Lloyd iterations over the cells then polish the
+    centers, which are exact means of the pixels they cover.
+    """
+    bits = HISTOGRAM_BITS_PER_CHANNEL
+    shift = 8 - bits
+    cell_count = 1 << (3 * bits)
+
+    coarse = (pixels >> shift).astype(np.intp)
+    cell_index = (
+        (coarse[:, 0] << (2 * bits)) | (coarse[:, 1] << bits) | coarse[:, 2]
+    )
+
+    cell_pixels = np.bincount(cell_index, minlength=cell_count)
+    cell_sums = np.stack(
+        [
+            np.bincount(
+                cell_index, weights=pixels[:, channel], minlength=cell_count
+            )
+            for channel in range(3)
+        ],
+        axis=1,
+    )
+
+    occupied = np.flatnonzero(cell_pixels)
+    weights = cell_pixels[occupied]
+    means = cell_sums[occupied] / weights[:, np.newaxis]
+
+    def box_error(box: np.ndarray) -> float:
+        box_weights = weights[box]
+        center = np.average(means[box], axis=0, weights=box_weights)
+        return float(
+            (((means[box] - center) ** 2).sum(axis=1) * box_weights).sum()
+        )
+
+    # Each box is an array of positions into `occupied`
+    boxes = [np.arange(len(occupied))]
+    while len(boxes) < n_clusters:
+        splittable = [i for i, box in enumerate(boxes) if len(box) > 1]
+        if not splittable:
+            break
+        box_index = max(splittable, key=lambda i: box_error(boxes[i]))
+        boxes.extend(_split_box(boxes.pop(box_index), means, weights))
+
+    centers = np.array(
+        [np.average(means[box], axis=0, weights=weights[box]) for box in boxes]
+    )
+    counts = np.array([weights[box].sum() for box in boxes])
+    filled = counts > 0
+    for _ in range(HISTOGRAM_REFINE_ITERATIONS):
+        labels = np.argmin(
+            ((means[:, np.newaxis, :] - centers) ** 2).sum(axis=2), axis=1
+        )
+        counts = np.bincount(labels, weights=weights, minlength=len(centers))
+        totals = np.stack(
+            [
+                np.bincount(
+                    labels,
+                    weights=means[:, channel] * weights,
+                    minlength=len(centers),
+                )
+                for channel in range(3)
+            ],
+            axis=1,
+        )
+        filled = counts > 0
+        centers[filled] = totals[filled] / counts[filled, np.newaxis]
+
+    return centers[filled], counts[filled].astype(np.intp)
+
+
+QUANTIZER_ENGINES: dict[
+    ColorQuantizer, Callable[[np.ndarray, int], QuantizerResult]
+] = {
+    ColorQuantizer.KMEANS: quantize_kmeans,
+    ColorQuantizer.CV2_KMEANS: quantize_cv2_kmeans,
+    ColorQuantizer.MINIBATCH: quantize_minibatch,
+    ColorQuantizer.HISTOGRAM: quantize_histogram,
+}
+
+
+def quantize_colors(
+    pixels: np.ndarray,
+    n_clusters: int,
+    engine: Optional[ColorQuantizer] = None,
+) -> QuantizerResult:
+    """
+    Reduce an (N, 3) RGB pixel array to at most n_clusters colors.
+
+    Returns (centers, pixel_counts) in no particular order.
+    Uses the engine from settings unless one is given explicitly.
+    """
+    engine = engine or settings.color_quantizer
+    return QUANTIZER_ENGINES[engine](pixels, n_clusters)
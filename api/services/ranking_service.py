@@ -0,0 +1,532 @@
+"""
+Ranking engines for outfit recommendations.
+
+Every engine returns the same top items, scores, and reasons as the
+rule-based reference in recommendation_service; they differ only in
+how much work they do per wardrobe item. The engine is selected via
+settings.recommendation_engine:
+
+- RULES: calls every scoring rule on every item (reference results)
+- VECTORIZED: encodes the wardrobe as integer-coded NumPy columns and
+  scores all items with array lookups; reasons are built only for
+  the items that are returned
+- MATERIALIZED: groups identical items into buckets and reads bucket
+  scores and reasons from the precompiled score tables, so no rule
+  code runs at request time
+- SQL: has the database score and sort the rows (see sql_ranking);
+  wardrobes below settings.sql_ranking_min_items use MATERIALIZED
+
+Rankings are ordered by score (highest first), then creation date
+(oldest first), then id, so equal scores always come back in the
+same order whichever engine is used.
+"""
+import logging
+from datetime import datetime
+from functools import cached_property
+from operator import attrgetter
+from typing import Callable, NamedTuple, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.constants.enums import (
+    EventType,
+    RecommendationEngine,
+    SkinTone,
+    SkinUndertone,
+    TimeOfDay,
+    WeatherType,
+)
+from api.constants.score_weights import TOP_RECOMMENDATIONS_COUNT
+from api.models.clothing import Clothing
+from api.services.recommendation_service import (
+    SCORING_RULES,
+    ScoredItem,
+    get_top_recommendations,
+    rule_outcomes,
+    score_clothing_item,
+    scoring_context,
+)
+from api.services.score_tables import (
+    ATTRIBUTES,
+    ScoreTables,
+    get_score_tables,
+)
+from api.services.sql_ranking import sql_top_recommendations
+
+logger = logging.getLogger(__name__)
+
+_COLUMN_GETTER = attrgetter("id", *ATTRIBUTES, "created_at")
+
+
+def _encode(values: Sequence[Optional[str]]) -> tuple[np.ndarray, list]:
+    """Map each distinct value to a small integer code."""
+    vocabulary = list(dict.fromkeys(values))
+    code_of = {value: code for code, value in enumerate(vocabulary)}
+    codes = np.fromiter(
+        map(code_of.__getitem__, values), dtype=np.int32, count=len(values)
+    )
+    return codes, vocabulary
+
+
+def _timestamp(created_at: Optional[datetime]) -> float:
+    # Items without a creation date sort after all dated ones
+    return created_at.timestamp() if created_at is not None else np.inf
+
+
+class WardrobeBuckets(NamedTuple):
+    """
+    Items grouped by identical (occasion, season, color) codes.
+
+    members lists item indices bucket by bucket, each bucket in
+    (created_at, id) order; a bucket's items are
+    members[starts[b]:starts[b] + counts[b]].
+    """
+
+    codes: dict[str, np.ndarray]
+    starts: np.ndarray
+    counts: np.ndarray
+    members: np.ndarray
+
+
+class WardrobeColumns:
+    """
+    Column-oriented encoding of a list of clothing items.
+
+    The string attributes the scoring rules read (occasion, season,
+    dominant color) become int32 code arrays plus a small vocabulary
+    each, so a rule only has to be evaluated once per distinct value.
+    order_rank is each item's position by (created_at, id), which
+    lets ranking use a single integer key per item.
+    """
+
+    def __init__(self, items: Sequence[Clothing]):
+        self.items = list(items)
+        count = len(self.items)
+        if count:
+            ids, *attribute_values, created = zip(
+                *map(_COLUMN_GETTER, self.items)
+            )
+        else:
+            ids, attribute_values, created = (), [()] * len(ATTRIBUTES), ()
+
+        self.codes: dict[str, np.ndarray] = {}
+        self.vocabularies: dict[str, list] = {}
+        for attribute, values in zip(ATTRIBUTES, attribute_values):
+            self.codes[attribute], self.vocabularies[attribute] = _encode(
+                values
+            )
+
+        created_seconds = np.fromiter(
+            map(_timestamp, created), dtype=np.float64, count=count
+        )
+        self.order_rank = np.empty(count, dtype=np.int64)
+        self.order_rank[
+            np.lexsort((np.array(ids, dtype=np.int64), created_seconds))
+        ] = np.arange(count)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @cached_property
+    def buckets(self) -> WardrobeBuckets:
+        """Group-by over all attribute codes, computed on first use."""
+        combined = np.zeros(len(self.items), dtype=np.int64)
+        for attribute in ATTRIBUTES:
+            combined = combined * len(self.vocabularies[attribute])
+            combined += self.codes[attribute]
+
+        members = np.lexsort((self.order_rank, combined))
+        keys, starts, counts = np.unique(
+            combined[members], return_index=True, return_counts=True
+        )
+
+        codes = {}
+        for attribute in reversed(ATTRIBUTES):
+            size = len(self.vocabularies[attribute])
+            codes[attribute] = keys % size
+            keys = keys // size
+        return WardrobeBuckets(codes, starts, counts, members)
+
+
+def score_columns(
+    columns: WardrobeColumns,
+    event: EventType,
+    weather: WeatherType,
+    time_of_day: TimeOfDay,
+    skin_tone: Optional[SkinTone],
+    skin_undertone: Optional[SkinUndertone],
+) -> np.ndarray:
+    """
+    Total score of every item, equal to score_clothing_item's.
+
+    Each rule depends on one attribute only, so it is evaluated per
+    vocabulary entry and gathered through the codes.
+    """
+    context = scoring_context(
+        event, weather, time_of_day, skin_tone, skin_undertone
+    )
+    parts = {
+        attribute: np.zeros(len(vocabulary), dtype=np.int64)
+        for attribute, vocabulary in columns.vocabularies.items()
+    }
+    for rule, attribute, field in SCORING_RULES:
+        outcomes = rule_outcomes(
+            rule, attribute, columns.vocabularies[attribute], context[field]
+        )
+        parts[attribute] += np.array(
+            [points for points, _ in outcomes], dtype=np.int64
+        )
+
+    scores = np.zeros(len(columns), dtype=np.int64)
+    for attribute, part in parts.items():
+        scores += part[columns.codes[attribute]]
+    return scores
+
+
+def top_k_indices(
+    scores: np.ndarray, order_rank: np.ndarray, k: int
+) -> np.ndarray:
+    """
+    Indices of the k best items, best first.
+
+    Score and tie-break rank are folded into one int64 key
+    (score * n + reversed rank), so one argpartition selects the
+    top k exactly and only those k are sorted.
+    """
+    n = len(scores)
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+    keys = scores.astype(np.int64) * n + (n - 1 - order_rank)
+    if k < n:
+        candidates = np.argpartition(keys, n - k)[n - k:]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(keys[candidates])[::-1]]
+
+
+def vectorized_top_recommendations(
+    clothing_items: Sequence[Clothing],
+    event: EventType,
+    weather: WeatherType,
+    time_of_day: TimeOfDay,
+    skin_tone: Optional[SkinTone],
+    skin_undertone: Optional[SkinUndertone],
+    columns: Optional[WardrobeColumns] = None,
+) -> list[ScoredItem]:
+    """
+    Same result as get_top_recommendations, computed with NumPy.
+
+    An already built WardrobeColumns for these items can be passed
+    in to skip the encoding step.
+    """
+    if columns is None:
+        columns = WardrobeColumns(clothing_items)
+
+    scores = score_columns(
+        columns, event, weather, time_of_day, skin_tone, skin_undertone
+    )
+    top = top_k_indices(
+        scores, columns.order_rank, TOP_RECOMMENDATIONS_COUNT
+    )
+
+    top_items = []
+    for index in top:
+        item = columns.items[index]
+        _, reasons = score_clothing_item(
+            item, event, weather, time_of_day, skin_tone, skin_undertone
+        )
+        top_items.append((item, int(scores[index]), reasons))
+
+    logger.info(
+        "Returning top %d recommendations out of %d items",
+        len(top_items),
+        len(columns),
+    )
+    return top_items
+
+
+def top_k_from_buckets(
+    bucket_scores: np.ndarray,
+    buckets: WardrobeBuckets,
+    order_rank: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (item indices, their buckets) of the k best items, best first.
+
+    Takes the best-scoring buckets until they hold k items, plus every
+    bucket tied with the last one taken, then breaks ties using at
+    most k leading items of each; work does not grow with item count.
+    """
+    if len(bucket_scores) == 0 or k <= 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    by_score = np.argsort(-bucket_scores, kind="stable")
+    covered = np.cumsum(buckets.counts[by_score])
+    last = min(int(np.searchsorted(covered, k)), len(by_score) - 1)
+    chosen = np.flatnonzero(bucket_scores >= bucket_scores[by_score[last]])
+
+    taken = np.minimum(buckets.counts[chosen], k)
+    candidates = np.concatenate(
+        [
+            buckets.members[start:start + size]
+            for start, size in zip(buckets.starts[chosen], taken)
+        ]
+    )
+    candidate_buckets = np.repeat(chosen, taken)
+    best = np.lexsort(
+        (order_rank[candidates], -bucket_scores[candidate_buckets])
+    )[:k]
+    return candidates[best], candidate_buckets[best]
+
+
+def _bucket_positions(
+    columns: WardrobeColumns, tables: ScoreTables
+) -> Optional[list[np.ndarray]]:
+    """
+    Score table position of every bucket, per attribute, or None when
+    the wardrobe holds values the tables were not compiled for.
+    """
+    positions = {
+        attribute: tables.value_indices(
+            attribute, columns.vocabularies[attribute]
+        )
+        for attribute in ATTRIBUTES
+    }
+    if any(position is None for position in positions.values()):
+        return None
+    buckets = columns.buckets
+    return [
+        positions[attribute][buckets.codes[attribute]]
+        for attribute in ATTRIBUTES
+    ]
+
+
+def _top_from_bucket_scores(
+    columns: WardrobeColumns,
+    tables: ScoreTables,
+    context: int,
+    bucket_positions: list[np.ndarray],
+    bucket_scores: np.ndarray,
+) -> list[ScoredItem]:
+    """Top items of one context, with reasons read from the tables."""
+    top, top_buckets = top_k_from_buckets(
+        bucket_scores,
+        columns.buckets,
+        columns.order_rank,
+        TOP_RECOMMENDATIONS_COUNT,
+    )
+    top_items = []
+    for index, bucket in zip(top, top_buckets):
+        reasons = tables.reasons(
+            context, *(int(position[bucket]) for position in bucket_positions)
+        )
+        top_items.append(
+            (columns.items[index], int(bucket_scores[bucket]), reasons)
+        )
+    return top_items
+
+
+def materialized_top_recommendations(
+    clothing_items: Sequence[Clothing],
+    event: EventType,
+    weather: WeatherType,
+    time_of_day: TimeOfDay,
+    skin_tone: Optional[SkinTone],
+    skin_undertone: Optional[SkinUndertone],
+    columns: Optional[WardrobeColumns] = None,
+) -> list[ScoredItem]:
+    """
+    Same result as get_top_recommendations, read from score tables.
+
+    Wardrobes holding values the tables were not compiled for (for
+    example legacy rows) are ranked by the vectorized engine instead.
+    """
+    if columns is None:
+        columns = WardrobeColumns(clothing_items)
+
+    tables = get_score_tables()
+    bucket_positions = _bucket_positions(columns, tables)
+    if bucket_positions is None:
+        logger.debug("Wardrobe values outside score tables; vectorizing")
+        return vectorized_top_recommendations(
+            clothing_items,
+            event,
+            weather,
+            time_of_day,
+            skin_tone,
+            skin_undertone,
+            columns=columns,
+        )
+
+    context = tables.context_index(
+        event, weather, time_of_day, skin_tone, skin_undertone
+    )
+    bucket_scores = tables.totals[context][tuple(bucket_positions)]
+    top_items = _top_from_bucket_scores(
+        columns, tables, context, bucket_positions, bucket_scores
+    )
+
+    logger.info(
+        "Returning top %d recommendations out of %d items",
+        len(top_items),
+        len(columns),
+    )
+    return top_items
+
+
+def rules_top_recommendations(
+    clothing_items: Sequence[Clothing],
+    event: EventType,
+    weather: WeatherType,
+    time_of_day: TimeOfDay,
+    skin_tone: Optional[SkinTone],
+    skin_undertone: Optional[SkinUndertone],
+    columns: Optional[WardrobeColumns] = None,
+) -> list[ScoredItem]:
+    """Reference engine; the columns encoding is not used."""
+    return get_top_recommendations(
+        list(clothing_items),
+        event,
+        weather,
+        time_of_day,
+        skin_tone,
+        skin_undertone,
+    )
+
+
+RANKING_ENGINES: dict[
+    RecommendationEngine, Callable[..., list[ScoredItem]]
+] = {
+    RecommendationEngine.RULES: rules_top_recommendations,
+    RecommendationEngine.VECTORIZED: vectorized_top_recommendations,
+    RecommendationEngine.MATERIALIZED: materialized_top_recommendations,
+}
+
+
+def rank_clothing(
+    clothing_items: Sequence[Clothing],
+    event: EventType,
+    weather: WeatherType,
+    time_of_day: TimeOfDay,
+    skin_tone: Optional[SkinTone],
+    skin_undertone: Optional[SkinUndertone],
+    engine: Optional[RecommendationEngine] = None,
+    columns: Optional[WardrobeColumns] = None,
+    db: Optional[Session] = None,
+    user_id: Optional[int] = None,
+) -> list[ScoredItem]:
+    """
+    Top (clothing, score, reasons) recommendations for a context.
+
+    Uses the engine from settings unless one is given explicitly.
+    Pass the prebuilt WardrobeColumns of clothing_items, if available,
+    to skip encoding them again. The SQL engine ranks the user's rows
+    in db (which clothing_items must mirror); without a session and
+    user, or below settings.sql_ranking_min_items, it falls back to
+    MATERIALIZED.
+    """
+    engine = engine or settings.recommendation_engine
+    if engine == RecommendationEngine.SQL:
+        if (
+            db is not None
+            and user_id is not None
+            and len(clothing_items) >= settings.sql_ranking_min_items
+        ):
+            return sql_top_recommendations(
+                db,
+                user_id,
+                event,
+                weather,
+                time_of_day,
+                skin_tone,
+                skin_undertone,
+            )
+        engine = RecommendationEngine.MATERIALIZED
+    return RANKING_ENGINES[engine](
+        clothing_items,
+        event,
+        weather,
+        time_of_day,
+        skin_tone,
+        skin_undertone,
+        columns=columns,
+    )
+
+
+def rank_clothing_batch(
+    clothing_items: Sequence[Clothing],
+    contexts: Sequence[tuple[EventType, WeatherType, TimeOfDay]],
+    skin_tone: Optional[SkinTone],
+    skin_undertone: Optional[SkinUndertone],
+    engine: Optional[RecommendationEngine] = None,
+    columns: Optional[WardrobeColumns] = None,
+) -> list[list[ScoredItem]]:
+    """
+    Top recommendations for several (event, weather, time of day)
+    contexts of one wardrobe, in the order of contexts.
+
+    Each ranking equals rank_clothing's for its context. The wardrobe
+    is bucketed and looked up in the score tables once, and the bucket
+    scores of all distinct contexts are gathered in a single array
+    operation; what remains per context (picking the top buckets and
+    their reasons) does not depend on the wardrobe size. The SQL
+    engine ranks in memory here, as the wardrobe is loaded anyway.
+    The RULES engine, and wardrobes with values outside the tables,
+    are ranked context by context.
+    """
+    engine = engine or settings.recommendation_engine
+    if columns is None:
+        columns = WardrobeColumns(clothing_items)
+    distinct = list(dict.fromkeys(contexts))
+
+    tables = get_score_tables()
+    bucket_positions = None
+    if engine != RecommendationEngine.RULES:
+        bucket_positions = _bucket_positions(columns, tables)
+
+    if bucket_positions is None:
+        if engine != RecommendationEngine.RULES:
+            engine = RecommendationEngine.VECTORIZED
+        ranked = {
+            context: RANKING_ENGINES[engine](
+                clothing_items,
+                *context,
+                skin_tone,
+                skin_undertone,
+                columns=columns,
+            )
+            for context in distinct
+        }
+    else:
+        rows = np.array(
+            [
+                tables.context_index(*context, skin_tone, skin_undertone)
+                for context in distinct
+            ],
+            dtype=np.int64,
+        )
+        # (contexts, buckets) scores in one gather
+        all_scores = tables.totals[
+            (
+                rows[:, None],
+                *(position[None, :] for position in bucket_positions),
+            )
+        ]
+        ranked = {
+            context: _top_from_bucket_scores(
+                columns, tables, int(row), bucket_positions, bucket_scores
+            )
+            for context, row, bucket_scores in zip(distinct, rows, all_scores)
+        }
+
+    logger.info(
+        "Ranked %d contexts (%d distinct) over %d items",
+        len(contexts),
+        len(distinct),
+        len(columns),
+    )
+    return [ranked[context] for context in contexts]
@@ -0,0 +1,77 @@
+"""
+Cache of serialized recommendation responses.
+
+The web Recommendations page posts the same (event, weather, time of
+day) over and over while the wardrobe and profile stay the same. The
+ranked response depends only on that context plus the user's wardrobe
+and profile, so it is cached under the user, the context and the
+wardrobe store's version counters. Any upload or profile change bumps
+a version, which makes old entries unreachable; they age out of the
+LRU, which is bounded by entry count and by total body bytes.
+
+Entries hold the final JSON bytes and their ETag, so a hit costs one
+dictionary lookup and no serialization.
+"""
+from typing import NamedTuple, Optional
+
+from api.config import settings
+from api.constants.enums import EventType, TimeOfDay, WeatherType
+from api.services.http_cache import strong_etag
+from api.services.lru_cache import LRUCache
+from api.services.wardrobe_store import WardrobeState
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class RecommendationCache:
+    """Bounded LRU of recommendation response bodies."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self._entries = LRUCache(max_entries, max_weight=max_bytes)
+
+    @staticmethod
+    def key(
+        user_id: int,
+        event: EventType,
+        weather: WeatherType,
+        time_of_day: TimeOfDay,
+        state: WardrobeState,
+        variant: tuple = (),
+    ) -> tuple:
+        """
+        Cache key of one response; variant tells apart responses of
+        other endpoints or options for the same context.
+        """
+        return (
+            user_id,
+            event,
+            weather,
+            time_of_day,
+            state.wardrobe.version,
+            state.profile.version,
+            *variant,
+        )
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        return self._entries.get(key)
+
+    def put(self, key: tuple, body: bytes) -> CachedResponse:
+        """Store a freshly built response body and return it with its ETag."""
+        cached = CachedResponse(body, strong_etag(body))
+        self._entries.put(key, cached, weight=len(body))
+        return cached
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+recommendation_cache = RecommendationCache(
+    settings.recommendation_cache_size,
+    int(settings.recommendation_cache_max_mb * 1024 * 1024),
+)
@@ -9,7 +9,9 @@ No ML models are used - this is intentionally simple,
 interpretable, and easy to tune via score_weights.py.
 """
 import logging
-from typing import Optional
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Optional, Sequence
 
 from api.constants.enums import (
     EventType,
@@ -39,6 +41,8 @@ from api.models.clothing import Clothing
 
 logger = logging.getLogger(__name__)
 
+ScoredItem = tuple[Clothing, int, list[str]]
+
 
 def score_event_match(
     clothing: Clothing, event: EventType
@@ -178,6 +182,54 @@ def score_time_of_day(
     return 0, None
 
 
+# Every rule with the clothing attribute and the context field it reads,
+# in the order their reasons are reported. Each rule depends on a single
+# attribute, which the vectorized and table-based rankers rely on.
+SCORING_RULES: list[tuple[Callable, str, str]] = [
+    (score_event_match, "occasion", "event"),
+    (score_weather_color, "dominant_color", "weather"),
+    (score_season_weather, "season", "weather"),
+    (score_skin_tone_compatibility, "dominant_color", "skin_tone"),
+    (score_undertone_compatibility, "dominant_color", "skin_undertone"),
+    (score_time_of_day, "dominant_color", "time_of_day"),
+]
+
+
+def rule_outcomes(
+    rule: Callable,
+    attribute: str,
+    values: Sequence[Optional[str]],
+    context_value: object,
+) -> list[tuple[int, Optional[str]]]:
+    """
+    Evaluate one rule for each given value of the attribute it reads.
+
+    The rule sees a stand-in item carrying only that attribute, so a
+    rule only has to run once per distinct value, not once per item.
+    """
+    return [
+        rule(SimpleNamespace(**{attribute: value}), context_value)
+        for value in values
+    ]
+
+
+def scoring_context(
+    event: EventType,
+    weather: WeatherType,
+    time_of_day: TimeOfDay,
+    skin_tone: Optional[SkinTone],
+    skin_undertone: Optional[SkinUndertone],
+) -> dict[str, object]:
+    """Request context keyed by the field names used in SCORING_RULES."""
+    return {
+        "event": event,
+        "weather": weather,
+        "time_of_day": time_of_day,
+        "skin_tone": skin_tone,
+        "skin_undertone": skin_undertone,
+    }
+
+
 def score_clothing_item(
     clothing: Clothing,
     event: EventType,
@@ -192,19 +244,14 @@ def score_clothing_item(
     Each scoring function is independent, making the system
     easy to extend with new rules without modifying existing ones.
     """
+    context = scoring_context(
+        event, weather, time_of_day, skin_tone, skin_undertone
+    )
     total_score = 0
     reasons: list[str] = []
 
-    scoring_results = [
-        score_event_match(clothing, event),
-        score_weather_color(clothing, weather),
-        score_season_weather(clothing, weather),
-        score_skin_tone_compatibility(clothing, skin_tone),
-        score_undertone_compatibility(clothing, skin_undertone),
-        score_time_of_day(clothing, time_of_day),
-    ]
-
-    for points, reason in scoring_results:
+    for rule, _, context_field in SCORING_RULES:
+        points, reason = rule(clothing, context[context_field])
         total_score += points
         if reason is not None:
             reasons.append(reason)
@@ -212,6 +259,21 @@ def score_clothing_item(
     return total_score, reasons
 
 
+def ranking_key(scored: ScoredItem) -> tuple:
+    """
+    Sort key for scored items: score descending, then creation date
+    (oldest first, undated last), then id.
+    """
+    clothing, score, _ = scored
+    created_at = clothing.created_at
+    return (
+        -score,
+        created_at is None,
+        created_at or datetime.min,
+        clothing.id,
+    )
+
+
 def get_top_recommendations(
     clothing_items: list[Clothing],
     event: EventType,
@@ -219,7 +281,7 @@ def get_top_recommendations(
     time_of_day: TimeOfDay,
     skin_tone: Optional[SkinTone],
     skin_undertone: Optional[SkinUndertone],
-) -> list[tuple[Clothing, int, list[str]]]:
+) -> list[ScoredItem]:
     """
     Score all clothing items and return the top recommendations.
 
@@ -234,15 +296,15 @@ def get_top_recommendations(
             skin_tone, skin_undertone,
         )
         scored_items.append((item, score, reasons))
-        logger.info(
+        logger.debug(
             "Scored item %d (%s): %d points",
             item.id,
             item.dominant_color,
             score,
         )
 
-    # Sort by score descending
-    scored_items.sort(key=lambda x: x[1], reverse=True)
+    # Sort by score descending, oldest first among equal scores
+    scored_items.sort(key=ranking_key)
 
     top_items = scored_items[:TOP_RECOMMENDATIONS_COUNT]
     logger.info(
@@ -0,0 +1,399 @@
+"""
+Opt-in profiling of single requests in production.
+
+When one wardrobe makes a route slow, the slow request itself is what
+needs profiling, without a redeploy. With settings.profiling_secret
+set, a request sent with "X-Profile: <secret>" is profiled:
+- cProfile runs on every thread doing work for the request. That is
+  the event loop thread, the threadpool thread of a sync endpoint
+  (see ProfilingRoute) and compute executor threads. Their stats are
+  merged into the top functions by cumulative time. From Python 3.12
+  cProfile is process-wide (it hooks sys.monitoring, which admits one
+  profiler at a time), so the event loop thread's profiler covers
+  the other threads and no second one is started. Where a profiler
+  cannot start (another profiling tool is active), the work runs
+  unprofiled but still sampled: profiling never changes a request's
+  outcome.
+- a sampler thread reads those threads' stacks every
+  profiling_sample_interval_ms into collapsed stacks
+  ("a;b;c <count>", for flamegraph.pl or speedscope)
+- every SQL statement and its duration is recorded
+
+The response carries X-Profile-Id; the report is fetched from
+GET /system/profiles/{id} (and /collapsed) with the same header.
+
+Requests without the header never touch the profiler. Without a
+secret the middleware, SQL hooks and endpoint wrappers are not
+installed at all. One request is profiled at a time; others are served
+normally meanwhile. Work from other requests that runs on the event
+loop while a profile is recorded shows up in its event loop part.
+"""
+import asyncio
+import cProfile
+import functools
+import hmac
+import logging
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from api.config import settings
+from api.services.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# Fetching a report must not record (and evict) another one
+UNPROFILED_PATH_PREFIX = "/system/profiles"
+
+_PROFILE_HEADER_KEY = PROFILE_HEADER.lower().encode("latin-1")
+_SQL_START_KEY = "request_profiler_starts"
+
+_current_session: ContextVar[Optional["ProfileSession"]] = ContextVar(
+    "profile_session", default=None
+)
+_one_at_a_time = threading.Lock()
+# Before 3.12 each thread needs its own profiler; from 3.12 one
+# profiler sees every thread and a second one raises ValueError
+_PROFILER_PER_THREAD = sys.version_info < (3, 12)
+profile_store = LRUCache(settings.profiling_max_profiles)
+
+
+def is_enabled() -> bool:
+    return bool(settings.profiling_secret)
+
+
+def secret_matches(value: Optional[str]) -> bool:
+    """Constant-time check of a header value against the secret."""
+    return (
+        is_enabled()
+        and value is not None
+        and hmac.compare_digest(
+            value.encode(), settings.profiling_secret.encode()
+        )
+    )
+
+
+def current_session() -> Optional["ProfileSession"]:
+    """The profile being recorded for the current request, if any."""
+    return _current_session.get()
+
+
+def _frame_label(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def _function_label(key: tuple[str, int, str]) -> str:
+    filename, line, name = key
+    if filename == "~":
+        return name
+    for marker in ("site-packages/", "/api/", "/benchmarks/"):
+        position = filename.rfind(marker)
+        if position != -1:
+            offset = 1 if marker == "site-packages/" else 0
+            filename = filename[position + len(marker) * offset:]
+            filename = filename.lstrip("/")
+            break
+    return f"{name} ({filename}:{line})"
+
+
+def _is_profiler_frame(key: tuple[str, int, str]) -> bool:
+    filename, _, name = key
+    return filename == __file__ or "_lsprof.Profiler" in name
+
+
+class ProfileSession:
+    """Profilers, stack samples and SQL of one request."""
+
+    def __init__(self, method: str, path: str, query: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.query = query
+        self.started_at = datetime.now(timezone.utc)
+        self.status: Optional[int] = None
+        self._started = time.perf_counter()
+        self._duration = 0.0
+        self._lock = threading.Lock()
+        self._profiles: list[cProfile.Profile] = []
+        self._threads: Counter = Counter()
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._sql: list[dict] = []
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._sample, name="profile-sampler", daemon=True
+        )
+        self._sampler.start()
+
+    def _attach(self) -> None:
+        with self._lock:
+            self._threads[threading.get_ident()] += 1
+
+    def _start_profile(self) -> Optional[cProfile.Profile]:
+        """
+        A new enabled profiler for the calling thread, or None when a
+        running process-wide profiler covers it already or none can
+        be started.
+        """
+        with self._lock:
+            if self._profiles and not _PROFILER_PER_THREAD:
+                return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as exc:
+            # Another profiling tool holds the process-wide hook
+            logger.warning("Profiling without cProfile: %s", exc)
+            return None
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def _detach(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] -= 1
+            if not self._threads[ident]:
+                del self._threads[ident]
+
+    @contextmanager
+    def thread_profile(self):
+        """Profile and sample the calling thread for the block."""
+        self._attach()
+        profile = self._start_profile()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self._detach()
+
+    def wrap(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """fn, profiled in whichever thread it is called."""
+
+        @functools.wraps(fn)
+        def profiled(*args, **kwargs):
+            with self.thread_profile():
+                return fn(*args, **kwargs)
+
+        return profiled
+
+    def record_sql(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self._sql.append(
+                {"statement": statement, "duration_ms": seconds * 1000}
+            )
+
+    def _sample(self) -> None:
+        interval = settings.profiling_sample_interval_ms / 1000
+        while not self._stop.wait(interval):
+            frames = sys._current_frames()
+            with self._lock:
+                idents = list(self._threads)
+            for ident in idents:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    self._stacks[";".join(reversed(stack))] += 1
+                    self._samples += 1
+
+    def finish(self, status: Optional[int]) -> None:
+        self.status = status
+        self._duration = time.perf_counter() - self._started
+        self._stop.set()
+        self._sampler.join()
+
+    @property
+    def duration_ms(self) -> float:
+        return self._duration * 1000
+
+    def collapsed_stacks(self) -> str:
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in self._stacks.most_common()
+        )
+
+    def _top_functions(self) -> list[dict]:
+        stats = None
+        for profile in self._profiles:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+            except TypeError:
+                # A profile that recorded no calls
+                continue
+        if stats is None:
+            return []
+        # The profiler's own frames would otherwise top the list, as
+        # they enclose the whole request
+        rows = sorted(
+            (
+                item
+                for item in stats.stats.items()
+                if not _is_profiler_frame(item[0])
+            ),
+            key=lambda item: item[1][3],
+            reverse=True,
+        )
+        return [
+            {
+                "function": _function_label(key),
+                "calls": calls,
+                "total_ms": total * 1000,
+                "cumulative_ms": cumulative * 1000,
+            }
+            for key, (_, calls, total, cumulative, _) in rows[
+                : settings.profiling_top_functions
+            ]
+        ]
+
+    def report(self) -> dict:
+        sql_ms = sum(entry["duration_ms"] for entry in self._sql)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "top_functions": self._top_functions(),
+            "samples": self._samples,
+            "sample_interval_ms": settings.profiling_sample_interval_ms,
+            "collapsed_stacks": self.collapsed_stacks(),
+            "sql": {
+                "count": len(self._sql),
+                "total_ms": sql_ms,
+                "statements": self._sql,
+            },
+        }
+
+
+def _requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == _PROFILE_HEADER_KEY:
+            return secret_matches(value.decode("latin-1"))
+    return False
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests that carry the profile header.
+    Added by the app factory only when a secret is configured.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(UNPROFILED_PATH_PREFIX)
+            or not _requested(scope)
+            or not _one_at_a_time.acquire(blocking=False)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            session = ProfileSession(
+                scope["method"],
+                scope["path"],
+                scope["query_string"].decode("latin-1"),
+            )
+            status = None
+            profile_id = (
+                PROFILE_ID_HEADER.lower().encode(),
+                session.id.encode(),
+            )
+
+            async def send_with_profile_id(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    message = {
+                        **message,
+                        "headers": [*message.get("headers", []), profile_id],
+                    }
+                await send(message)
+
+            token = _current_session.set(session)
+            try:
+                with session.thread_profile():
+                    await self.app(scope, receive, send_with_profile_id)
+            finally:
+                _current_session.reset(token)
+                session.finish(status)
+                profile_store.put(session.id, session.report())
+                logger.info(
+                    "Request profiled: %s %s id=%s duration=%.1fms",
+                    session.method,
+                    session.path,
+                    session.id,
+                    session.duration_ms,
+                )
+        finally:
+            _one_at_a_time.release()
+
+
+class ProfilingRoute(APIRoute):
+    """
+    Route class that lets profiles include sync endpoints.
+
+    FastAPI runs sync endpoints in a threadpool, out of reach of the
+    event loop thread's profiler. With profiling enabled, sync
+    endpoints are wrapped to profile their thread when the request is
+    being profiled; otherwise the endpoint is left untouched.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        if is_enabled() and not asyncio.iscoroutinefunction(endpoint):
+            endpoint = _profiled_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _profiled_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        session = _current_session.get()
+        if session is None:
+            return endpoint(*args, **kwargs)
+        return session.wrap(endpoint)(*args, **kwargs)
+
+    return wrapper
+
+
+def install_sql_hooks(engine) -> None:
+    """Record statements run on engine while a request is profiled."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current_session.get() is not None:
+            conn.info.setdefault(_SQL_START_KEY, []).append(
+                time.perf_counter()
+            )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        session = _current_session.get()
+        starts = conn.info.get(_SQL_START_KEY)
+        if session is not None and starts:
+            session.record_sql(statement, time.perf_counter() - starts.pop())
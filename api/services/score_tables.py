@@ -0,0 +1,170 @@
+"""
+Precompiled recommendation score tables.
+
+Every input of the scoring rules is a small enum: the request context
+is (event, weather, time of day, skin tone, undertone) and an item is
+reduced to (occasion, season, dominant color). The rules and weights
+can therefore be compiled once into tables:
+
+- totals[context, occasion, season, color] is the item score
+- per-rule reason tables give the reason each rule reports
+
+Ranking then only needs one lookup per group of identical items, and
+no rule code runs per item. Compiling evaluates each rule once per
+(context field value, attribute value) pair, a few hundred calls, so
+rebuild_score_tables() after changing rules or weights is cheap.
+"""
+import logging
+import threading
+from itertools import product
+from typing import Optional, Sequence
+
+import numpy as np
+
+from api.constants.color_constants import COLOR_LABELS
+from api.constants.enums import (
+    EventType,
+    OccasionType,
+    SeasonType,
+    SkinTone,
+    SkinUndertone,
+    TimeOfDay,
+    WeatherType,
+)
+from api.services.recommendation_service import SCORING_RULES, rule_outcomes
+
+logger = logging.getLogger(__name__)
+
+# Item attributes the rules read, and the values the tables cover.
+# Items with any other value are ranked without the tables.
+ATTRIBUTE_DOMAINS: dict[str, list[Optional[str]]] = {
+    "occasion": [occasion.value for occasion in OccasionType],
+    "season": [season.value for season in SeasonType],
+    "dominant_color": [*COLOR_LABELS, None],
+}
+ATTRIBUTES = tuple(ATTRIBUTE_DOMAINS)
+
+# Request context fields, in the order used to index contexts
+CONTEXT_DOMAINS: dict[str, list] = {
+    "event": list(EventType),
+    "weather": list(WeatherType),
+    "time_of_day": list(TimeOfDay),
+    "skin_tone": [None, *SkinTone],
+    "skin_undertone": [None, *SkinUndertone],
+}
+CONTEXT_FIELDS = tuple(CONTEXT_DOMAINS)
+
+
+class ScoreTables:
+    """Scores and reasons for every context and attribute combination."""
+
+    def __init__(self):
+        self._value_index = {
+            attribute: {value: index for index, value in enumerate(values)}
+            for attribute, values in ATTRIBUTE_DOMAINS.items()
+        }
+        self._field_index = {
+            field: {value: index for index, value in enumerate(values)}
+            for field, values in CONTEXT_DOMAINS.items()
+        }
+        shape = tuple(len(values) for values in CONTEXT_DOMAINS.values())
+        # (contexts, fields) matrix: each context's index in every field
+        self._context_fields = np.array(
+            list(product(*(range(size) for size in shape))), dtype=np.int64
+        )
+        self._shape = shape
+
+        parts = {
+            attribute: np.zeros(
+                (len(self._context_fields), len(values)), dtype=np.int64
+            )
+            for attribute, values in ATTRIBUTE_DOMAINS.items()
+        }
+        # Per rule: attribute, context field position, reason table
+        self._rule_reasons: list[tuple[str, int, list[list]]] = []
+        for rule, attribute, field in SCORING_RULES:
+            outcomes = [
+                rule_outcomes(
+                    rule, attribute, ATTRIBUTE_DOMAINS[attribute], value
+                )
+                for value in CONTEXT_DOMAINS[field]
+            ]
+            points = np.array(
+                [[score for score, _ in row] for row in outcomes],
+                dtype=np.int64,
+            )
+            position = CONTEXT_FIELDS.index(field)
+            parts[attribute] += points[self._context_fields[:, position]]
+            self._rule_reasons.append(
+                (
+                    attribute,
+                    position,
+                    [[reason for _, reason in row] for row in outcomes],
+                )
+            )
+
+        self.totals = (
+            parts["occasion"][:, :, None, None]
+            + parts["season"][:, None, :, None]
+            + parts["dominant_color"][:, None, None, :]
+        )
+
+    def context_index(self, *context: object) -> int:
+        """Row of totals for (event, weather, time, tone, undertone)."""
+        indices = [
+            self._field_index[field][value]
+            for field, value in zip(CONTEXT_FIELDS, context)
+        ]
+        return int(np.ravel_multi_index(indices, self._shape))
+
+    def value_indices(
+        self, attribute: str, values: Sequence[Optional[str]]
+    ) -> Optional[np.ndarray]:
+        """
+        Table positions of the given attribute values, or None when
+        one of them is outside the compiled domain.
+        """
+        index = self._value_index[attribute]
+        if any(value not in index for value in values):
+            return None
+        return np.array([index[value] for value in values], dtype=np.int64)
+
+    def reasons(self, context: int, *positions: int) -> list[str]:
+        """
+        Reasons for one (occasion, season, color) combination, given
+        as table positions, in the same order as score_clothing_item.
+        """
+        by_attribute = dict(zip(ATTRIBUTES, positions))
+        fields = self._context_fields[context]
+        reasons = []
+        for attribute, position, table in self._rule_reasons:
+            reason = table[fields[position]][by_attribute[attribute]]
+            if reason is not None:
+                reasons.append(reason)
+        return reasons
+
+
+_tables: Optional[ScoreTables] = None
+_tables_lock = threading.Lock()
+
+
+def get_score_tables() -> ScoreTables:
+    """Return the compiled tables, compiling them on first use."""
+    global _tables
+    with _tables_lock:
+        if _tables is None:
+            _tables = ScoreTables()
+            logger.info(
+                "Score tables compiled: contexts=%d, combinations=%d",
+                _tables.totals.shape[0],
+                _tables.totals[0].size,
+            )
+        return _tables
+
+
+def rebuild_score_tables() -> ScoreTables:
+    """Recompile the tables, e.g. after rules or weights change."""
+    global _tables
+    with _tables_lock:
+        _tables = None
+    return get_score_tables()
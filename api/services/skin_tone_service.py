@@ -10,16 +10,15 @@ import logging
 import cv2
 import numpy as np
 
+from api.config import settings
 from api.constants.enums import SkinTone, SkinUndertone
 from api.exceptions.custom_exceptions import ImageProcessingError
+from api.services.face_detector import get_face_detector
+from api.services.image_service import decode_image_from_bytes
+from api.services.metrics import PIPELINE_PHOTO, stage_timer
 
 logger = logging.getLogger(__name__)
 
-# Haar cascade XML ships with OpenCV - no extra download needed
-HAAR_CASCADE_PATH = (
-    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-)
-
 # ── LAB color space thresholds for skin tone classification ──────────
 # L channel ranges from 0 (black) to 255 (white).
 # These thresholds were chosen based on common skin tone research
@@ -41,26 +40,18 @@ def detect_face_region(image: np.ndarray) -> np.ndarray:
 
     Haar Cascade is chosen because it's lightweight, doesn't require
     a GPU, and is sufficient for single-face detection in clear photos.
+    Detection runs on a downscaled copy (see face_detector); the crop
+    is taken from the full-resolution image.
     """
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    face_cascade = cv2.CascadeClassifier(HAAR_CASCADE_PATH)
-
-    faces = face_cascade.detectMultiScale(
-        gray,
-        scaleFactor=1.1,
-        minNeighbors=5,
-        minSize=(100, 100),
-    )
+    face = get_face_detector().detect_largest(image)
 
-    if len(faces) == 0:
+    if face is None:
         raise ImageProcessingError(
             "No face detected in the uploaded photo. "
             "Please upload a clear, front-facing photo."
         )
 
-    # Use the largest detected face (most likely the actual face)
-    largest_face = max(faces, key=lambda rect: rect[2] * rect[3])
-    x, y, w, h = largest_face
+    x, y, w, h = face
 
     # Extract the forehead-to-cheek region (middle portion of face).
     # This avoids eyes, mouth, and hair which would skew color analysis.
@@ -136,11 +127,12 @@ def analyze_skin(
     2. Extract the skin-dominant region
     3. Classify tone (FAIR/MEDIUM/DARK) and undertone (WARM/COOL/NEUTRAL)
     """
-    skin_region = detect_face_region(image)
-    average_lab = extract_average_skin_color(skin_region)
-
-    tone = classify_skin_tone(average_lab)
-    undertone = classify_skin_undertone(average_lab)
+    with stage_timer(PIPELINE_PHOTO, "face_detect"):
+        skin_region = detect_face_region(image)
+    with stage_timer(PIPELINE_PHOTO, "classify"):
+        average_lab = extract_average_skin_color(skin_region)
+        tone = classify_skin_tone(average_lab)
+        undertone = classify_skin_undertone(average_lab)
 
     logger.info(
         "Skin analysis complete: tone=%s, undertone=%s",
@@ -148,3 +140,20 @@ def analyze_skin(
         undertone.value,
     )
     return tone, undertone
+
+
+def analyze_skin_image_bytes(
+    image_bytes: bytes,
+) -> tuple[SkinTone, SkinUndertone]:
+    """
+    Decode raw photo bytes and run the full skin analysis pipeline.
+
+    Kept as a single call so the whole CPU-bound stage can be handed
+    to the compute executor at once.
+    """
+    # Face detection never looks at more than face_detect_max_dimension
+    with stage_timer(PIPELINE_PHOTO, "decode"):
+        image = decode_image_from_bytes(
+            image_bytes, min_long_side=settings.face_detect_max_dimension
+        )
+    return analyze_skin(image)
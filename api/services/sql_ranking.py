@@ -0,0 +1,158 @@
+"""
+Recommendation ranking pushed down into the database.
+
+The scoring rules are compiled into one SQL score expression per
+request context: each rule reads a single item attribute, so the points
+an attribute contributes become a CASE over its known values (grouped
+by point value), with the ELSE branch holding what the rules give any
+other value. The database then evaluates
+
+    WHERE user_id = ? ORDER BY score DESC, created_at, id LIMIT k
+
+over the covering (user_id, occasion, season, dominant_color,
+created_at, id) index, so only the user's index entries are read, and
+only the k winning rows are loaded. Reasons are computed in
+Python for those k rows only.
+
+Results are identical to the in-memory engines. Whether this beats
+scoring in the application depends on wardrobe size; see
+benchmarks/sql_ranking_benchmark.py and settings.sql_ranking_min_items.
+"""
+import logging
+from typing import Optional
+
+from sqlalchemy import case, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from api.constants.enums import (
+    EventType,
+    SkinTone,
+    SkinUndertone,
+    TimeOfDay,
+    WeatherType,
+)
+from api.constants.score_weights import TOP_RECOMMENDATIONS_COUNT
+from api.models.clothing import Clothing
+from api.services.recommendation_service import (
+    SCORING_RULES,
+    ScoredItem,
+    rule_outcomes,
+    score_clothing_item,
+    scoring_context,
+)
+from api.services.score_tables import ATTRIBUTE_DOMAINS
+
+logger = logging.getLogger(__name__)
+
+# Stand-in for "any value outside the attribute's domain"; equal to
+# nothing and in no palette, so rules score it like an unknown string
+_OTHER_VALUE = object()
+
+
+def _attribute_points(
+    attribute: str, context: dict[str, object]
+) -> tuple[dict[Optional[str], int], int]:
+    """Points of each domain value of one attribute, and of any other."""
+    values = [*ATTRIBUTE_DOMAINS[attribute], _OTHER_VALUE]
+    totals = [0] * len(values)
+    for rule, rule_attribute, field in SCORING_RULES:
+        if rule_attribute != attribute:
+            continue
+        outcomes = rule_outcomes(rule, attribute, values, context[field])
+        totals = [
+            total + points for total, (points, _) in zip(totals, outcomes)
+        ]
+    other_points = totals.pop()
+    return dict(zip(values, totals)), other_points
+
+
+def _attribute_score(
+    column, points: dict[Optional[str], int], other_points: int
+) -> ColumnElement:
+    """CASE expression giving each row's points for one attribute."""
+    by_points: dict[int, list[str]] = {}
+    for value, value_points in points.items():
+        if value is not None and value_points != other_points:
+            by_points.setdefault(value_points, []).append(value)
+
+    whens = []
+    if None in points and points[None] != other_points:
+        whens.append((column.is_(None), points[None]))
+    for value_points, values in sorted(by_points.items()):
+        whens.append((column.in_(values), value_points))
+    if not whens:
+        return literal(other_points)
+    return case(*whens, else_=other_points)
+
+
+def score_expression(
+    event: EventType,
+    weather: WeatherType,
+    time_of_day: TimeOfDay,
+    skin_tone: Optional[SkinTone],
+    skin_undertone: Optional[SkinUndertone],
+) -> ColumnElement:
+    """SQL expression equal to score_clothing_item's total score."""
+    context = scoring_context(
+        event, weather, time_of_day, skin_tone, skin_undertone
+    )
+    parts = [
+        _attribute_score(
+            getattr(Clothing, attribute),
+            *_attribute_points(attribute, context),
+        )
+        for attribute in ATTRIBUTE_DOMAINS
+    ]
+    score = parts[0]
+    for part in parts[1:]:
+        score = score + part
+    return score.label("score")
+
+
+def sql_top_recommendations(
+    db: Session,
+    user_id: int,
+    event: EventType,
+    weather: WeatherType,
+    time_of_day: TimeOfDay,
+    skin_tone: Optional[SkinTone],
+    skin_undertone: Optional[SkinUndertone],
+) -> list[ScoredItem]:
+    """
+    Same result as get_top_recommendations over the user's wardrobe,
+    ranked by the database.
+
+    The ranking query reads only indexed columns; the winning rows
+    are then loaded by primary key.
+    """
+    score = score_expression(
+        event, weather, time_of_day, skin_tone, skin_undertone
+    )
+    top = db.execute(
+        select(Clothing.id, score)
+        .where(Clothing.user_id == user_id)
+        .order_by(
+            score.desc(),
+            Clothing.created_at.asc().nulls_last(),
+            Clothing.id,
+        )
+        .limit(TOP_RECOMMENDATIONS_COUNT)
+    ).all()
+    rows = {
+        row.id: row
+        for row in db.scalars(
+            select(Clothing).where(Clothing.id.in_([id for id, _ in top]))
+        )
+    }
+
+    top_items = []
+    for id, item_score in top:
+        item = rows[id]
+        _, reasons = score_clothing_item(
+            item, event, weather, time_of_day, skin_tone, skin_undertone
+        )
+        top_items.append((item, item_score, reasons))
+
+    logger.info("Returning top %d recommendations from SQL", len(top_items))
+    return top_items
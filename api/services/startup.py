@@ -0,0 +1,163 @@
+"""
+Startup-time breakdown and background warm-up of the analysis stack.
+
+OpenCV and sklearn take over a second to import on a small instance,
+so the web layer only imports the analysis modules when an upload
+first needs them. That lets the process bind its port and answer
+cheap endpoints right after a cold start; the warm-up then loads the
+heavy parts in a background thread, so the first upload does not pay
+for them either:
+
+- imports: the color and skin analysis modules (and OpenCV)
+- face_cascade: the Haar cascade classifier pool
+- color_index: the RGB lookup table for color labels
+- quantizer: one tiny run of the configured quantizer (sklearn KMeans
+  by default), which imports its library and initializes it
+
+/ready reports the warm-up state; the startup phases and the warm-up
+steps are both logged with their durations.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Warm-up states
+WARMUP_DISABLED = "disabled"
+WARMUP_PENDING = "pending"
+WARMUP_RUNNING = "running"
+WARMUP_READY = "ready"
+WARMUP_FAILED = "failed"
+
+# Side of the synthetic image the quantizer is warmed up on
+_WARMUP_IMAGE_SIZE = 16
+
+
+class PhaseTimer:
+    """Named phases and their durations in ms, in completion order."""
+
+    def __init__(self):
+        self._phases: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, started: float) -> None:
+        """Record a phase that started at the given perf_counter time."""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._phases[name] = round(elapsed_ms, 1)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started)
+
+    def as_dict(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._phases)
+
+    def summary(self) -> str:
+        """'total ms (phase=ms, ...)' for logging."""
+        phases = self.as_dict()
+        return "%.0f ms (%s)" % (
+            sum(phases.values()),
+            ", ".join(f"{name}={ms:.0f}" for name, ms in phases.items()),
+        )
+
+
+def _warm_imports() -> None:
+    from api.services import color_service, skin_tone_service  # noqa: F401
+
+
+def _warm_face_cascade() -> None:
+    from api.services.face_detector import get_face_detector
+
+    get_face_detector()
+
+
+def _warm_color_index() -> None:
+    from api.services.color_lookup import default_color_index
+
+    default_color_index()
+
+
+def _warm_quantizer() -> None:
+    # Not through get_clothing_colors, so no pipeline metrics are
+    # recorded for this run
+    from api.services.color_service import extract_dominant_colors
+
+    image = np.random.default_rng(0).integers(
+        0,
+        256,
+        size=(_WARMUP_IMAGE_SIZE, _WARMUP_IMAGE_SIZE, 3),
+        dtype=np.uint8,
+    )
+    extract_dominant_colors(image)
+
+
+WARMUP_STEPS = (
+    ("imports", _warm_imports),
+    ("face_cascade", _warm_face_cascade),
+    ("color_index", _warm_color_index),
+    ("quantizer", _warm_quantizer),
+)
+
+
+class WarmUp:
+    """
+    Runs the warm-up steps once in a daemon thread and tracks their
+    progress. Until started, the state is disabled.
+    """
+
+    def __init__(self):
+        self.state = WARMUP_DISABLED
+        self.error: Optional[str] = None
+        self.steps = PhaseTimer()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.state not in (WARMUP_DISABLED, WARMUP_FAILED):
+                return
+            self.state = WARMUP_PENDING
+            self.error = None
+        threading.Thread(
+            target=self._run, name="warm-up", daemon=True
+        ).start()
+
+    def _run(self) -> None:
+        self.state = WARMUP_RUNNING
+        try:
+            for name, step in WARMUP_STEPS:
+                with self.steps.phase(name):
+                    step()
+        except Exception as exc:
+            self.error = f"{name}: {exc}"
+            self.state = WARMUP_FAILED
+            logger.error("Warm-up failed in %s", self.error)
+            return
+        self.state = WARMUP_READY
+        logger.info("Warm-up finished in %s", self.steps.summary())
+
+    @property
+    def ready(self) -> bool:
+        """Whether nothing is left to warm up (also when disabled)."""
+        return self.state in (WARMUP_DISABLED, WARMUP_READY)
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "steps_ms": self.steps.as_dict(),
+            "error": self.error,
+        }
+
+
+startup_phases = PhaseTimer()
+warm_up = WarmUp()
@@ -0,0 +1,250 @@
+"""
+Async storage backends for uploaded images.
+
+Uploads used to call a blocking storage function after analysis had
+finished, so a request took upload time plus analysis time. Backends
+here are async, so the ingest pipelines can run the upload while the
+image is being analyzed and only join the two before the database
+commit.
+
+- LocalStorageBackend writes content-addressed files and their WebP
+  derivatives under uploads/ (on a worker thread)
+- CloudinaryStorageBackend calls Cloudinary's signed upload API over a
+  pooled httpx.AsyncClient with timeouts and retries; derivatives are
+  requested as eager transformations
+
+Cloudinary is used when its credentials are set. Its API base URL is
+configurable, so benchmarks/fake_cloudinary.py can stand in for it
+offline.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+
+from api.config import settings
+from api.constants.color_constants import IMAGE_DERIVATIVE_SIZES
+from api.exceptions.custom_exceptions import CloudinaryUploadError
+from api.services.analysis_cache import content_hash
+from api.services.image_storage import (
+    cloudinary_transformation,
+    content_path,
+    derivative_suffix,
+    encode_derivatives,
+)
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_DIR = Path("uploads")
+
+
+def _extension_for_bytes(image_bytes: bytes) -> str:
+    """Return file extension based on image magic bytes."""
+    if image_bytes[:2] == b"\xff\xd8":
+        return ".jpg"
+    if image_bytes[:8] == b"\x89PNG\r\n\x1a\n":
+        return ".png"
+    if image_bytes[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    return ".jpg"
+
+
+def _write_once(path: Path, data: bytes) -> bool:
+    """
+    Write a content-addressed file unless it already exists.
+
+    Writes go to a temporary name and are renamed into place, so a
+    concurrent reader never sees a partial file. Returns whether the
+    file was written.
+    """
+    if path.exists():
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+    return True
+
+
+class StorageBackend(ABC):
+    """Stores image bytes and returns the URL they are served from."""
+
+    @abstractmethod
+    async def store(self, image_bytes: bytes, folder: str) -> str:
+        """Store the bytes under folder and return their URL."""
+
+    async def close(self) -> None:
+        """Release connections; the backend is not used afterwards."""
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Content-addressed files under uploads/, served by the API.
+    Used when Cloudinary is not configured (e.g. local development).
+    """
+
+    def __init__(self, root: Path = UPLOADS_DIR):
+        self.root = root
+
+    def _store_sync(self, image_bytes: bytes, folder: str) -> str:
+        relative = content_path(
+            folder,
+            content_hash(image_bytes),
+            _extension_for_bytes(image_bytes),
+        )
+        original = self.root / relative
+        # The original is written last, so its presence means the
+        # derivatives exist too
+        if not original.exists():
+            from api.services.image_service import decode_image_from_bytes
+
+            largest = max(IMAGE_DERIVATIVE_SIZES.values())
+            image = decode_image_from_bytes(
+                image_bytes, min_long_side=largest
+            )
+            stem = original.with_suffix("")
+            for name, data in encode_derivatives(image).items():
+                _write_once(
+                    stem.with_name(stem.name + derivative_suffix(name)), data
+                )
+            _write_once(original, image_bytes)
+        url_path = f"/uploads/{relative}"
+        logger.info("Image saved locally: %s", url_path)
+        return url_path
+
+    async def store(self, image_bytes: bytes, folder: str) -> str:
+        return await run_in_threadpool(self._store_sync, image_bytes, folder)
+
+
+class CloudinaryStorageBackend(StorageBackend):
+    """
+    Cloudinary signed uploads over a shared async HTTP client.
+
+    Network errors and 429/5xx answers are retried with exponential
+    backoff; other errors fail at once. Images use their content hash
+    as public id, without overwrite, so duplicates are stored once.
+    """
+
+    def __init__(
+        self,
+        cloud_name: str,
+        api_key: str,
+        api_secret: str,
+        api_base: str,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.upload_url = (
+            f"{api_base.rstrip('/')}/v1_1/{cloud_name}/image/upload"
+        )
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.storage_timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=settings.storage_max_connections,
+                max_keepalive_connections=settings.storage_max_connections,
+            ),
+        )
+
+    def _signed_params(self, params: dict[str, str]) -> dict[str, str]:
+        """Add api_key and Cloudinary's SHA-1 request signature."""
+        payload = "&".join(
+            f"{key}={value}" for key, value in sorted(params.items())
+        )
+        signature = hashlib.sha1(
+            (payload + self.api_secret).encode()
+        ).hexdigest()
+        return {**params, "api_key": self.api_key, "signature": signature}
+
+    async def store(self, image_bytes: bytes, folder: str) -> str:
+        data = self._signed_params(
+            {
+                "timestamp": str(int(time.time())),
+                "folder": f"wardrobe-ai/{folder}",
+                "public_id": content_hash(image_bytes),
+                "overwrite": "false",
+                "eager": "|".join(
+                    f"{cloudinary_transformation(name)}/webp"
+                    for name in IMAGE_DERIVATIVE_SIZES
+                ),
+            }
+        )
+        attempts = settings.storage_max_retries + 1
+        for attempt in range(attempts):
+            try:
+                response = await self.client.post(
+                    self.upload_url,
+                    data=data,
+                    files={"file": ("image", image_bytes)},
+                )
+            except httpx.TransportError as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            else:
+                if response.is_success:
+                    logger.info(
+                        "Image uploaded to Cloudinary: folder=%s", folder
+                    )
+                    return response.json()["secure_url"]
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code != 429 and (
+                    response.status_code < 500
+                ):
+                    break
+
+            if attempt + 1 < attempts:
+                delay = settings.storage_retry_base_seconds * 2**attempt
+                logger.warning(
+                    "Cloudinary upload failed (%s); retrying in %.1fs",
+                    error,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+        logger.error("Cloudinary upload failed: %s", error)
+        raise CloudinaryUploadError(f"Upload failed: {error}")
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def _is_cloudinary_configured() -> bool:
+    return bool(
+        settings.cloudinary_cloud_name
+        and settings.cloudinary_api_key
+        and settings.cloudinary_api_secret
+    )
+
+
+_backend: Optional[StorageBackend] = None
+
+
+def get_storage_backend() -> StorageBackend:
+    """Process-wide backend: Cloudinary when configured, else local."""
+    global _backend
+    if _backend is None:
+        if _is_cloudinary_configured():
+            _backend = CloudinaryStorageBackend(
+                settings.cloudinary_cloud_name,
+                settings.cloudinary_api_key,
+                settings.cloudinary_api_secret,
+                settings.cloudinary_api_base,
+            )
+        else:
+            _backend = LocalStorageBackend()
+    return _backend
+
+
+async def close_storage_backend() -> None:
+    """Close the backend's connections on shutdown."""
+    global _backend
+    if _backend is not None:
+        backend, _backend = _backend, None
+        await backend.close()
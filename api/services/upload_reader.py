@@ -0,0 +1,37 @@
+"""
+Bounded reading of multipart upload bodies.
+
+await upload.read() pulls the whole file into memory in one call, so
+a single oversized upload costs its full size before anything can
+reject it. Uploads are read in fixed-size chunks instead and refused
+as soon as they pass the size limit; when the client declared the
+size up front, the file is refused without reading it at all.
+"""
+from typing import Optional
+
+from fastapi import UploadFile
+
+from api.config import settings
+from api.exceptions.custom_exceptions import UploadTooLargeError
+
+
+async def read_upload(
+    upload: UploadFile, max_bytes: Optional[int] = None
+) -> bytes:
+    """Read an upload's bytes, raising UploadTooLargeError past max_bytes."""
+    max_bytes = settings.upload_max_bytes if max_bytes is None else max_bytes
+    too_large = UploadTooLargeError(
+        f"{upload.filename or 'Upload'} is larger than "
+        f"{max_bytes / (1024 * 1024):.1f} MB"
+    )
+    if upload.size is not None and upload.size > max_bytes:
+        raise too_large
+
+    chunks = []
+    total = 0
+    while chunk := await upload.read(settings.upload_read_chunk_bytes):
+        total += len(chunk)
+        if total > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
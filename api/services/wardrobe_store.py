@@ -0,0 +1,341 @@
+"""
+In-process wardrobe store for the read-heavy endpoints.
+
+Recommendations and wardrobe listing used to query every clothing row
+(and the user profile) and hydrate full ORM objects on every request.
+The store loads a user's wardrobe once into compact __slots__ records
+and keeps it current by write-through: upload paths call add_items()
+or set_profile() right after their commit. Users are cached
+independently and evicted least recently used first under a memory
+budget (settings.wardrobe_store_max_mb).
+
+Readers get an immutable WardrobeState. Every write builds a new state
+with bumped version counters and swaps it in with a single reference
+assignment, so a reader sees either all of a write or none of it.
+The ranking encoding (WardrobeColumns) is built once per wardrobe
+version and shared by all requests.
+
+The store is per process. Rows written by another process (a second
+API worker or instance) are picked up by a cheap staleness check that
+runs at most every wardrobe_store_ttl_seconds.
+"""
+import bisect
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime
+from functools import cached_property
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.constants.enums import SkinTone, SkinUndertone
+from api.models.clothing import Clothing
+from api.models.user import User
+from api.exceptions.custom_exceptions import InvalidPageCursorError
+from api.services.lru_cache import LRUCache
+from api.services.outfit_service import OutfitIndex
+from api.services.pagination import PageKey, page_key
+from api.services.ranking_service import WardrobeColumns
+
+logger = logging.getLogger(__name__)
+
+
+class WardrobeItem:
+    """Read-only copy of one clothing row, without ORM state."""
+
+    __slots__ = (
+        "id",
+        "image_url",
+        "dominant_color",
+        "secondary_color",
+        "clothing_type",
+        "occasion",
+        "season",
+        "created_at",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        image_url: str,
+        dominant_color: Optional[str],
+        secondary_color: Optional[str],
+        clothing_type: str,
+        occasion: str,
+        season: str,
+        created_at: Optional[datetime],
+    ):
+        self.id = id
+        self.image_url = image_url
+        self.dominant_color = dominant_color
+        self.secondary_color = secondary_color
+        self.clothing_type = clothing_type
+        self.occasion = occasion
+        self.season = season
+        self.created_at = created_at
+
+    @classmethod
+    def from_row(cls, row) -> "WardrobeItem":
+        """Copy a Clothing object (or a row with the same columns)."""
+        return cls(*(getattr(row, name) for name in cls.__slots__))
+
+
+# Columns loaded for WardrobeItem, in __slots__ order
+ITEM_COLUMNS = [getattr(Clothing, name) for name in WardrobeItem.__slots__]
+
+
+class WardrobeSnapshot:
+    """All items of one wardrobe (ordered by id) at one version."""
+
+    def __init__(self, items: tuple[WardrobeItem, ...], version: int):
+        self.items = items
+        self.version = version
+
+    @cached_property
+    def columns(self) -> WardrobeColumns:
+        """Ranking encoding, built on first use for this version."""
+        return WardrobeColumns(self.items)
+
+    @cached_property
+    def outfit_index(self) -> OutfitIndex:
+        """Outfit roles and color classes, in columns order."""
+        return OutfitIndex(self.items)
+
+    @cached_property
+    def _page_order(self) -> tuple[list[PageKey], list[WardrobeItem]]:
+        """Items and their keys in page order, sorted once per version."""
+        keyed = sorted(
+            (page_key(item.created_at, item.id), item) for item in self.items
+        )
+        return [key for key, _ in keyed], [item for _, item in keyed]
+
+    def page(
+        self, after: Optional[PageKey], limit: int
+    ) -> tuple[list[WardrobeItem], bool]:
+        """
+        Up to limit items following the after key, and whether more
+        items follow them.
+        """
+        keys, ordered = self._page_order
+        try:
+            start = 0 if after is None else bisect.bisect_right(keys, after)
+        except TypeError as exc:
+            # Cursor date with a different timezone awareness than ours
+            raise InvalidPageCursorError() from exc
+        items = ordered[start:start + limit]
+        return items, start + limit < len(ordered)
+
+
+class ProfileSnapshot(NamedTuple):
+    """Skin analysis results of a user profile at one version."""
+
+    skin_tone: Optional[SkinTone]
+    skin_undertone: Optional[SkinUndertone]
+    version: int
+
+
+class WardrobeState(NamedTuple):
+    wardrobe: WardrobeSnapshot
+    profile: ProfileSnapshot
+
+
+def _profile_values(
+    skin_tone: Optional[str], skin_undertone: Optional[str]
+) -> tuple[Optional[SkinTone], Optional[SkinUndertone]]:
+    return (
+        SkinTone(skin_tone) if skin_tone else None,
+        SkinUndertone(skin_undertone) if skin_undertone else None,
+    )
+
+
+# Estimated memory of a loaded wardrobe: items, ranking encoding and
+# page order. Measured with tracemalloc on wardrobes of 1 to 20,000
+# items with Cloudinary-length URLs.
+_WARDROBE_BASE_BYTES = 4096
+_ITEM_BYTES = 600
+
+# Loads and writes of one user are serialized on one of these locks
+_LOCK_STRIPES = 64
+
+
+def _estimated_bytes(state: WardrobeState) -> int:
+    return _WARDROBE_BASE_BYTES + _ITEM_BYTES * len(state.wardrobe.items)
+
+
+class _UserEntry:
+    """One user's state, its item ids and when it was last validated."""
+
+    __slots__ = ("state", "ids", "validated_at")
+
+    def __init__(self, state: WardrobeState, ids: set[int]):
+        self.state = state
+        self.ids = ids
+        self.validated_at = time.monotonic()
+
+
+class WardrobeStore:
+    """
+    Process-wide wardrobe and profile cache, partitioned by user.
+
+    Each recently active user has their own versioned state, loaded
+    with queries on that user's rows only. Users are kept in an LRU
+    weighted by estimated bytes, so the store stays within max_bytes
+    however many users there are; an evicted user is reloaded on
+    their next request.
+    """
+
+    def __init__(self, ttl_seconds: float, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(
+            max(1, max_bytes // _WARDROBE_BASE_BYTES), max_weight=max_bytes
+        )
+        # Versions come from one counter shared by all users and reloads,
+        # so a version number never refers to two different wardrobes
+        # or profiles
+        self._versions = itertools.count(1)
+        self._locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+
+    def _lock_for(self, user_id: int) -> threading.Lock:
+        return self._locks[user_id % _LOCK_STRIPES]
+
+    def read(self, db: Session, user_id: int) -> WardrobeState:
+        """User's current state, loading or revalidating it if needed."""
+        entry = self._entries.get(user_id)
+        if entry is not None and (
+            time.monotonic() - entry.validated_at < self.ttl_seconds
+        ):
+            return entry.state
+
+        with self._lock_for(user_id):
+            entry = self._entries.peek(user_id)
+            if entry is None or self._is_stale(db, user_id, entry.state):
+                entry = self._load(db, user_id)
+            entry.validated_at = time.monotonic()
+            return entry.state
+
+    def _load(self, db: Session, user_id: int) -> _UserEntry:
+        """Cache a fresh copy of the user's rows."""
+        rows = (
+            db.query(*ITEM_COLUMNS)
+            .filter(Clothing.user_id == user_id)
+            .order_by(Clothing.id)
+            .all()
+        )
+        items = tuple(WardrobeItem(*row) for row in rows)
+        profile = _profile_values(*self._profile_row(db, user_id))
+
+        state = WardrobeState(
+            WardrobeSnapshot(items, next(self._versions)),
+            ProfileSnapshot(*profile, next(self._versions)),
+        )
+        entry = _UserEntry(state, {item.id for item in items})
+        self._entries.put(user_id, entry, _estimated_bytes(state))
+        logger.debug(
+            "Wardrobe loaded: user=%d, items=%d, version=%d",
+            user_id,
+            len(items),
+            state.wardrobe.version,
+        )
+        return entry
+
+    @staticmethod
+    def _profile_row(
+        db: Session, user_id: int
+    ) -> tuple[Optional[str], Optional[str]]:
+        row = (
+            db.query(User.skin_tone, User.skin_undertone)
+            .filter(User.id == user_id)
+            .first()
+        )
+        return row or (None, None)
+
+    def _is_stale(
+        self, db: Session, user_id: int, state: WardrobeState
+    ) -> bool:
+        """Whether another process changed the wardrobe or profile."""
+        count, max_id = (
+            db.query(func.count(Clothing.id), func.max(Clothing.id))
+            .filter(Clothing.user_id == user_id)
+            .one()
+        )
+        wardrobe = state.wardrobe
+        if count != len(wardrobe.items) or (
+            max_id != (wardrobe.items[-1].id if wardrobe.items else None)
+        ):
+            return True
+
+        profile = state.profile
+        return _profile_values(*self._profile_row(db, user_id)) != (
+            profile.skin_tone,
+            profile.skin_undertone,
+        )
+
+    def add_items(self, user_id: int, rows: Iterable[Clothing]) -> None:
+        """
+        Write-through after a user's clothing rows are committed.
+
+        Ignored while the user is not loaded (the load will include
+        the rows); rows already present are skipped.
+        """
+        with self._lock_for(user_id):
+            entry = self._entries.peek(user_id)
+            if entry is None:
+                return
+            new_items = [
+                WardrobeItem.from_row(row)
+                for row in rows
+                if row.id not in entry.ids
+            ]
+            if not new_items:
+                return
+            items = tuple(
+                sorted(
+                    entry.state.wardrobe.items + tuple(new_items),
+                    key=lambda item: item.id,
+                )
+            )
+            entry.ids.update(item.id for item in new_items)
+            entry.state = entry.state._replace(
+                wardrobe=WardrobeSnapshot(items, next(self._versions))
+            )
+            self._entries.put(user_id, entry, _estimated_bytes(entry.state))
+
+    def set_profile(
+        self,
+        user_id: int,
+        skin_tone: Optional[SkinTone],
+        skin_undertone: Optional[SkinUndertone],
+    ) -> None:
+        """Write-through after a user's profile is committed."""
+        with self._lock_for(user_id):
+            entry = self._entries.peek(user_id)
+            if entry is None:
+                return
+            profile = entry.state.profile
+            if (profile.skin_tone, profile.skin_undertone) == (
+                skin_tone,
+                skin_undertone,
+            ):
+                return
+            entry.state = entry.state._replace(
+                profile=ProfileSnapshot(
+                    skin_tone, skin_undertone, next(self._versions)
+                )
+            )
+
+    def invalidate(self) -> None:
+        """Drop all states so the next reads reload from the database."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+wardrobe_store = WardrobeStore(
+    settings.wardrobe_store_ttl_seconds,
+    int(settings.wardrobe_store_max_mb * 1024 * 1024),
+)
@@ -0,0 +1,171 @@
+"""
+Full vs reduced-resolution decode for the clothing upload path.
+
+Decodes every image twice: at full size (cv2.IMREAD_COLOR) and the
+way uploads now do it (decode_image_for_processing, which lets libjpeg
+decode JPEGs at 1/2, 1/4 or 1/8 scale). Both are then resized to the
+analysis size. Per image it reports the best latency of both paths,
+the peak memory traced during decode + resize, and whether both
+produce the same color labels.
+
+Without an image directory, a synthetic 4000x3000 phone-style JPEG
+is used.
+
+Usage (from the project root):
+    python -m benchmarks.decode_benchmark
+    python -m benchmarks.decode_benchmark uploads/clothing --repeat 5
+"""
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from api.services.color_service import get_clothing_colors
+from api.services.image_service import (
+    decode_image_for_processing,
+    resize_image_for_processing,
+)
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def synthetic_photo(width: int = 4000, height: int = 3000) -> bytes:
+    """A noisy two-tone garment photo encoded as a quality-90 JPEG."""
+    rng = np.random.default_rng(0)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = (200, 200, 205)
+    image[height // 6:-height // 6, width // 4:-width // 4] = (40, 40, 150)
+    noise = rng.normal(0, 8, size=image.shape)
+    image = np.clip(image + noise, 0, 255).astype(np.uint8)
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])[
+        1
+    ].tobytes()
+
+
+def full_decode(image_bytes: bytes) -> np.ndarray:
+    """The previous path: full-size decode, then resize."""
+    image = cv2.imdecode(
+        np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR
+    )
+    return resize_image_for_processing(image)
+
+
+def reduced_decode(image_bytes: bytes) -> np.ndarray:
+    return resize_image_for_processing(
+        decode_image_for_processing(image_bytes)
+    )
+
+
+def measure(
+    path: Callable[[bytes], np.ndarray], image_bytes: bytes, repeat: int
+) -> dict:
+    """Best latency and traced peak memory of one decode path."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resized = path(image_bytes)
+        best = min(best, (time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    path(image_bytes)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "ms": best,
+        "peak_mb": peak / (1024 * 1024),
+        "labels": get_clothing_colors(resized),
+    }
+
+
+def print_report(rows: list[dict]) -> None:
+    """Print a fixed-width comparison table."""
+    header = (
+        f"{'image':<24} {'full ms':>8} {'reduced ms':>11} "
+        f"{'full MB':>8} {'reduced MB':>11} {'labels':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['image'][:24]:<24} {row['full']['ms']:>8.1f} "
+            f"{row['reduced']['ms']:>11.1f} "
+            f"{row['full']['peak_mb']:>8.1f} "
+            f"{row['reduced']['peak_mb']:>11.1f} "
+            f"{'same' if row['labels_match'] else 'differ':>7}"
+        )
+    if len(rows) > 1:
+        medians = {
+            (path, metric): statistics.median(
+                row[path][metric] for row in rows
+            )
+            for path in ("full", "reduced")
+            for metric in ("ms", "peak_mb")
+        }
+        print(
+            f"{'median':<24} {medians['full', 'ms']:>8.1f} "
+            f"{medians['reduced', 'ms']:>11.1f} "
+            f"{medians['full', 'peak_mb']:>8.1f} "
+            f"{medians['reduced', 'peak_mb']:>11.1f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "image_dir",
+        nargs="?",
+        type=Path,
+        help="directory of images (default: one synthetic 12MP JPEG)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="time each image this many times and keep the fastest",
+    )
+    parser.add_argument("--json", type=Path, help="also write results here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.image_dir is None:
+        images = [("synthetic-4000x3000.jpg", synthetic_photo())]
+    else:
+        images = [
+            (path.name, path.read_bytes())
+            for path in sorted(args.image_dir.rglob("*"))
+            if path.suffix.lower() in IMAGE_SUFFIXES
+        ]
+    if not images:
+        print(f"No images found under {args.image_dir}", file=sys.stderr)
+        return 1
+
+    rows = []
+    for name, image_bytes in images:
+        full = measure(full_decode, image_bytes, args.repeat)
+        reduced = measure(reduced_decode, image_bytes, args.repeat)
+        rows.append(
+            {
+                "image": name,
+                "full": full,
+                "reduced": reduced,
+                "labels_match": full["labels"] == reduced["labels"],
+            }
+        )
+
+    print_report(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Local stand-in for Cloudinary's upload API.
+
+Implements the signed image upload endpoint the storage backend uses,
+with configurable latency and failure rate, so uploads can be tested
+and benchmarked offline. Uploaded bytes are kept in memory and served
+back at the returned secure_url (derivative URLs return the original).
+
+Usage (from the project root):
+    python -m benchmarks.fake_cloudinary --port 9000 --latency-ms 300
+
+then start the API with
+    CLOUDINARY_API_BASE=http://127.0.0.1:9000 CLOUDINARY_CLOUD_NAME=demo
+    CLOUDINARY_API_KEY=key CLOUDINARY_API_SECRET=secret
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request, Response
+
+SIGNATURE_EXCLUDED = {"file", "api_key", "signature", "resource_type"}
+
+
+def create_app(
+    api_secret: str = "secret",
+    latency_ms: float = 0.0,
+    fail_rate: float = 0.0,
+    seed: int = 0,
+) -> FastAPI:
+    """Fake Cloudinary app; fail_rate of uploads answer 503."""
+    app = FastAPI(title="Fake Cloudinary")
+    rng = random.Random(seed)
+    stored: dict[str, bytes] = {}
+    app.state.upload_count = 0
+
+    @app.post("/v1_1/{cloud_name}/image/upload")
+    async def upload(cloud_name: str, request: Request):
+        form = await request.form()
+        params = {
+            key: value
+            for key, value in form.items()
+            if key not in SIGNATURE_EXCLUDED
+        }
+        payload = "&".join(
+            f"{key}={value}" for key, value in sorted(params.items())
+        )
+        expected = hashlib.sha1((payload + api_secret).encode()).hexdigest()
+        if form.get("signature") != expected:
+            raise HTTPException(
+                status_code=401,
+                detail={"message": "Invalid Signature"},
+            )
+
+        await asyncio.sleep(latency_ms / 1000)
+        if rng.random() < fail_rate:
+            raise HTTPException(status_code=503, detail="Try again")
+
+        image_bytes = await form["file"].read()
+        public_id = "/".join(
+            part
+            for part in (params.get("folder"), params.get("public_id"))
+            if part
+        ) or hashlib.sha256(image_bytes).hexdigest()
+        stored[public_id] = image_bytes
+        app.state.upload_count += 1
+        version = int(time.time())
+        base = f"{request.base_url}{cloud_name}/image/upload"
+        return {
+            "public_id": public_id,
+            "version": version,
+            "bytes": len(image_bytes),
+            "secure_url": f"{base}/v{version}/{public_id}.jpg",
+            "eager": [
+                {"transformation": transformation}
+                for transformation in params.get("eager", "").split("|")
+                if transformation
+            ],
+        }
+
+    @app.get("/{cloud_name}/image/upload/{path:path}")
+    async def deliver(cloud_name: str, path: str):
+        # Drop transformation and version segments and the extension
+        public_id = "/".join(
+            segment
+            for segment in path.rsplit(".", 1)[0].split("/")
+            if "," not in segment
+            and not (segment.startswith("v") and segment[1:].isdigit())
+        )
+        if public_id not in stored:
+            raise HTTPException(status_code=404)
+        return Response(stored[public_id], media_type="image/jpeg")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--api-secret", default="secret")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.api_secret, args.latency_ms, args.fail_rate),
+        host=args.host,
+        port=args.port,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Foreground masking benchmark: color clustering with and without the
+background mask.
+
+Draws synthetic product shots at the analysis resolution: a garment
+silhouette of a known color on a white or grey backdrop (with noise,
+a vignette and a soft shadow), or on a busy multicolored room. For
+each quantizer engine it reports, with and without masking:
+
+- mask ms: estimating the foreground (only when masking)
+- quantize ms: clustering the pixels that are left
+- masked: mean share of the pixels dropped before clustering
+- primary: how often the primary label is the garment's color
+
+Usage (from the project root):
+    python -m benchmarks.foreground_benchmark
+    python -m benchmarks.foreground_benchmark --images 50 --engines KMEANS
+"""
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from api.constants.color_constants import (
+    CLOTHING_IMAGE_RESIZE_HEIGHT,
+    CLOTHING_IMAGE_RESIZE_WIDTH,
+    COLOR_LABELS,
+)
+from api.constants.enums import ColorQuantizer
+from api.services.color_service import (
+    classify_color_labels,
+    extract_dominant_colors,
+)
+from api.services.foreground_service import extract_foreground
+
+# Garment colors drawn; backdrop-like colors are left out so the
+# ground truth stays unambiguous on either backdrop
+GARMENT_COLORS = [
+    label
+    for label in COLOR_LABELS
+    if label not in ("WHITE", "GREY", "CREAM", "LAVENDER", "BEIGE")
+]
+
+BACKDROPS = ("white", "grey", "room")
+
+
+def _rgb_to_bgr(label: str) -> tuple[int, int, int]:
+    red, green, blue = COLOR_LABELS[label]
+    return blue, green, red
+
+
+def draw_product_shot(
+    rng: np.random.Generator, label: str, backdrop: str
+) -> np.ndarray:
+    """A garment of color label on the given backdrop, BGR uint8."""
+    height, width = CLOTHING_IMAGE_RESIZE_HEIGHT, CLOTHING_IMAGE_RESIZE_WIDTH
+    if backdrop == "room":
+        image = np.zeros((height, width, 3), np.uint8)
+        for _ in range(12):
+            color = tuple(int(value) for value in rng.integers(0, 256, 3))
+            corner = rng.integers(0, (width, height))
+            size = rng.integers(40, 160, 2)
+            cv2.rectangle(
+                image,
+                tuple(map(int, corner)),
+                tuple(map(int, corner + size)),
+                color,
+                -1,
+            )
+    else:
+        level = 245 if backdrop == "white" else 200
+        rows, columns = np.ogrid[:height, :width]
+        falloff = ((rows - height / 2) ** 2 + (columns - width / 2) ** 2) / (
+            (height / 2) ** 2 + (width / 2) ** 2
+        )
+        image = np.repeat(
+            (level - 25 * falloff)[:, :, None], 3, axis=2
+        ).astype(np.uint8)
+
+    # Body and sleeves of a shirt-like silhouette, scaled at random
+    scale = rng.uniform(0.75, 1.0)
+    center_x = width // 2 + int(rng.integers(-15, 16))
+    top = int(height * (0.5 - 0.33 * scale))
+    bottom = int(height * (0.5 + 0.35 * scale))
+    half_body = int(width * 0.2 * scale)
+    half_sleeves = int(width * 0.34 * scale)
+    shadow = np.zeros((height, width), np.uint8)
+    garment = np.zeros((height, width), np.uint8)
+    for mask, offset in ((shadow, 6), (garment, 0)):
+        cv2.rectangle(
+            mask,
+            (center_x - half_body + offset, top + offset),
+            (center_x + half_body + offset, bottom + offset),
+            255,
+            -1,
+        )
+        cv2.rectangle(
+            mask,
+            (center_x - half_sleeves + offset, top + offset),
+            (center_x + half_sleeves + offset, top + int(60 * scale) + offset),
+            255,
+            -1,
+        )
+    shadow = cv2.GaussianBlur(shadow, (21, 21), 0)
+    image = (image * (1 - 0.25 * shadow[:, :, None] / 255)).astype(np.uint8)
+    image[garment > 0] = _rgb_to_bgr(label)
+
+    noise = rng.normal(0, 4, image.shape)
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def make_images(count: int, seed: int) -> list[tuple[str, str, np.ndarray]]:
+    """(backdrop, garment label, image) triples, backdrops in turn."""
+    rng = np.random.default_rng(seed)
+    images = []
+    for index in range(count):
+        backdrop = BACKDROPS[index % len(BACKDROPS)]
+        label = GARMENT_COLORS[int(rng.integers(len(GARMENT_COLORS)))]
+        image = draw_product_shot(rng, label, backdrop)
+        images.append((backdrop, label, image))
+    return images
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(
+    engine: ColorQuantizer, images: list, masked: bool, backdrop: str
+) -> dict:
+    """Label the images of one backdrop, with or without masking."""
+    mask_ms, quantize_ms, masked_fractions, matches = [], [], [], 0
+    selected = [item for item in images if item[0] == backdrop]
+    for _, label, image in selected:
+        pixels = image
+        if masked:
+            foreground, elapsed = _timed(extract_foreground, image)
+            pixels = foreground.pixels
+            mask_ms.append(elapsed)
+            masked_fractions.append(foreground.masked_fraction)
+        (centers, _), elapsed = _timed(extract_dominant_colors, pixels, engine)
+        quantize_ms.append(elapsed)
+        matches += classify_color_labels(centers[:1])[0] == label
+    return {
+        "engine": engine.value,
+        "backdrop": backdrop,
+        "masked": masked,
+        "images": len(selected),
+        "mask_ms": statistics.fmean(mask_ms) if mask_ms else 0.0,
+        "quantize_ms": statistics.fmean(quantize_ms),
+        "masked_fraction": (
+            statistics.fmean(masked_fractions) if masked_fractions else 0.0
+        ),
+        "primary_accuracy": matches / len(selected),
+    }
+
+
+def print_report(rows: list[dict]) -> None:
+    """Print a fixed-width table, one line per engine/backdrop/mode."""
+    header = (
+        f"{'engine':<12} {'backdrop':<9} {'mask':<5} {'mask ms':>8} "
+        f"{'quantize ms':>12} {'masked':>7} {'primary':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['engine']:<12} {row['backdrop']:<9} "
+            f"{'on' if row['masked'] else 'off':<5} "
+            f"{row['mask_ms']:>8.2f} {row['quantize_ms']:>12.1f} "
+            f"{row['masked_fraction']:>7.1%} "
+            f"{row['primary_accuracy']:>8.1%}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--images",
+        type=int,
+        default=30,
+        help="synthetic product shots, spread over the backdrops",
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=[engine.value for engine in ColorQuantizer],
+        choices=[engine.value for engine in ColorQuantizer],
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write results here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    images = make_images(args.images, args.seed)
+    rows = [
+        run(ColorQuantizer(engine), images, masked, backdrop)
+        for engine in args.engines
+        for backdrop in BACKDROPS
+        for masked in (False, True)
+    ]
+
+    print_report(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
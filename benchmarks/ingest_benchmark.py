@@ -0,0 +1,135 @@
+"""
+Upload latency with storage running before vs alongside analysis.
+
+Starts the fake Cloudinary server (benchmarks/fake_cloudinary.py) on a
+local port with a simulated network latency, then times per image:
+
+- analysis: color analysis on the compute executor alone
+- storage: the Cloudinary storage backend upload alone
+- sequential: analysis, then upload (the previous ingest order)
+- concurrent: both at once, as ingest now does
+
+Usage (from the project root):
+    python -m benchmarks.ingest_benchmark
+    python -m benchmarks.ingest_benchmark --latency-ms 500 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import uvicorn
+
+from api.services.color_service import analyze_clothing_image_bytes
+from api.services.compute_executor import (
+    get_compute_executor,
+    shutdown_compute_executor,
+)
+from api.services.storage_backend import CloudinaryStorageBackend
+from benchmarks.decode_benchmark import synthetic_photo
+from benchmarks.fake_cloudinary import create_app
+
+API_SECRET = "secret"
+
+
+def start_fake_cloudinary(latency_ms: float) -> tuple[uvicorn.Server, str]:
+    """Run the fake server on a free local port in a daemon thread."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_app(API_SECRET, latency_ms),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+        )
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def timed(awaitable) -> float:
+    start = time.perf_counter()
+    await awaitable
+    return (time.perf_counter() - start) * 1000
+
+
+async def run(image_bytes: bytes, api_base: str, repeat: int) -> dict:
+    storage = CloudinaryStorageBackend("demo", "key", API_SECRET, api_base)
+    executor = get_compute_executor()
+
+    def analyze():
+        return executor.run(analyze_clothing_image_bytes, image_bytes)
+
+    def upload():
+        return storage.store(image_bytes, "clothing")
+
+    async def sequential():
+        await analyze()
+        await upload()
+
+    async def concurrent():
+        await asyncio.gather(analyze(), upload())
+
+    # Warm up the connection pool and the analysis code paths
+    await concurrent()
+    names = ("analysis", "storage", "sequential", "concurrent")
+    timings = {name: [] for name in names}
+    for _ in range(repeat):
+        timings["analysis"].append(await timed(analyze()))
+        timings["storage"].append(await timed(upload()))
+        timings["sequential"].append(await timed(sequential()))
+        timings["concurrent"].append(await timed(concurrent()))
+    await storage.close()
+    return {
+        name: statistics.median(values) for name, values in timings.items()
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=300.0,
+        help="simulated Cloudinary response latency",
+    )
+    parser.add_argument(
+        "--image",
+        type=Path,
+        help="image to upload (default: synthetic 12MP JPEG)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="also write results here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    image_bytes = (
+        args.image.read_bytes() if args.image else synthetic_photo()
+    )
+    server, api_base = start_fake_cloudinary(args.latency_ms)
+    try:
+        result = asyncio.run(run(image_bytes, api_base, args.repeat))
+    finally:
+        server.should_exit = True
+        shutdown_compute_executor()
+
+    for name, ms in result.items():
+        print(f"{name:<11} {ms:>8.1f} ms")
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Per-user cost benchmark for multi-user wardrobes.
+
+For each user count, fills a scratch database with that many users of
+--items clothing rows each, then times the per-request work for one
+user:
+
+- load: loading the user's wardrobe into the wardrobe store (a cold
+  or evicted user)
+- check: the store's staleness check (once per TTL per user)
+- sql: ranking the user's wardrobe with the SQL engine
+- warm: a store hit plus in-memory ranking, the steady state
+
+With the per-user indexes all four stay flat as the table grows;
+only the user's own rows are read.
+
+Usage (from the project root):
+    python -m benchmarks.multi_user_benchmark
+    python -m benchmarks.multi_user_benchmark --users 1 1000 10000 \\
+        --items 100 --database-url postgresql://localhost/wardrobe_bench
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from itertools import product
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from api.constants.enums import ClothingType
+from api.database import Base
+from api.models.clothing import Clothing
+from api.models.user import User
+from api.services.ranking_service import materialized_top_recommendations
+from api.services.score_tables import ATTRIBUTE_DOMAINS, CONTEXT_DOMAINS
+from api.services.sql_ranking import sql_top_recommendations
+from api.services.wardrobe_store import WardrobeStore
+from benchmarks.sql_ranking_benchmark import INSERT_CHUNK_SIZE, best_ms
+
+TABLES = [Clothing.__table__, User.__table__]
+
+
+def fill_users(session_factory, users: int, items: int, seed: int) -> None:
+    """Insert items random clothing rows for each of users users."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    rows = (
+        {
+            "user_id": user_id,
+            "image_url": f"https://example.com/{user_id}/{index}.jpg",
+            "dominant_color": rng.choice(ATTRIBUTE_DOMAINS["dominant_color"]),
+            "secondary_color": None,
+            "clothing_type": rng.choice(list(ClothingType)).value,
+            "occasion": rng.choice(ATTRIBUTE_DOMAINS["occasion"]),
+            "season": rng.choice(ATTRIBUTE_DOMAINS["season"]),
+            "created_at": start
+            + timedelta(seconds=rng.randrange(365 * 86400)),
+        }
+        # Interleave users, as uploads arrive in production
+        for index in range(items)
+        for user_id in range(1, users + 1)
+    )
+    with session_factory() as db:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == INSERT_CHUNK_SIZE:
+                db.execute(insert(Clothing), chunk)
+                chunk = []
+        if chunk:
+            db.execute(insert(Clothing), chunk)
+        db.commit()
+
+
+def measure_users(
+    database_url: str, users: int, items: int, contexts: list, repeat: int
+) -> dict:
+    """Time one user's request paths over a freshly filled database."""
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    session_factory = sessionmaker(bind=engine)
+    fill_users(session_factory, users, items, seed=users)
+    # A user in the middle of the id range
+    user_id = (users + 1) // 2
+
+    with session_factory() as db:
+
+        def load(_):
+            store = WardrobeStore(ttl_seconds=0, max_bytes=1 << 30)
+            return store.read(db, user_id)
+
+        checked = WardrobeStore(ttl_seconds=0, max_bytes=1 << 30)
+        state = checked.read(db, user_id)
+        warm = WardrobeStore(ttl_seconds=3600, max_bytes=1 << 30)
+        warm.read(db, user_id)
+
+        def warm_rank(context):
+            wardrobe = warm.read(db, user_id).wardrobe
+            return materialized_top_recommendations(
+                wardrobe.items, *context, columns=wardrobe.columns
+            )
+
+        result = {
+            "users": users,
+            "rows": users * items,
+            "user_items": len(state.wardrobe.items),
+            "load_ms": best_ms(load, contexts, repeat),
+            "check_ms": best_ms(
+                lambda _: checked.read(db, user_id), contexts, repeat
+            ),
+            "sql_ms": best_ms(
+                lambda context: sql_top_recommendations(
+                    db, user_id, *context
+                ),
+                contexts,
+                repeat,
+            ),
+            "warm_ms": best_ms(warm_rank, contexts, repeat),
+        }
+
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+    engine.dispose()
+    return result
+
+
+def print_report(rows: list[dict]) -> None:
+    """Print a fixed-width table, one line per user count."""
+    header = (
+        f"{'users':>8} {'rows':>10} {'load ms':>9} {'check ms':>9} "
+        f"{'sql ms':>8} {'warm ms':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['users']:>8} {row['rows']:>10} {row['load_ms']:>9.2f} "
+            f"{row['check_ms']:>9.2f} {row['sql_ms']:>8.2f} "
+            f"{row['warm_ms']:>8.3f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--users", nargs="+", type=int, default=[1, 1_000, 10_000]
+    )
+    parser.add_argument(
+        "--items", type=int, default=100, help="clothing rows per user"
+    )
+    parser.add_argument(
+        "--database-url",
+        help="scratch database (default: a temporary SQLite file); "
+        "its clothing_items and users tables are dropped and recreated",
+    )
+    parser.add_argument(
+        "--contexts",
+        type=int,
+        default=5,
+        help="number of random request contexts timed per user count",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="time each context this many times and keep the fastest",
+    )
+    parser.add_argument("--json", type=Path, help="also write results here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    contexts = random.Random(0).sample(
+        list(product(*CONTEXT_DOMAINS.values())), args.contexts
+    )
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = (
+            args.database_url or f"sqlite:///{Path(scratch) / 'bench.db'}"
+        )
+        rows = [
+            measure_users(
+                database_url, users, args.items, contexts, args.repeat
+            )
+            for users in args.users
+        ]
+
+    print_report(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
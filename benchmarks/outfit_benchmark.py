@@ -0,0 +1,188 @@
+"""
+Outfit search benchmark: branch-and-bound against the full cross product.
+
+For each wardrobe size, builds a random wardrobe and, per request
+context, times:
+
+- index: building the wardrobe's OutfitIndex (once per version)
+- search: top_outfits with the cached index, the per-request cost
+- naive: scoring every top x bottom x layer and dress x layer
+  combination (only up to --naive-max items, as it grows cubically)
+
+Wherever the naive search runs, both must return the same outfit
+scores; the script exits non-zero if they differ.
+
+Usage (from the project root):
+    python -m benchmarks.outfit_benchmark
+    python -m benchmarks.outfit_benchmark --sizes 100 1000 10000 --k 10
+"""
+import argparse
+import heapq
+import itertools
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from itertools import product
+from pathlib import Path
+
+from api.constants.enums import ClothingType, OutfitRole, WeatherType
+from api.services.outfit_service import (
+    CLOTHING_ROLES,
+    OutfitIndex,
+    score_color_pair,
+    top_outfits,
+)
+from api.services.ranking_service import WardrobeColumns, score_columns
+from api.services.score_tables import ATTRIBUTE_DOMAINS, CONTEXT_DOMAINS
+from api.services.wardrobe_store import WardrobeItem
+from benchmarks.sql_ranking_benchmark import best_ms
+
+
+def make_wardrobe(size: int, seed: int) -> list[WardrobeItem]:
+    """Random items of every type; about half have a secondary color."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    colors = ATTRIBUTE_DOMAINS["dominant_color"]
+    return [
+        WardrobeItem(
+            id=index + 1,
+            image_url=f"https://example.com/{index}.jpg",
+            dominant_color=rng.choice(colors),
+            secondary_color=(
+                rng.choice(colors) if rng.random() < 0.5 else None
+            ),
+            clothing_type=rng.choice(list(ClothingType)).value,
+            occasion=rng.choice(ATTRIBUTE_DOMAINS["occasion"]),
+            season=rng.choice(ATTRIBUTE_DOMAINS["season"]),
+            created_at=start + timedelta(seconds=rng.randrange(10**7)),
+        )
+        for index in range(size)
+    ]
+
+
+def naive_top_scores(columns: WardrobeColumns, context, k: int) -> list:
+    """Scores of the k best outfits, by trying every combination."""
+    scores = score_columns(columns, *context)
+    pieces = {role: [] for role in OutfitRole}
+    for item, score in zip(columns.items, scores):
+        role = CLOTHING_ROLES.get(item.clothing_type)
+        if role is not None:
+            colors = (item.dominant_color, item.secondary_color)
+            pieces[role].append((int(score), colors))
+    layers = [None]
+    if context[1] != WeatherType.HOT:
+        layers += pieces[OutfitRole.LAYER]
+
+    bases = itertools.chain(
+        itertools.product(pieces[OutfitRole.TOP], pieces[OutfitRole.BOTTOM]),
+        ((dress,) for dress in pieces[OutfitRole.DRESS]),
+    )
+    totals = []
+    for base in bases:
+        best = None
+        for layer in layers:
+            outfit = base if layer is None else base + (layer,)
+            total = sum(score for score, _ in outfit) + sum(
+                score_color_pair(a[1], b[1])[0]
+                for a, b in itertools.combinations(outfit, 2)
+            )
+            best = total if best is None else max(best, total)
+        totals.append(best)
+    return heapq.nlargest(k, totals)
+
+
+def measure_size(
+    size: int, contexts: list, k: int, repeat: int, naive_max: int
+) -> dict:
+    items = make_wardrobe(size, seed=size)
+    columns = WardrobeColumns(items)
+    index = OutfitIndex(items)
+
+    def search(context):
+        return top_outfits(columns, *context, k=k, index=index)
+
+    result = {
+        "items": size,
+        "index_ms": best_ms(lambda _: OutfitIndex(items), contexts, repeat),
+        "search_ms": best_ms(search, contexts, repeat),
+        "naive_ms": None,
+        "matches": None,
+    }
+    if size <= naive_max:
+        result["naive_ms"] = best_ms(
+            lambda context: naive_top_scores(columns, context, k),
+            contexts,
+            1,
+        )
+        result["matches"] = all(
+            [outfit.score for outfit in search(context)]
+            == naive_top_scores(columns, context, k)
+            for context in contexts
+        )
+    return result
+
+
+def print_report(rows: list[dict]) -> None:
+    """Print a fixed-width table, one line per wardrobe size."""
+    header = (
+        f"{'items':>8} {'index ms':>9} {'search ms':>10} "
+        f"{'naive ms':>10} {'match':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        naive = (
+            f"{row['naive_ms']:>10.1f}" if row["naive_ms"] is not None
+            else f"{'-':>10}"
+        )
+        matches = "-" if row["matches"] is None else str(row["matches"])
+        print(
+            f"{row['items']:>8} {row['index_ms']:>9.2f} "
+            f"{row['search_ms']:>10.3f} {naive} {matches:>6}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[100, 1_000, 10_000]
+    )
+    parser.add_argument("--k", type=int, default=3, help="outfits returned")
+    parser.add_argument(
+        "--naive-max",
+        type=int,
+        default=300,
+        help="largest wardrobe the naive search is run on",
+    )
+    parser.add_argument(
+        "--contexts",
+        type=int,
+        default=10,
+        help="number of random request contexts timed per size",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="time each context this many times and keep the fastest",
+    )
+    parser.add_argument("--json", type=Path, help="also write results here")
+    args = parser.parse_args()
+
+    contexts = random.Random(0).sample(
+        list(product(*CONTEXT_DOMAINS.values())), args.contexts
+    )
+    rows = [
+        measure_size(size, contexts, args.k, args.repeat, args.naive_max)
+        for size in args.sizes
+    ]
+
+    print_report(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+    return 0 if all(row["matches"] is not False for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Speed/accuracy harness for the color quantizer engines.
+
+Runs every engine over a reference image set and reports the time per
+image next to how often its labels agree with the reference labels
+that get_clothing_colors produces with exact KMeans.
+
+Usage (from the project root):
+    python -m benchmarks.quantizer_harness uploads/clothing
+    python -m benchmarks.quantizer_harness photos/ --repeat 3 --json out.json
+"""
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from api.constants.enums import ColorQuantizer
+from api.services.color_service import get_clothing_colors
+from api.services.image_service import (
+    decode_image_for_processing,
+    resize_image_for_processing,
+)
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def load_reference_images(image_dir: Path) -> list:
+    """Decode and resize every image under image_dir, as the upload path does."""
+    images = []
+    for path in sorted(image_dir.rglob("*")):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        image = decode_image_for_processing(path.read_bytes())
+        images.append((path.name, resize_image_for_processing(image)))
+    return images
+
+
+def run_engine(engine: ColorQuantizer, images: list, repeat: int) -> dict:
+    """Label every image with one engine, keeping the fastest of `repeat` runs."""
+    labels = []
+    timings_ms = []
+    for _, image in images:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = get_clothing_colors(image, engine)
+            best = min(best, (time.perf_counter() - start) * 1000)
+        labels.append(result)
+        timings_ms.append(best)
+    return {"labels": labels, "timings_ms": timings_ms}
+
+
+def summarize(
+    engine: ColorQuantizer, run: dict, reference: list
+) -> dict:
+    """Compare one engine's run against the reference labels."""
+    timings = sorted(run["timings_ms"])
+    total = len(reference)
+    primary_matches = sum(
+        labels[0] == ref[0] for labels, ref in zip(run["labels"], reference)
+    )
+    full_matches = sum(
+        labels == ref for labels, ref in zip(run["labels"], reference)
+    )
+    return {
+        "engine": engine.value,
+        "images": total,
+        "mean_ms": statistics.fmean(timings),
+        "p95_ms": timings[min(total - 1, int(total * 0.95))],
+        "primary_agreement": primary_matches / total,
+        "full_agreement": full_matches / total,
+    }
+
+
+def print_report(rows: list[dict]) -> None:
+    """Print a fixed-width comparison table."""
+    header = (
+        f"{'engine':<12} {'ms/image':>9} {'p95 ms':>9} "
+        f"{'primary':>9} {'primary+secondary':>18}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['engine']:<12} {row['mean_ms']:>9.1f} "
+            f"{row['p95_ms']:>9.1f} "
+            f"{row['primary_agreement']:>9.1%} "
+            f"{row['full_agreement']:>18.1%}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "image_dir",
+        nargs="?",
+        default="uploads/clothing",
+        type=Path,
+        help="directory of reference clothing images (searched recursively)",
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=[engine.value for engine in ColorQuantizer],
+        choices=[engine.value for engine in ColorQuantizer],
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="time each image this many times and keep the fastest",
+    )
+    parser.add_argument("--json", type=Path, help="also write results here")
+    args = parser.parse_args()
+
+    # Per-image INFO logs from color_service would drown the report
+    logging.basicConfig(level=logging.WARNING)
+
+    images = load_reference_images(args.image_dir)
+    if not images:
+        print(f"No images found under {args.image_dir}", file=sys.stderr)
+        return 1
+
+    reference_run = run_engine(ColorQuantizer.KMEANS, images, args.repeat)
+    reference = reference_run["labels"]
+
+    rows = []
+    for name in args.engines:
+        engine = ColorQuantizer(name)
+        run = (
+            reference_run
+            if engine == ColorQuantizer.KMEANS
+            else run_engine(engine, images, args.repeat)
+        )
+        rows.append(summarize(engine, run, reference))
+
+    print_report(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Crossover benchmark for the SQL ranking engine.
+
+For each wardrobe size, fills a scratch database with random clothing
+rows and times one recommendation three ways:
+
+- sql: the SQL engine (score, sort and limit inside the database)
+- load+rank: load the wardrobe rows and rank them in memory, which is
+  what every request would pay without the wardrobe store
+- warm: in-memory ranking of an already loaded wardrobe (the wardrobe
+  store's steady state)
+
+The smallest size at which sql beats load+rank is printed as the
+suggested SQL_RANKING_MIN_ITEMS.
+
+Usage (from the project root):
+    python -m benchmarks.sql_ranking_benchmark
+    python -m benchmarks.sql_ranking_benchmark --sizes 1000 100000 \\
+        --database-url postgresql://localhost/wardrobe_bench
+"""
+import argparse
+import json
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import product
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from api.constants.enums import ClothingType
+from api.database import Base
+from api.models.clothing import Clothing
+from api.models.user import DEFAULT_USER_ID
+from api.services.ranking_service import (
+    WardrobeColumns,
+    materialized_top_recommendations,
+)
+from api.services.score_tables import ATTRIBUTE_DOMAINS, CONTEXT_DOMAINS
+from api.services.sql_ranking import sql_top_recommendations
+from api.services.wardrobe_store import ITEM_COLUMNS, WardrobeItem
+
+INSERT_CHUNK_SIZE = 50_000
+
+
+def fill_database(
+    session_factory, size: int, seed: int, user_id: int = DEFAULT_USER_ID
+) -> None:
+    """Insert size random clothing rows of one user spread over a year."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    with session_factory() as db:
+        for offset in range(0, size, INSERT_CHUNK_SIZE):
+            db.execute(
+                insert(Clothing),
+                [
+                    {
+                        "user_id": user_id,
+                        "image_url": f"https://example.com/{index}.jpg",
+                        "dominant_color": rng.choice(
+                            ATTRIBUTE_DOMAINS["dominant_color"]
+                        ),
+                        "secondary_color": None,
+                        "clothing_type": rng.choice(list(ClothingType)).value,
+                        "occasion": rng.choice(ATTRIBUTE_DOMAINS["occasion"]),
+                        "season": rng.choice(ATTRIBUTE_DOMAINS["season"]),
+                        "created_at": start
+                        + timedelta(seconds=rng.randrange(365 * 86400)),
+                    }
+                    for index in range(
+                        offset, min(offset + INSERT_CHUNK_SIZE, size)
+                    )
+                ],
+            )
+        db.commit()
+
+
+def best_ms(run: Callable[[], object], contexts: list, repeat: int) -> float:
+    """Median over contexts of the fastest of repeat runs, in ms."""
+    timings = []
+    for context in contexts:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(context)
+            best = min(best, (time.perf_counter() - start) * 1000)
+        timings.append(best)
+    return statistics.median(timings)
+
+
+def measure_size(
+    database_url: str, size: int, contexts: list, repeat: int
+) -> dict:
+    """Time the three ranking paths over one freshly filled database."""
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine, tables=[Clothing.__table__])
+    Base.metadata.create_all(bind=engine, tables=[Clothing.__table__])
+    session_factory = sessionmaker(bind=engine)
+    fill_database(session_factory, size, seed=size)
+
+    with session_factory() as db:
+
+        def load_and_rank(context):
+            rows = db.query(*ITEM_COLUMNS).all()
+            items = [WardrobeItem(*row) for row in rows]
+            return materialized_top_recommendations(items, *context)
+
+        columns = WardrobeColumns(
+            [WardrobeItem(*row) for row in db.query(*ITEM_COLUMNS)]
+        )
+        result = {
+            "items": size,
+            "sql_ms": best_ms(
+                lambda context: sql_top_recommendations(
+                    db, DEFAULT_USER_ID, *context
+                ),
+                contexts,
+                repeat,
+            ),
+            "load_rank_ms": best_ms(load_and_rank, contexts, 1),
+            "warm_ms": best_ms(
+                lambda context: materialized_top_recommendations(
+                    columns.items, *context, columns=columns
+                ),
+                contexts,
+                repeat,
+            ),
+        }
+
+    Base.metadata.drop_all(bind=engine, tables=[Clothing.__table__])
+    engine.dispose()
+    return result
+
+
+def crossover(rows: list[dict]) -> Optional[int]:
+    """Smallest measured size at which sql beats load+rank."""
+    for row in sorted(rows, key=lambda row: row["items"]):
+        if row["sql_ms"] < row["load_rank_ms"]:
+            return row["items"]
+    return None
+
+
+def print_report(rows: list[dict]) -> None:
+    """Print a fixed-width comparison table."""
+    header = (
+        f"{'items':>10} {'sql ms':>10} {'load+rank ms':>13} {'warm ms':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['items']:>10} {row['sql_ms']:>10.2f} "
+            f"{row['load_rank_ms']:>13.2f} {row['warm_ms']:>9.2f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=[1_000, 100_000, 1_000_000],
+    )
+    parser.add_argument(
+        "--database-url",
+        help="scratch database (default: a temporary SQLite file); "
+        "its clothing_items table is dropped and recreated",
+    )
+    parser.add_argument(
+        "--contexts",
+        type=int,
+        default=5,
+        help="number of random request contexts timed per size",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="time each context this many times and keep the fastest",
+    )
+    parser.add_argument("--json", type=Path, help="also write results here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    contexts = random.Random(0).sample(
+        list(product(*CONTEXT_DOMAINS.values())), args.contexts
+    )
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = (
+            args.database_url or f"sqlite:///{Path(scratch) / 'bench.db'}"
+        )
+        rows = [
+            measure_size(database_url, size, contexts, args.repeat)
+            for size in args.sizes
+        ]
+
+    print_report(rows)
+    threshold = crossover(rows)
+    if threshold is None:
+        print("\nsql did not beat load+rank at any measured size")
+    else:
+        print(f"\nsuggested SQL_RANKING_MIN_ITEMS={threshold}")
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
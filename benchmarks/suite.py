@@ -0,0 +1,431 @@
+"""
+Benchmark suite for image analysis, recommendations and the API routes.
+
+The suite makes all of its own inputs:
+- garment photos, and portraits with a drawn face that the Haar cascade
+  detects, as JPEGs at several resolutions
+- wardrobes of synthetic Clothing rows (10 to 1M by default) in a
+  scratch database
+
+It times these cases (see benchmarks/suite_cases.py):
+- images: get_clothing_colors and analyze_skin on decoded images, and
+  the byte-level pipelines that uploads run, including decode
+- recommendation: get_top_recommendations (the per-item reference) and
+  rank_clothing (the configured engine) for each wardrobe size
+- routes: the FastAPI app through an in-process ASGI client.
+  POST /clothing/upload and /user/upload-photo are timed per
+  resolution. POST /recommendation/suggest (uncached and cached) and
+  GET /clothing/all are timed per wardrobe size.
+
+Each case runs --warmup-runs untimed times first. It then runs at
+least --min-runs times, and keeps going until --budget-seconds is
+spent or --max-runs is reached. Results are written as JSON:
+- p50/p95/p99 latency
+- throughput
+- peak RSS (VmHWM): reset per case on Linux, otherwise the process
+  peak so far
+
+compare checks two result files. It flags cases where p50, p95 or peak
+RSS grew by more than --threshold, and exits 1 if any did.
+
+Usage (from the project root):
+    python -m benchmarks.suite run --out bench.json
+    python -m benchmarks.suite run --sizes 10 1000 \\
+        --resolutions 640x480 --out quick.json
+    python -m benchmarks.suite compare baseline.json bench.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+DEFAULT_SIZES = [10, 1_000, 100_000, 1_000_000]
+DEFAULT_RESOLUTIONS = ["640x480", "1920x1080", "4000x3000"]
+GROUPS = ("images", "recommendation", "routes")
+COMPARED_METRICS = ("p50_ms", "p95_ms", "peak_rss_mb")
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak RSS counter; False where unsupported."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size since the last reset (or process start)."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def case_id(group: str, name: str, params: dict) -> str:
+    """Stable key of a case, used to match cases between runs."""
+    if not params:
+        return f"{group}.{name}"
+    labels = ",".join(f"{key}={value}" for key, value in params.items())
+    return f"{group}.{name}[{labels}]"
+
+
+def summarize(samples_ms: list[float], rss_mb: float) -> dict:
+    """Latency percentiles, throughput and peak RSS of one case."""
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    total_seconds = sum(samples_ms) / 1000
+    return {
+        "runs": len(samples_ms),
+        "mean_ms": float(np.mean(samples_ms)),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(max(samples_ms)),
+        "throughput_per_s": (
+            len(samples_ms) / total_seconds if total_seconds else 0.0
+        ),
+        "peak_rss_mb": rss_mb,
+    }
+
+
+def print_row(result: dict) -> None:
+    print(
+        f"{result['id'][:60]:<60} {result['p50_ms']:>10.2f} "
+        f"{result['p95_ms']:>10.2f} {result['p99_ms']:>10.2f} "
+        f"{result['throughput_per_s']:>9.1f} {result['peak_rss_mb']:>8.1f}",
+        flush=True,
+    )
+
+
+def print_header() -> None:
+    header = (
+        f"{'case':<60} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} "
+        f"{'ops/s':>9} {'RSS MB':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+
+
+class Runner:
+    """Runs cases under a run count and time budget and keeps results."""
+
+    def __init__(
+        self,
+        min_runs: int,
+        max_runs: int,
+        budget_seconds: float,
+        warmup_runs: int,
+    ):
+        self.min_runs = min_runs
+        self.max_runs = max_runs
+        self.budget_seconds = budget_seconds
+        self.warmup_runs = warmup_runs
+        self.results: list[dict] = []
+
+    async def measure(
+        self, group: str, name: str, params: dict, call, prepare=None
+    ) -> dict:
+        """
+        Time call(prepare(run)) repeatedly; call may be sync or async.
+
+        prepare(run) builds the input of each run outside the timed
+        region (e.g. a fresh image, so content-hash caches never hit).
+        Warm-up runs absorb one-time costs such as lazily built
+        indexes and are left out of the statistics.
+        """
+
+        async def timed(run: int) -> float:
+            argument = prepare(run) if prepare else None
+            start = time.perf_counter()
+            outcome = call(argument)
+            if asyncio.iscoroutine(outcome):
+                await outcome
+            return (time.perf_counter() - start) * 1000
+
+        for run in range(self.warmup_runs):
+            await timed(run)
+
+        samples = []
+        reset_peak_rss()
+        started = time.perf_counter()
+        while len(samples) < self.max_runs and (
+            len(samples) < self.min_runs
+            or time.perf_counter() - started < self.budget_seconds
+        ):
+            samples.append(await timed(self.warmup_runs + len(samples)))
+
+        result = {
+            "id": case_id(group, name, params),
+            "group": group,
+            "name": name,
+            "params": params,
+            **summarize(samples, peak_rss_mb()),
+        }
+        self.results.append(result)
+        print_row(result)
+        return result
+
+
+def parse_resolution(value: str) -> tuple[int, int]:
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected WIDTHxHEIGHT, got {value!r}"
+        ) from None
+    return width, height
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> int:
+    # Settings are read when api.config is first imported, so the
+    # scratch database and local storage are configured before then.
+    # Other settings still come from the environment and .env.
+    project_root = Path.cwd()
+    sys.path.insert(0, str(project_root))
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ["DATABASE_URL"] = (
+            args.database_url or f"sqlite:///{Path(scratch) / 'bench.db'}"
+        )
+        for name in ("CLOUDINARY_CLOUD_NAME", "CLOUDINARY_API_KEY"):
+            os.environ[name] = ""
+        from benchmarks import suite_cases
+
+        # Local uploads are written to uploads/ under the scratch dir
+        os.chdir(scratch)
+        try:
+            runner = Runner(
+                args.min_runs,
+                args.max_runs,
+                args.budget_seconds,
+                args.warmup_runs,
+            )
+            print_header()
+            asyncio.run(
+                suite_cases.run_cases(
+                    runner, args.sizes, args.resolutions, args.groups
+                )
+            )
+            settings_summary = suite_cases.settings_summary()
+        finally:
+            os.chdir(project_root)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "peak_rss_scope": "case" if reset_peak_rss() else "process",
+            "settings": settings_summary,
+            "config": {
+                "sizes": args.sizes,
+                "resolutions": [f"{w}x{h}" for w, h in args.resolutions],
+                "groups": list(args.groups),
+                "min_runs": args.min_runs,
+                "max_runs": args.max_runs,
+                "budget_seconds": args.budget_seconds,
+                "warmup_runs": args.warmup_runs,
+            },
+        },
+        "results": runner.results,
+    }
+    args.out.write_text(json.dumps(report, indent=2))
+    print(f"\nwrote {len(runner.results)} results to {args.out}")
+    return 0
+
+
+def find_regressions(
+    baseline: dict,
+    current: dict,
+    threshold: float,
+    min_delta_ms: float,
+    min_delta_mb: float,
+) -> tuple[list[dict], list[str]]:
+    """
+    Per-metric changes beyond threshold between two reports.
+
+    A change counts only when it also exceeds the absolute floor
+    (min_delta_ms / min_delta_mb), so sub-millisecond cases do not
+    flag on timer noise. Returns the regressions and the ids of cases
+    present in only one report.
+    """
+    base = {result["id"]: result for result in baseline["results"]}
+    new = {result["id"]: result for result in current["results"]}
+    regressions = []
+    for key in base.keys() & new.keys():
+        for metric in COMPARED_METRICS:
+            before, after = base[key][metric], new[key][metric]
+            floor = min_delta_mb if metric == "peak_rss_mb" else min_delta_ms
+            if after - before > max(before * threshold, floor):
+                regressions.append(
+                    {
+                        "id": key,
+                        "metric": metric,
+                        "baseline": before,
+                        "current": after,
+                        "change": after / before - 1 if before else None,
+                    }
+                )
+    unmatched = sorted(base.keys() ^ new.keys())
+    return regressions, unmatched
+
+
+def compare(args) -> int:
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+    regressions, unmatched = find_regressions(
+        baseline,
+        current,
+        args.threshold,
+        args.min_delta_ms,
+        args.min_delta_mb,
+    )
+
+    base = {result["id"]: result for result in baseline["results"]}
+    header = (
+        f"{'case':<60} {'base p50':>10} {'p50':>10} {'change':>8}  flags"
+    )
+    print(header)
+    print("-" * len(header))
+    flagged: dict[str, list[str]] = {}
+    for regression in regressions:
+        flagged.setdefault(regression["id"], []).append(regression["metric"])
+    for result in current["results"]:
+        before = base.get(result["id"])
+        if before is None:
+            continue
+        change = (
+            f"{result['p50_ms'] / before['p50_ms'] - 1:>+8.1%}"
+            if before["p50_ms"]
+            else f"{'':>8}"
+        )
+        flags = ", ".join(flagged.get(result["id"], []))
+        print(
+            f"{result['id'][:60]:<60} {before['p50_ms']:>10.2f} "
+            f"{result['p50_ms']:>10.2f} {change}  "
+            f"{'REGRESSION ' + flags if flags else ''}"
+        )
+    if unmatched:
+        print(f"\n{len(unmatched)} case(s) in only one report:")
+        for key in unmatched:
+            print(f"  {key}")
+
+    print(
+        f"\n{len(regressions)} regression(s) beyond "
+        f"{args.threshold:.0%} in {len(flagged)} case(s)"
+    )
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite")
+    run_parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=DEFAULT_SIZES,
+        help="wardrobe sizes in clothing rows",
+    )
+    run_parser.add_argument(
+        "--resolutions",
+        nargs="+",
+        type=parse_resolution,
+        default=[parse_resolution(value) for value in DEFAULT_RESOLUTIONS],
+        help="image resolutions as WIDTHxHEIGHT",
+    )
+    run_parser.add_argument(
+        "--groups",
+        nargs="+",
+        choices=GROUPS,
+        default=list(GROUPS),
+        help="case groups to run",
+    )
+    run_parser.add_argument(
+        "--database-url",
+        help="scratch database (default: a temporary SQLite file); "
+        "all of its application tables are dropped and recreated",
+    )
+    run_parser.add_argument(
+        "--warmup-runs",
+        type=int,
+        default=1,
+        help="untimed runs per case before measuring",
+    )
+    run_parser.add_argument("--min-runs", type=int, default=3)
+    run_parser.add_argument("--max-runs", type=int, default=200)
+    run_parser.add_argument(
+        "--budget-seconds",
+        type=float,
+        default=5.0,
+        help="keep repeating a case until this much time is spent",
+    )
+    run_parser.add_argument(
+        "--out", type=Path, default=Path("bench.json"), help="results file"
+    )
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser(
+        "compare", help="flag regressions between two result files"
+    )
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="relative growth that counts as a regression",
+    )
+    compare_parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.5,
+        help="ignore latency changes smaller than this",
+    )
+    compare_parser.add_argument(
+        "--min-delta-mb",
+        type=float,
+        default=10.0,
+        help="ignore peak RSS changes smaller than this",
+    )
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
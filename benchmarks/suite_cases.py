@@ -0,0 +1,356 @@
+"""
+Cases of the benchmark suite (run through benchmarks/suite.py).
+
+Importing this module loads the application settings, so suite.py
+imports it only after pointing DATABASE_URL at its scratch database.
+"""
+from itertools import product
+
+import cv2
+import httpx
+import numpy as np
+from sqlalchemy import delete
+
+from api.config import settings
+from api.constants.enums import EventType, TimeOfDay, WeatherType
+from api.database import Base, SessionLocal, engine
+from api.main import app
+from api.models.clothing import Clothing
+from api.models.user import DEFAULT_USER_ID
+from api.services.color_service import (
+    analyze_clothing_image_bytes,
+    get_clothing_colors,
+)
+from api.services.image_service import (
+    decode_image_for_processing,
+    decode_image_from_bytes,
+    resize_image_for_processing,
+)
+from api.services.ranking_service import rank_clothing
+from api.services.recommendation_cache import recommendation_cache
+from api.services.recommendation_service import get_top_recommendations
+from api.services.skin_tone_service import (
+    analyze_skin,
+    analyze_skin_image_bytes,
+)
+from api.services.wardrobe_store import wardrobe_store
+from benchmarks.decode_benchmark import synthetic_photo
+from benchmarks.sql_ranking_benchmark import fill_database
+
+CONTEXTS = list(product(EventType, WeatherType, TimeOfDay))
+
+
+def synthetic_portrait(width: int, height: int) -> bytes:
+    """
+    A drawn front-facing face on a plain background, as a JPEG.
+
+    Eyes, brows, nose and mouth are placed at face-like proportions,
+    which is enough for the Haar cascade to detect it.
+    """
+    rng = np.random.default_rng(0)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = (170, 190, 200)
+    cx, cy = width // 2, height // 2
+    face_w = min(width, height) // 3
+    face_h = int(face_w * 1.3)
+    cv2.ellipse(
+        image,
+        center=(cx, cy),
+        axes=(face_w // 2, face_h // 2),
+        angle=0,
+        startAngle=0,
+        endAngle=360,
+        color=(120, 160, 215),
+        thickness=-1,
+    )
+    eye_y = cy - face_h // 8
+    eye_dx = face_w // 5
+    eye_r = max(2, face_w // 14)
+    for side in (-1, 1):
+        eye_x = cx + side * eye_dx
+        cv2.ellipse(
+            image,
+            center=(eye_x, eye_y),
+            axes=(eye_r * 2, eye_r),
+            angle=0,
+            startAngle=0,
+            endAngle=360,
+            color=(40, 40, 40),
+            thickness=-1,
+        )
+        cv2.line(
+            image,
+            (eye_x - eye_r * 2, eye_y - eye_r * 3),
+            (eye_x + eye_r * 2, eye_y - eye_r * 3),
+            (50, 50, 60),
+            eye_r,
+        )
+    cv2.line(
+        image,
+        (cx, eye_y + eye_r),
+        (cx, cy + face_h // 8),
+        (90, 120, 170),
+        max(1, eye_r // 2),
+    )
+    cv2.ellipse(
+        image,
+        center=(cx, cy + face_h // 4),
+        axes=(face_w // 6, face_h // 20),
+        angle=0,
+        startAngle=0,
+        endAngle=360,
+        color=(60, 60, 150),
+        thickness=-1,
+    )
+    image = cv2.GaussianBlur(image, (0, 0), max(1.0, face_w / 100))
+    noise = rng.normal(0, 4, size=image.shape)
+    image = np.clip(image + noise, 0, 255).astype(np.uint8)
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])[
+        1
+    ].tobytes()
+
+
+def tagged_jpeg(jpeg: bytes, tag: int) -> bytes:
+    """
+    The same JPEG with a comment segment added, so its content hash
+    (and with it every analysis cache key) differs per tag while the
+    decoded pixels stay identical.
+    """
+    comment = f"bench-{tag}".encode()
+    segment = b"\xff\xfe" + (len(comment) + 2).to_bytes(2, "big") + comment
+    return jpeg[:2] + segment + jpeg[2:]
+
+
+def settings_summary() -> dict:
+    """Settings that change what the cases measure."""
+    return {
+        "database": engine.dialect.name,
+        "recommendation_engine": settings.recommendation_engine.value,
+        "color_quantizer": settings.color_quantizer.value,
+        "reduced_decode": settings.reduced_decode,
+        "compute_workers": settings.compute_workers,
+    }
+
+
+def expect_ok(response: httpx.Response) -> None:
+    """A failing route would otherwise be timed as a fast one."""
+    if response.status_code != 200:
+        raise RuntimeError(
+            f"{response.request.method} {response.request.url.path} "
+            f"answered {response.status_code}: {response.text[:200]}"
+        )
+
+
+def context_body(run: int) -> dict:
+    event, weather, time_of_day = CONTEXTS[run % len(CONTEXTS)]
+    return {
+        "event": event.value,
+        "weather": weather.value,
+        "time_of_day": time_of_day.value,
+    }
+
+
+async def image_cases(runner, width: int, height: int) -> None:
+    """Color and skin analysis of one garment and one portrait."""
+    params = {"resolution": f"{width}x{height}"}
+    garment = synthetic_photo(width, height)
+    portrait = synthetic_portrait(width, height)
+    garment_image = resize_image_for_processing(
+        decode_image_for_processing(garment)
+    )
+    portrait_image = decode_image_from_bytes(
+        portrait, min_long_side=settings.face_detect_max_dimension
+    )
+
+    await runner.measure(
+        "images",
+        "get_clothing_colors",
+        params,
+        lambda _: get_clothing_colors(garment_image),
+    )
+    await runner.measure(
+        "images",
+        "analyze_clothing_image_bytes",
+        params,
+        lambda _: analyze_clothing_image_bytes(garment),
+    )
+    await runner.measure(
+        "images",
+        "analyze_skin",
+        params,
+        lambda _: analyze_skin(portrait_image),
+    )
+    await runner.measure(
+        "images",
+        "analyze_skin_image_bytes",
+        params,
+        lambda _: analyze_skin_image_bytes(portrait),
+    )
+
+
+async def upload_route_cases(
+    runner, client: httpx.AsyncClient, width: int, height: int
+) -> None:
+    """Upload routes; every run sends new bytes, so caches never hit."""
+    params = {"resolution": f"{width}x{height}"}
+    garment = synthetic_photo(width, height)
+    portrait = synthetic_portrait(width, height)
+    form = {"clothing_type": "SHIRT", "occasion": "CASUAL", "season": "ALL"}
+
+    async def upload_clothing(image_bytes: bytes) -> None:
+        expect_ok(
+            await client.post(
+                "/clothing/upload",
+                files={"image": ("garment.jpg", image_bytes, "image/jpeg")},
+                data=form,
+            )
+        )
+
+    async def upload_photo(image_bytes: bytes) -> None:
+        expect_ok(
+            await client.post(
+                "/user/upload-photo",
+                files={"photo": ("portrait.jpg", image_bytes, "image/jpeg")},
+            )
+        )
+
+    await runner.measure(
+        "routes",
+        "POST /clothing/upload",
+        params,
+        upload_clothing,
+        prepare=lambda run: tagged_jpeg(garment, run),
+    )
+    await runner.measure(
+        "routes",
+        "POST /user/upload-photo",
+        params,
+        upload_photo,
+        prepare=lambda run: tagged_jpeg(portrait, run),
+    )
+
+
+def load_wardrobe(size: int) -> None:
+    """Replace the clothing rows with size synthetic ones."""
+    with SessionLocal() as db:
+        db.execute(delete(Clothing))
+        db.commit()
+    fill_database(SessionLocal, size, seed=size)
+    wardrobe_store.invalidate()
+    recommendation_cache.clear()
+
+
+async def wardrobe_cases(
+    runner, client, size: int, groups: list[str]
+) -> None:
+    """Recommendation functions and routes over one wardrobe size."""
+    params = {"items": size}
+    load_wardrobe(size)
+
+    with SessionLocal() as db:
+        state = wardrobe_store.read(db, DEFAULT_USER_ID)
+        items, columns = state.wardrobe.items, state.wardrobe.columns
+        profile = state.profile.skin_tone, state.profile.skin_undertone
+
+        if "recommendation" in groups:
+            await runner.measure(
+                "recommendation",
+                "get_top_recommendations",
+                params,
+                lambda run: get_top_recommendations(
+                    list(items), *CONTEXTS[run % len(CONTEXTS)], *profile
+                ),
+                prepare=lambda run: run,
+            )
+            await runner.measure(
+                "recommendation",
+                "rank_clothing",
+                params,
+                lambda run: rank_clothing(
+                    items,
+                    *CONTEXTS[run % len(CONTEXTS)],
+                    *profile,
+                    columns=columns,
+                    db=db,
+                    user_id=DEFAULT_USER_ID,
+                ),
+                prepare=lambda run: run,
+            )
+
+    if "routes" not in groups:
+        return
+
+    async def suggest(run: int) -> None:
+        expect_ok(
+            await client.post(
+                "/recommendation/suggest", json=context_body(run)
+            )
+        )
+
+    def uncached(run: int) -> int:
+        recommendation_cache.clear()
+        return run
+
+    await runner.measure(
+        "routes",
+        "POST /recommendation/suggest (uncached)",
+        params,
+        suggest,
+        prepare=uncached,
+    )
+    for run in range(len(CONTEXTS)):
+        await suggest(run)
+    await runner.measure(
+        "routes",
+        "POST /recommendation/suggest (cached)",
+        params,
+        suggest,
+        prepare=lambda run: run,
+    )
+
+    async def suggest_batch(_) -> None:
+        body = {
+            "contexts": [context_body(run) for run in range(len(CONTEXTS))]
+        }
+        expect_ok(
+            await client.post("/recommendation/suggest-batch", json=body)
+        )
+
+    await runner.measure(
+        "routes",
+        "POST /recommendation/suggest-batch (uncached)",
+        {**params, "contexts": len(CONTEXTS)},
+        suggest_batch,
+        prepare=uncached,
+    )
+
+    async def first_page(_) -> None:
+        expect_ok(await client.get("/clothing/all"))
+
+    await runner.measure("routes", "GET /clothing/all", params, first_page)
+
+
+async def run_cases(
+    runner,
+    sizes: list[int],
+    resolutions: list[tuple[int, int]],
+    groups: list[str],
+) -> None:
+    """Run the selected groups against a freshly created database."""
+    # A clean schema, so the persistent analysis cache starts empty
+    Base.metadata.drop_all(bind=engine)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            for width, height in resolutions:
+                if "images" in groups:
+                    await image_cases(runner, width, height)
+                if "routes" in groups:
+                    await upload_route_cases(runner, client, width, height)
+
+            if "recommendation" in groups or "routes" in groups:
+                for size in sizes:
+                    await wardrobe_cases(runner, client, size, groups)
@@ -15,6 +15,26 @@ async function request<T>(url: string, options?: RequestInit): Promise<T> {
   return res.json();
 }
 
+// Last body and ETag per conditional request, so unchanged responses
+// come back as an empty 304 and are served from here.
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
+async function cachedRequest<T>(url: string, cacheKey: string, options: RequestInit = {}): Promise<T> {
+  const cached = etagCache.get(cacheKey);
+  const headers = new Headers(options.headers);
+  if (cached) headers.set("If-None-Match", cached.etag);
+  const res = await fetch(`${BASE_URL}${url}`, { ...options, headers });
+  if (res.status === 304 && cached) return cached.data as T;
+  if (!res.ok) {
+    const error = await res.json().catch(() => ({ detail: "Something went wrong" }));
+    throw new Error(error.detail || `Request failed with status ${res.status}`);
+  }
+  const data = (await res.json()) as T;
+  const etag = res.headers.get("ETag");
+  if (etag) etagCache.set(cacheKey, { etag, data });
+  return data;
+}
+
 // Types
 export interface UserProfile {
   id: string;
@@ -41,6 +61,9 @@ export interface ClothingItem {
   occasion: string;
   season: string;
   created_at: string;
+  /** Downscaled WebP copies; null for images stored before derivatives existed. */
+  thumbnail_url: string | null;
+  medium_url: string | null;
 }
 
 export interface Suggestion {
@@ -98,8 +121,21 @@ export async function uploadClothing(
   });
 }
 
+/** Fetches every wardrobe page, following X-Next-Cursor until the last one. */
 export async function getAllClothing(): Promise<ClothingItem[]> {
-  return request<ClothingItem[]>("/clothing/all");
+  const items: ClothingItem[] = [];
+  let cursor: string | null = null;
+  do {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetch(`${BASE_URL}/clothing/all${query}`);
+    if (!res.ok) {
+      const error = await res.json().catch(() => ({ detail: "Something went wrong" }));
+      throw new Error(error.detail || `Request failed with status ${res.status}`);
+    }
+    items.push(...((await res.json()) as ClothingItem[]));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return items;
 }
 
 export async function getRecommendations(
@@ -107,9 +143,10 @@ export async function getRecommendations(
   weather: string,
   timeOfDay: string
 ): Promise<RecommendationResponse> {
-  return request<RecommendationResponse>("/recommendation/suggest", {
+  const body = JSON.stringify({ event, weather, time_of_day: timeOfDay });
+  return cachedRequest<RecommendationResponse>("/recommendation/suggest", `suggest:${body}`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ event, weather, time_of_day: timeOfDay }),
+    body,
   });
 }
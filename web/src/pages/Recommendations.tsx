@@ -31,7 +31,7 @@ function SuggestionCard({ suggestion, index }: { suggestion: Suggestion; index:
     >
       <div className="relative aspect-square overflow-hidden">
         <img
-          src={imageUrl(suggestion.clothing.image_url)}
+          src={imageUrl(suggestion.clothing.medium_url ?? suggestion.clothing.image_url)}
           alt={suggestion.clothing.clothing_type}
           className="h-full w-full object-cover"
         />
@@ -38,7 +38,8 @@ function ClothingCard({ item }: { item: ClothingItem }) {
     >
       <div className="relative aspect-square overflow-hidden">
         <img
-          src={imageUrl(item.image_url)}
+          src={imageUrl(item.thumbnail_url ?? item.image_url)}
+          loading="lazy"
           alt={item.clothing_type}
           className="h-full w-full object-cover transition-transform duration-300 group-hover:scale-105"
         />